@@ -36,10 +36,12 @@ from .sexpr import *
 from .fexpr import *
 from .expr import *
 from .simulator import *
+from .ltisimulator import *
 from .randomnetwork import *
 from .nettransform import *
 from .laplace import *
 from .inverse_laplace import *
+from .numericlaplace import *
 from .fourier import *
 from .inverse_fourier import *
 from .hilbert import *
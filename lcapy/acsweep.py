@@ -0,0 +1,313 @@
+"""
+This module implements a numerical AC frequency sweep using the
+modified nodal analysis (MNA) stamps.
+
+Copyright 2026 Michael Hayes, UCECE
+"""
+
+from .current import current_sign
+from .numericmna import SparseMNA
+from .sym import ssym, omegasym
+import sympy as sym
+
+__all__ = ('ACSweep', )
+
+
+def _evaluator(expr, var):
+    """Return function that evaluates SymPy expression `expr` for an
+    array of values of `var`."""
+
+    from numpy import full
+
+    expr = sym.sympify(expr)
+    unknown = expr.free_symbols - {var}
+    if unknown != set():
+        raise ValueError(
+            'Undefined symbols %s; use subs to replace with numerical values' % unknown)
+
+    if var not in expr.free_symbols:
+        value = complex(expr)
+        return lambda x: full(len(x), value, dtype=complex)
+
+    func = sym.lambdify(var, expr, modules='numpy')
+    return lambda x: func(x.astype(complex)) + full(len(x), 0j)
+
+
+class ACSweepResultsNode(object):
+
+    def __init__(self, V):
+        self.V = V
+
+
+class ACSweepResultsCpt(object):
+
+    def __init__(self, V, I):
+        self.V = V
+        self.I = I
+
+
+class ACSweepResults(object):
+    """This class stores the results of an AC sweep.  `node_voltages`
+    is an array of node voltage phasors with a row for each node
+    (plus a row of zeros for the ground node) and a column for each
+    frequency.  `branch_currents` is a similar array for the unknown
+    branch currents.  Use `results[node].V`, `results.R1.V`, and
+    `results.R1.I` to access the results by name."""
+
+    def __init__(self, f, cct, mna):
+
+        from numpy import zeros
+
+        self.f = f
+        self.cct = cct
+        self.mna = mna
+
+        Nf = len(f)
+
+        self.num_nodes = len(cct.node_list) - 1
+        self.num_branches = len(mna.unknown_branch_currents)
+
+        self.node_voltages = zeros((self.num_nodes + 1, Nf), dtype=complex)
+        self.branch_currents = zeros((self.num_branches, Nf), dtype=complex)
+
+    def __getitem__(self, name):
+        """Return element or node by name."""
+
+        cct = self.cct
+
+        # If name is an integer, convert to a string.
+        if isinstance(name, int):
+            name = '%d' % name
+
+        if name in cct.nodes:
+            return ACSweepResultsNode(self._node_voltage_get(name))
+
+        if name in cct._elements:
+            return ACSweepResultsCpt(self._cpt_voltage_get(name),
+                                     self._cpt_current_get(name))
+
+        raise AttributeError('Unknown element or node name %s' % name)
+
+    def __getattr__(self, attr):
+        """Return element or node by name.  This gets called if there is
+        no explicit attribute attr for this instance."""
+
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return self.__getitem__(attr)
+
+    def _node_voltage_get(self, n):
+
+        index = self.mna._node_index(n)
+        # NB, node_voltages is zero for index = -1
+        return self.node_voltages[index]
+
+    def _cpt_voltage_get(self, cptname):
+
+        cpt = self.cct.elements[cptname]
+
+        v1 = self._node_voltage_get(cpt.node_names[0])
+        v2 = self._node_voltage_get(cpt.node_names[1])
+        return v1 - v2
+
+    def _cpt_current_get(self, cptname):
+
+        cpt = self.cct.elements[cptname]
+
+        if cptname in self.mna.unknown_branch_currents:
+            index = self.mna.unknown_branch_currents.index(cptname)
+            return current_sign(self.branch_currents[index], cpt.is_source)
+
+        if cpt.type in ('R', 'NR', 'C', 'Y', 'Z'):
+            from numpy import pi
+
+            Y = _evaluator(1 / cpt.Z.sympy, ssym)(2j * pi * self.f)
+            return self._cpt_voltage_get(cptname) * Y
+
+        raise ValueError('Cannot determine current through %s' % cptname)
+
+    def output(self, output):
+        """Return array of values for `output`, where `output` is a
+        string such as 'V2', 'V(2, 3)', 'V(R1)', or 'I(R1)'."""
+
+        quantity, arg1, arg2 = self.cct._parse_output(output)
+        if quantity == 'I':
+            return self[arg1].I
+        return self._node_voltage_get(arg1) - self._node_voltage_get(arg2)
+
+
+class ACSweep(object):
+    """This class performs a numerical AC frequency sweep of a
+    netlist.  The MNA A matrix is created from the component stamps
+    in the s-domain and split into numerical coefficient matrices so
+    that A(s) = A_0 + s A_1 + s^2 A_2 + ...  Any elements of A(s) that
+    are not polynomials in s are evaluated separately.
+
+    As with SPICE AC analysis, the sweep frequency is applied to all
+    the AC sources (using their phasor amplitudes) and s-domain
+    sources are evaluated at s = j 2 pi f.  DC sources, noise sources,
+    and initial conditions are ignored.
+
+    All the component values need to be numerical.
+
+    """
+
+    def __init__(self, cct):
+
+        cct = cct.expand()
+        if '0' not in cct.nodes:
+            raise ValueError('Nothing connected to ground node 0')
+
+        self.cct = cct.select('s')
+        self.mna = SparseMNA(self.cct, None)
+
+        self._A_split(self.mna._A)
+        self._Z_make(cct)
+
+    def _A_split(self, A):
+        """Split A(s) into numerical coefficient matrices."""
+
+        self.A_coeffs = {}
+        self.A_funcs = []
+
+        for (row, col), value in A.todok().items():
+            value = sym.sympify(value)
+            if value.is_polynomial(ssym):
+                poly = sym.Poly(value, ssym)
+                for (power, ), coeff in poly.terms():
+                    if coeff.free_symbols != set():
+                        raise ValueError(
+                            'Undefined symbols %s in A matrix; use subs to replace with numerical values' % coeff.free_symbols)
+                    if power not in self.A_coeffs:
+                        self.A_coeffs[power] = []
+                    self.A_coeffs[power].append((row, col, complex(coeff)))
+            else:
+                self.A_funcs.append((row, col, _evaluator(value, ssym)))
+
+    def _Z_make(self, cct):
+        """Create list of functions to evaluate the Z vector for each
+        source group."""
+
+        self.Z_funcs = []
+
+        for kind in cct.independent_source_groups(True):
+            if kind == 's':
+                Z, var, domain = self.mna._Z, ssym, 's'
+            elif not isinstance(kind, str):
+                # AC sources.  The phasor amplitude may be a function
+                # of the source angular frequency (say omega_0).
+                mna = SparseMNA(cct.select(kind), None)
+                if mna.unknown_branch_currents != self.mna.unknown_branch_currents:
+                    raise ValueError('Branch current mismatch for %s' % kind)
+                Z, domain = mna._Z, 'omega'
+                var = sym.sympify(kind)
+                if not var.is_Symbol:
+                    var = omegasym
+            else:
+                # Ignore DC and noise sources.
+                continue
+
+            for (row, col), value in Z.todok().items():
+                self.Z_funcs.append((row, _evaluator(value, var), domain))
+
+    def _Z_eval(self, f):
+
+        from numpy import zeros, pi
+
+        N = self.mna._A.shape[0]
+        Z = zeros((len(f), N), dtype=complex)
+        for row, func, domain in self.Z_funcs:
+            if domain == 's':
+                Z[:, row] += func(2j * pi * f)
+            else:
+                Z[:, row] += func(2 * pi * f)
+        return Z
+
+    def _dense_solve(self, f, Z):
+
+        from numpy import zeros, linalg, pi
+
+        N = Z.shape[1]
+        X = zeros(Z.shape, dtype=complex)
+
+        # Limit the size of the stacked matrices to about 64 MB.
+        chunk = max(1, 2**22 // (N * N))
+        for start in range(0, len(f), chunk):
+            sv = 2j * pi * f[start:start + chunk]
+            A = zeros((len(sv), N, N), dtype=complex)
+            for power, entries in self.A_coeffs.items():
+                sp = sv ** power
+                for row, col, value in entries:
+                    A[:, row, col] += value * sp
+            for row, col, func in self.A_funcs:
+                A[:, row, col] += func(sv)
+
+            X[start:start + chunk] = linalg.solve(
+                A, Z[start:start + chunk, :, None])[:, :, 0]
+        return X
+
+    def _sparse_solve(self, f, Z):
+
+        from numpy import zeros, pi
+        from scipy.sparse import csc_array
+        from scipy.sparse.linalg import splu
+
+        N = Z.shape[1]
+        X = zeros(Z.shape, dtype=complex)
+
+        coeffs = {}
+        for power, entries in self.A_coeffs.items():
+            rows, cols, values = zip(*entries)
+            coeffs[power] = csc_array((values, (rows, cols)), shape=(N, N),
+                                      dtype=complex)
+
+        for m, f1 in enumerate(f):
+            s1 = 2j * pi * f1
+            A = csc_array((N, N), dtype=complex)
+            for power, M in coeffs.items():
+                A = A + M * s1 ** power
+            if self.A_funcs != []:
+                rows, cols, values = zip(*[(row, col, func(f[m:m + 1] * 2j * pi)[0])
+                                           for row, col, func in self.A_funcs])
+                A = A + csc_array((values, (rows, cols)), shape=(N, N),
+                                  dtype=complex)
+            X[m] = splu(A.tocsc()).solve(Z[m])
+        return X
+
+    def __call__(self, f, outputs=None, method='auto'):
+        """Solve the circuit at the array of frequencies `f` (in hertz).
+
+        `method` can be 'dense' to solve for all the frequencies at
+        once using stacked dense matrices, 'sparse' to use a sparse LU
+        factorization at each frequency, or 'auto' to choose
+        depending on the size of the A matrix.
+
+        If `outputs` is None, an `ACSweepResults` object is returned.
+        Otherwise `outputs` is a list of strings, such as ['V2',
+        'V(2, 3)', 'I(R1)'], and a dictionary of arrays keyed by these
+        strings is returned."""
+
+        from numpy import asarray, atleast_1d
+
+        f = atleast_1d(asarray(f, dtype=float))
+
+        N = self.mna._A.shape[0]
+        if method == 'auto':
+            method = 'dense' if N <= 100 else 'sparse'
+
+        Z = self._Z_eval(f)
+        if method == 'dense':
+            X = self._dense_solve(f, Z)
+        elif method == 'sparse':
+            X = self._sparse_solve(f, Z)
+        else:
+            raise ValueError('Unknown method %s' % method)
+
+        results = ACSweepResults(f, self.cct, self.mna)
+        num_nodes = results.num_nodes
+        results.node_voltages[0:num_nodes] = X[:, 0:num_nodes].T
+        results.branch_currents[:] = X[:, num_nodes:].T
+
+        if outputs is None:
+            return results
+        return {output: results.output(output) for output in outputs}
@@ -0,0 +1,156 @@
+"""
+This module provides optional backends for evaluating SymPy expressions
+for NumPy arrays.  With the 'autowrap' backend, an expression is
+compiled into a NumPy ufunc using SymPy's ufuncify; this requires a C
+compiler.  The compiled modules are cached on disk.  With the
+'numexpr' backend, an expression is evaluated using the numexpr
+package.  The backend is selected with rcParams['evaluate.backend'].
+
+Copyright 2026 Michael Hayes, UCECE
+"""
+
+from .rcparams import rcParams
+from warnings import warn
+import sympy as sym
+
+
+class CompiledFunction(object):
+    """This class wraps a ufunc of real arguments created by ufuncify.
+    If the expression is complex, the ufunc has two outputs: the real
+    and imaginary parts.  Since the ufunc only handles real values,
+    the `fallback` function is used for complex arguments."""
+
+    def __init__(self, ufunc, is_complex, fallback):
+
+        self.ufunc = ufunc
+        self.is_complex = is_complex
+        self.fallback = fallback
+
+    def __call__(self, *args):
+
+        from numpy import asarray, iscomplexobj
+
+        args = [asarray(arg) for arg in args]
+        for arg in args:
+            if iscomplexobj(arg):
+                return self.fallback(*args)
+
+        if self.is_complex:
+            re, im = self.ufunc(*args)
+            return re + 1j * im
+        return self.ufunc(*args)
+
+
+def _load_ufunc(dirname):
+    """Return the ufunc from the compiled module in the directory
+    `dirname` or None if there is no compiled module."""
+
+    from importlib.machinery import EXTENSION_SUFFIXES
+    from importlib.util import module_from_spec, spec_from_file_location
+    from os import listdir
+    from os.path import isdir, join
+
+    if not isdir(dirname):
+        return None
+
+    for filename in sorted(listdir(dirname)):
+        for suffix in EXTENSION_SUFFIXES:
+            if not filename.endswith(suffix):
+                continue
+            # The module name must match the name of its init function.
+            name = filename[:-len(suffix)]
+            spec = spec_from_file_location(name, join(dirname, filename))
+            module = module_from_spec(spec)
+            spec.loader.exec_module(module)
+            for attr in dir(module):
+                if attr.startswith('wrapped_'):
+                    return getattr(module, attr)
+    return None
+
+
+def autowrap_function(expr, args, fallback):
+    """Return function of `args` that evaluates `expr` using a ufunc
+    compiled with ufuncify.  The compiled module is cached in the
+    directory rcParams['evaluate.cache_dir'] keyed by the hash of the
+    expression.  `fallback` is used for complex arguments."""
+
+    from hashlib import sha1
+    from os import getpid, makedirs, rename
+    from os.path import expanduser, join
+    from shutil import rmtree
+    from sympy.utilities.autowrap import ufuncify
+
+    # The ufunc only handles real arguments, so replace the arguments
+    # with real symbols to split a complex expression into its real
+    # and imaginary parts.
+    xargs = [sym.Symbol('x%d' % m, real=True) for m in range(len(args))]
+    expr = sym.sympify(expr).subs(dict(zip(args, xargs)), simultaneous=True)
+
+    unknown = expr.free_symbols - set(xargs)
+    if unknown != set():
+        raise ValueError('Undefined symbols %s' % unknown)
+
+    is_complex = expr.has(sym.I)
+    if is_complex:
+        exprs = list(expr.as_real_imag())
+    else:
+        exprs = [expr]
+
+    key = sha1((sym.srepr(exprs) + sym.srepr(xargs)).encode()).hexdigest()
+    cache_dir = expanduser(rcParams['evaluate.cache_dir'])
+    dirname = join(cache_dir, key)
+
+    ufunc = _load_ufunc(dirname)
+    if ufunc is None:
+        makedirs(cache_dir, exist_ok=True)
+        tmpdirname = '%s.%d' % (dirname, getpid())
+        try:
+            ufunc = ufuncify(xargs, exprs, tempdir=tmpdirname)
+        except Exception:
+            rmtree(tmpdirname, ignore_errors=True)
+            raise
+        try:
+            rename(tmpdirname, dirname)
+        except OSError:
+            # Another process has compiled the same expression.
+            rmtree(tmpdirname, ignore_errors=True)
+
+    return CompiledFunction(ufunc, is_complex, fallback)
+
+
+def numexpr_function(expr, args, fallback):
+    """Return function of `args` that evaluates `expr` using numexpr."""
+
+    return sym.lambdify(args, expr, 'numexpr')
+
+
+def compile_function(expr, args, fallback, backend=None):
+    """Return function of `args` that evaluates `expr` for NumPy arrays
+    using `backend` (default rcParams['evaluate.backend']).  If the
+    backend is 'numpy' or the expression cannot be compiled, for
+    example, if there is no C compiler or the expression has
+    functions that cannot be compiled, the NumPy function `fallback`
+    is returned."""
+
+    if backend is None:
+        backend = rcParams['evaluate.backend']
+
+    if isinstance(args, sym.Symbol):
+        args = (args, )
+    args = tuple(args)
+
+    if backend == 'numpy':
+        return fallback
+    elif backend == 'autowrap':
+        builder = autowrap_function
+    elif backend == 'numexpr':
+        builder = numexpr_function
+    else:
+        raise ValueError('Unknown backend %s' % backend)
+
+    try:
+        return builder(expr, args, fallback)
+    except Exception as e:
+        warn('Cannot evaluate expression using %s backend, using NumPy: %s'
+             % (backend, e))
+        return fallback
@@ -0,0 +1,168 @@
+"""
+This module implements compiled parametric circuit solutions.  The
+circuit is solved symbolically once and the results are converted
+to NumPy functions of the parameters and the domain variable.
+
+Copyright 2026 Michael Hayes, UCECE
+"""
+
+from .codegen import compile_function
+from .rcparams import rcParams
+import sympy as sym
+
+__all__ = ('CompiledCircuit', )
+
+
+def _heaviside(arg, zero=None):
+    """Heaviside function for NumPy arrays."""
+
+    from numpy import heaviside, real
+
+    if zero is None:
+        zero = rcParams['functions.heaviside_zero']
+    return heaviside(real(arg), float(zero))
+
+
+class CompiledCircuit(object):
+    """This class holds the symbolic solutions for the outputs of a
+    circuit as NumPy functions of the parameters and the domain
+    variable.  Calling the object evaluates the outputs for arrays
+    of parameter values.  For example,
+
+    >>> cc = cct.compile(outputs=['V2', 'I(R1)'], params=['R1', 'C1'])
+    >>> results = cc(t=tv, R1=1e3, C1=np.array([1e-6, 2e-6])[:, None])
+
+    The arrays are broadcast using the NumPy rules.  Parameters that
+    are not specified default to their values in the netlist.  The
+    functions are compiled if rcParams['evaluate.backend'] is
+    'autowrap' or 'numexpr'.
+
+    """
+
+    def __init__(self, cct, outputs, params=None, domain='t'):
+
+        from .sym import ssym, tsym
+
+        if isinstance(outputs, str):
+            outputs = [outputs]
+        if params is None:
+            params = []
+        elif isinstance(params, str):
+            params = [params]
+
+        if domain == 't':
+            var = tsym
+        elif domain == 's':
+            var = ssym
+        else:
+            raise ValueError("Unknown domain %s, expecting 't' or 's'"
+                             % domain)
+
+        defs = cct.defs()
+        symbols = cct.symbols
+
+        # Convert numerical values to symbols for the parameters.
+        fixed = []
+        for name in cct.elements:
+            if name not in params:
+                fixed.append(name)
+        for param in params:
+            if param not in defs and param not in symbols:
+                raise ValueError('Unknown parameter %s' % param)
+        scct = cct.sympify(ignore=fixed)
+
+        self.cct = cct
+        self.outputs = outputs
+        self.params = params
+        self.domain = domain
+        self.var = var
+
+        # Default values of the parameters.
+        self.defaults = {}
+        for param in params:
+            if param in defs:
+                self.defaults[param] = complex(sym.sympify(defs[param]))
+
+        self.exprs = {}
+        for output in outputs:
+            quantity, arg1, arg2 = scct._parse_output(output)
+            if quantity == 'I':
+                result = scct.get_I(arg1)
+            else:
+                result = scct.get_Vd(arg1, arg2)
+            if domain == 't':
+                result = result.time()
+            else:
+                result = result(var)
+            self.exprs[output] = result.sympy
+
+        # Find the SymPy symbols for the parameters; these may have
+        # assumptions.
+        free_symbols = set()
+        for expr in self.exprs.values():
+            free_symbols |= expr.free_symbols
+        symbol_map = {str(symbol): symbol for symbol in free_symbols}
+
+        self.param_symbols = [symbol_map.get(param, sym.Symbol(param))
+                              for param in params]
+
+        unknown = free_symbols - set(self.param_symbols) - {var}
+        if unknown != set():
+            raise ValueError(
+                'Undefined symbols %s; use subs to replace with numerical values or add to params' % unknown)
+
+        modules = [{'Heaviside': _heaviside}, 'scipy', 'numpy']
+        args = [var] + self.param_symbols
+        self.funcs = {}
+        for output, expr in self.exprs.items():
+            func = sym.lambdify(args, expr, modules)
+            self.funcs[output] = compile_function(expr, args, func)
+
+    def __call__(self, arg=None, **kwargs):
+        """Evaluate the outputs.  `arg` is the array of values of the
+        domain variable; alternatively it can be specified by a
+        keyword argument, such as `t=tv`.  The parameter values are
+        specified by keyword arguments.  A dictionary of arrays keyed
+        by the output names is returned."""
+
+        from numpy import asarray, broadcast_arrays, allclose
+
+        name = str(self.var)
+        if name in kwargs:
+            if arg is not None:
+                raise ValueError('%s specified twice' % name)
+            arg = kwargs.pop(name)
+        if arg is None:
+            if self.domain != 't':
+                raise ValueError('Need values for %s' % name)
+            arg = 0
+
+        for key in kwargs:
+            if key not in self.params:
+                raise ValueError('Unknown parameter %s' % key)
+
+        values = []
+        for param in self.params:
+            if param in kwargs:
+                value = kwargs[param]
+            elif param in self.defaults:
+                value = self.defaults[param]
+                if value.imag == 0:
+                    value = value.real
+            else:
+                raise ValueError('No value for parameter %s' % param)
+            values.append(asarray(value))
+
+        arg = asarray(arg)
+        if self.domain == 's':
+            arg = arg.astype(complex)
+
+        results = {}
+        for output, func in self.funcs.items():
+            result = func(arg, *values)
+            # Handle constant results.
+            result = broadcast_arrays(result, arg, *values)[0]
+            if result.dtype == complex and allclose(result.imag, 0):
+                result = result.real
+            results[output] = result
+        return results
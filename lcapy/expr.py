@@ -19,7 +19,8 @@ from .cache import cached_property
 from .domains import UndefinedDomain
 from .quantity import UndefinedQuantity
 from .exprdomain import ExprDomain
-from .ratfun import Ratfun
+from .ratfun import Ratfun, RatfunEvaluator
+from .codegen import compile_function
 from .sym import sympify, symsimplify, j, omegasym, symdebug, AppliedUndef
 from .sym import capitalize_name, tsym, miscsymbol, usersymbol, symbol_map, tausym, nusym, oo
 from .sym import fsym, ssym, Fsym, Omegasym, symbol_delete, pi
@@ -2210,7 +2211,7 @@ As a workaround use x.as_expr() %s y.as_expr()""" % op)
 
         return self.var not in self.sympy.free_symbols
 
-    def evaluate(self, arg=None):
+    def evaluate(self, arg=None, **kwargs):
         """Evaluate expression at arg.  `arg` may be a scalar or a vector.
         The result is of type float or complex.
 
@@ -2219,166 +2220,25 @@ As a workaround use x.as_expr() %s y.as_expr()""" % op)
         There can be only one or fewer undefined variables in the expression.
         This is replaced by `arg` and then evaluated to obtain a result.
 
+        Alternatively, values for the symbols can be specified by name
+        as keyword arguments, for example, `H.evaluate(f=fv, R=Rv)`.
+        The values are broadcast using NumPy rules so, for example,
+        `H.evaluate(f=fv[None, :], R=Rv[:, None])` returns a 2-D
+        array with a row for each value of R.
+
         See also `fval` and `cval`.
         """
 
         import numpy as np
 
+        if kwargs != {}:
+            return self._evaluate_broadcast(arg, kwargs)
+
         is_time = self.is_time_domain or self.is_discrete_time_domain
         is_causal = is_time and self.is_causal
 
         def evaluate_expr(expr, var, arg):
 
-            # For some reason the new lambdify will convert a float
-            # argument to complex
-
-            def besseli(mu, arg):
-                """Modified Bessel function."""
-
-                from scipy.special import iv
-                return iv(mu, arg)
-
-            def besselj(mu, arg):
-                """Bessel function."""
-
-                from scipy.special import jv
-                return jv(mu, arg)
-
-            def exp(arg):
-
-                # Hack to handle exp(-a * t) * Heaviside(t) for t < 0
-                # by trying to avoid inf when number overflows float.
-
-                if isinstance(arg, complex):
-                    if arg.real > 500:
-                        arg = 500 + 1j * arg.imag
-                elif arg > 500:
-                    arg = 500
-
-                return np.exp(arg)
-
-            def rect(arg):
-                # Define in terms of Heaviside for consistency
-                return heaviside(arg + 0.5) - heaviside(arg - 0.5)
-
-            def sign(arg):
-                # Define in terms of Heaviside for consistency
-                return 2 * heaviside(arg) - 1
-
-            def dtsign(arg):
-                # Define in terms of unitstep for consistency
-                return 2 * unitstep(arg) - 1
-
-            def dtrect(arg):
-                # Define in terms of UnitStep for consistency
-                return unitstep(arg + 0.5) - unitstep(arg - 0.5)
-
-            def sinc(arg):
-                """SymPy sinc."""
-
-                # This is used for sinc created by sympify, e.g., a =
-                # expr('sinc(n)').  SymPy uses the unnormalized form
-                # but NumPy (and Lcapy) use the normalized form.
-                # Lambdify does some jiggery pokery and divides the
-                # arg by pi since it is expecting that the NumPy sinc
-                # function is going to be used.  SymPy's choice is
-                # unfortunate from a numerical accuracy point of view
-                # since sincn(n) should be zero for integer n, n != 0.
-
-                # Undo SymPy jiggery pokery.
-                arg = arg * np.pi
-
-                return 1.0 if arg == 0 else np.sin(np.pi * arg) / (np.pi * arg)
-
-            def sincn(arg):
-                """Normalized sinc."""
-
-                # Note, if sincn is made to print sinc, then lambdify will
-                # call sinc.   Grrrr.
-
-                return 1.0 if arg == 0 else np.sin(np.pi * arg) / (np.pi * arg)
-
-            def sincu(arg):
-                """Unnormalized sinc."""
-
-                return 1.0 if arg == 0 else np.sin(arg) / arg
-
-            def psinc(M, arg):
-                """Periodic sinc."""
-
-                D = np.sin(np.pi * arg)
-                return 1.0 if D == 0 else np.sin(M * np.pi * arg) / (M * D)
-
-            def trap(arg, alpha):
-
-                absarg = abs(arg)
-                foo = absarg - 0.5
-
-                if alpha == 0:
-                    if arg < -0.5 or arg > 0.5:
-                        return 0.0
-                    return 1.0
-
-                if foo >= 0.5 * alpha:
-                    return 0.0
-                elif foo <= -0.5 * alpha:
-                    return 1.0
-                else:
-                    return 0.5 - foo / alpha
-
-            def tri(arg):
-
-                if arg >= 1:
-                    return 0.0
-                elif arg <= -1:
-                    return 0.0
-                else:
-                    return 1.0 - abs(arg)
-
-            def ramp(arg):
-
-                if arg >= 0:
-                    return arg
-                return 0
-
-            def rampstep(arg):
-
-                if arg < 0:
-                    return 0
-                elif arg > 1:
-                    return 1
-                else:
-                    return arg
-
-            def dirac(arg):
-                return np.inf if arg == 0.0 else 0.0
-
-            def unitimpulse(arg):
-                return 1.0 if arg == 0 else 0.0
-
-            def unitstep(arg, zero=None):
-                if arg == 0:
-                    if zero is None:
-                        zero = rcParams['functions.unitstep_zero']
-                    return zero
-                return 1.0 if arg >= 0 else 0.0
-
-            def heaviside(arg, zero=None):
-                if arg == 0:
-                    if zero is None:
-                        zero = rcParams['functions.heaviside_zero']
-                    return zero
-                return 1.0 if arg > 0.0 else 0.0
-
-            def sqrt(arg):
-                # Large numbers get converted to ints and int has no sqrt
-                # attribute so convert to float.
-                if isinstance(arg, int):
-                    arg = float(arg)
-                if not isinstance(arg, complex) and arg < 0:
-                    arg = arg + 0j
-                return np.sqrt(arg)
-
             try:
                 arg0 = arg[0]
                 scalar = False
@@ -2386,22 +2246,7 @@ As a workaround use x.as_expr() %s y.as_expr()""" % op)
                 arg0 = arg
                 scalar = True
 
-            # For negative arguments, np.sqrt will return Nan.
-            # np.lib.scimath.sqrt converts to complex but cannot be used
-            # for lamdification!
-            func1 = lambdify(var, expr,
-                             [{'DiracDelta': dirac,
-                              'Heaviside': heaviside,
-                               'UnitImpulse': unitimpulse,
-                               'UnitStep': unitstep,
-                               'dtrect': dtrect, 'dtsign': dtsign,
-                               'besseli': besseli, 'besselj': besselj,
-                               'sinc': sinc, 'sincn': sincn,
-                               'sincu': sincu, 'psinc': psinc,
-                               'rect': rect, 'tri': tri, 'trap': trap,
-                               'ramp': ramp, 'rampstep': rampstep,
-                               'sqrt': sqrt, 'exp': exp, 'sign': sign},
-                              "scipy", "numpy", "math", "sympy"])
+            func1 = None
 
             def func(arg):
                 # Lambdify barfs on (-1)**n if for negative values of n.
@@ -2411,6 +2256,10 @@ As a workaround use x.as_expr() %s y.as_expr()""" % op)
 
                 if is_causal and arg < 0:
                     return 0
+
+                nonlocal func1
+                if func1 is None:
+                    func1 = _lambdify_evaluate(expr, var)
                 try:
                     result = func1(arg)
                 except ZeroDivisionError:
@@ -2425,6 +2274,42 @@ As a workaround use x.as_expr() %s y.as_expr()""" % op)
                     result = complex(sym.simplify(expr).limit(var, arg))
                 return result
 
+            def vector_func(arg):
+                # Evaluate for all the elements with a single call and
+                # only patch up the NaN and inf values using func.
+
+                args = np.asarray(arg)
+                if args.dtype.kind in 'iub':
+                    args = args.astype(float)
+                elif args.dtype.kind not in 'fc':
+                    return None
+
+                vfunc1 = _lambdify_evaluate(expr, var, vector=True)
+                with np.errstate(all='ignore'):
+                    response = vfunc1(args)
+                response = np.asarray(response, dtype=complex)
+                response = np.broadcast_to(response, args.shape).copy()
+
+                if is_causal:
+                    response[args.real < 0] = 0
+
+                with np.errstate(all='ignore'):
+                    for index in zip(*np.nonzero(~np.isfinite(response))):
+                        response[index] = complex(func(args[index]))
+                return response
+
+            if not scalar:
+                try:
+                    response = vector_func(arg)
+                except Exception:
+                    # Fall back to evaluating each element.
+                    response = None
+
+                if response is not None:
+                    if np.allclose(response.imag, 0.0):
+                        response = response.real
+                    return response
+
             try:
                 # Try to flush out weirdness using first argument
                 response = func(arg0)
@@ -2513,6 +2398,75 @@ As a workaround use x.as_expr() %s y.as_expr()""" % op)
         except:
             return evaluate_expr(expr.simplify(), var, arg)
 
+    def _evaluate_broadcast(self, arg, values):
+        """Evaluate expression for the dictionary of symbol values
+        `values`, keyed by symbol name, by broadcasting the values."""
+
+        import numpy as np
+
+        expr = self.doit().sympy
+
+        var = getattr(self, 'var', None)
+        if arg is not None:
+            if var is None:
+                raise ValueError('Expression has no domain variable for %s'
+                                 % arg)
+            if var.name in values:
+                raise ValueError('Value for %s specified twice' % var.name)
+            values[var.name] = arg
+
+        # Use symbol names to avoid problems with symbols of the same
+        # name with different assumptions.
+        symbols = {symbol.name: symbol for symbol in expr.free_symbols}
+        undefined = set(symbols) - set(values)
+        if undefined != set():
+            raise ValueError('Undefined symbols %s in expression %s' % (
+                tuple(undefined), self))
+
+        names = list(values)
+        args = []
+        for name in names:
+            value = values[name]
+            if isinstance(value, Expr):
+                value = value.evaluate()
+            value = np.asarray(value)
+            if value.dtype.kind in 'iub':
+                value = value.astype(float)
+            args.append(value)
+        args = np.broadcast_arrays(*args)
+
+        params = tuple(symbols.get(name, sym.Symbol(name)) for name in names)
+        func = _lambdify_evaluate(expr, params, vector=True)
+        with np.errstate(all='ignore'):
+            response = np.asarray(func(*args), dtype=complex)
+        response = np.broadcast_to(response, args[0].shape).copy()
+
+        is_time = self.is_time_domain or self.is_discrete_time_domain
+        varindex = names.index(var.name) if var is not None and \
+            var.name in names else None
+
+        if varindex is not None and is_time and self.is_causal:
+            response[args[varindex].real < 0] = 0
+
+        # Patch up NaN and inf values using the limit with respect to
+        # the domain variable, for example, for sin(t) / t.
+        if varindex is not None:
+            for index in zip(*np.nonzero(~np.isfinite(response))):
+                subs = {param: arg1[index] for param, arg1 in
+                        zip(params, args) if param != params[varindex]}
+                result = expr.subs(subs).limit(params[varindex],
+                                               args[varindex][index])
+                try:
+                    response[index] = complex(result)
+                except TypeError:
+                    pass
+
+        if np.allclose(response.imag, 0.0):
+            response = response.real
+        if response.ndim == 0:
+            return response.item()
+        return response
+
     def has(self, *patterns):
         """Test whether any subexpressions matches any of the patterns.  For example,
          V.has(exp(t))
@@ -4149,6 +4103,326 @@ As a workaround use x.as_expr() %s y.as_expr()""" % op)
         return self.__class__(result)
 
 
+def _scalar_functions():
+    """Return dictionary of functions for lambdify to evaluate an
+    expression for a scalar argument."""
+
+    import numpy as np
+
+    # For some reason the new lambdify will convert a float
+    # argument to complex
+
+    def besseli(mu, arg):
+        """Modified Bessel function."""
+
+        from scipy.special import iv
+        return iv(mu, arg)
+
+    def besselj(mu, arg):
+        """Bessel function."""
+
+        from scipy.special import jv
+        return jv(mu, arg)
+
+    def exp(arg):
+
+        # Hack to handle exp(-a * t) * Heaviside(t) for t < 0
+        # by trying to avoid inf when number overflows float.
+
+        if isinstance(arg, complex):
+            if arg.real > 500:
+                arg = 500 + 1j * arg.imag
+        elif arg > 500:
+            arg = 500
+
+        return np.exp(arg)
+
+    def rect(arg):
+        # Define in terms of Heaviside for consistency
+        return heaviside(arg + 0.5) - heaviside(arg - 0.5)
+
+    def sign(arg):
+        # Define in terms of Heaviside for consistency
+        return 2 * heaviside(arg) - 1
+
+    def dtsign(arg):
+        # Define in terms of unitstep for consistency
+        return 2 * unitstep(arg) - 1
+
+    def dtrect(arg):
+        # Define in terms of UnitStep for consistency
+        return unitstep(arg + 0.5) - unitstep(arg - 0.5)
+
+    def sinc(arg):
+        """SymPy sinc."""
+
+        # This is used for sinc created by sympify, e.g., a =
+        # expr('sinc(n)').  SymPy uses the unnormalized form
+        # but NumPy (and Lcapy) use the normalized form.
+        # Lambdify does some jiggery pokery and divides the
+        # arg by pi since it is expecting that the NumPy sinc
+        # function is going to be used.  SymPy's choice is
+        # unfortunate from a numerical accuracy point of view
+        # since sincn(n) should be zero for integer n, n != 0.
+
+        # Undo SymPy jiggery pokery.
+        arg = arg * np.pi
+
+        return 1.0 if arg == 0 else np.sin(np.pi * arg) / (np.pi * arg)
+
+    def sincn(arg):
+        """Normalized sinc."""
+
+        # Note, if sincn is made to print sinc, then lambdify will
+        # call sinc.   Grrrr.
+
+        return 1.0 if arg == 0 else np.sin(np.pi * arg) / (np.pi * arg)
+
+    def sincu(arg):
+        """Unnormalized sinc."""
+
+        return 1.0 if arg == 0 else np.sin(arg) / arg
+
+    def psinc(M, arg):
+        """Periodic sinc."""
+
+        D = np.sin(np.pi * arg)
+        return 1.0 if D == 0 else np.sin(M * np.pi * arg) / (M * D)
+
+    def trap(arg, alpha):
+
+        absarg = abs(arg)
+        foo = absarg - 0.5
+
+        if alpha == 0:
+            if arg < -0.5 or arg > 0.5:
+                return 0.0
+            return 1.0
+
+        if foo >= 0.5 * alpha:
+            return 0.0
+        elif foo <= -0.5 * alpha:
+            return 1.0
+        else:
+            return 0.5 - foo / alpha
+
+    def tri(arg):
+
+        if arg >= 1:
+            return 0.0
+        elif arg <= -1:
+            return 0.0
+        else:
+            return 1.0 - abs(arg)
+
+    def ramp(arg):
+
+        if arg >= 0:
+            return arg
+        return 0
+
+    def rampstep(arg):
+
+        if arg < 0:
+            return 0
+        elif arg > 1:
+            return 1
+        else:
+            return arg
+
+    def dirac(arg):
+        return np.inf if arg == 0.0 else 0.0
+
+    def unitimpulse(arg):
+        return 1.0 if arg == 0 else 0.0
+
+    def unitstep(arg, zero=None):
+        if arg == 0:
+            if zero is None:
+                zero = rcParams['functions.unitstep_zero']
+            return zero
+        return 1.0 if arg >= 0 else 0.0
+
+    def heaviside(arg, zero=None):
+        if arg == 0:
+            if zero is None:
+                zero = rcParams['functions.heaviside_zero']
+            return zero
+        return 1.0 if arg > 0.0 else 0.0
+
+    def sqrt(arg):
+        # Large numbers get converted to ints and int has no sqrt
+        # attribute so convert to float.
+        if isinstance(arg, int):
+            arg = float(arg)
+        if not isinstance(arg, complex) and arg < 0:
+            arg = arg + 0j
+        return np.sqrt(arg)
+
+    # For negative arguments, np.sqrt will return Nan.
+    # np.lib.scimath.sqrt converts to complex but cannot be used
+    # for lamdification!
+    return {'DiracDelta': dirac,
+            'Heaviside': heaviside,
+            'UnitImpulse': unitimpulse,
+            'UnitStep': unitstep,
+            'dtrect': dtrect, 'dtsign': dtsign,
+            'besseli': besseli, 'besselj': besselj,
+            'sinc': sinc, 'sincn': sincn,
+            'sincu': sincu, 'psinc': psinc,
+            'rect': rect, 'tri': tri, 'trap': trap,
+            'ramp': ramp, 'rampstep': rampstep,
+            'sqrt': sqrt, 'exp': exp, 'sign': sign}
+
+
+def _vector_functions():
+    """Return dictionary of functions for lambdify to evaluate an
+    expression for a NumPy array argument in a single call.  These
+    mirror the functions returned by `_scalar_functions`."""
+
+    import numpy as np
+    from scipy.special import iv, jv
+
+    def besseli(mu, arg):
+        return iv(mu, arg)
+
+    def besselj(mu, arg):
+        return jv(mu, arg)
+
+    def exp(arg):
+        arg = np.asarray(arg)
+        if np.iscomplexobj(arg):
+            arg = np.minimum(arg.real, 500) + 1j * arg.imag
+        else:
+            arg = np.minimum(arg, 500)
+        return np.exp(arg)
+
+    def rect(arg):
+        return heaviside(arg + 0.5) - heaviside(arg - 0.5)
+
+    def sign(arg):
+        return 2 * heaviside(arg) - 1
+
+    def dtsign(arg):
+        return 2 * unitstep(arg) - 1
+
+    def dtrect(arg):
+        return unitstep(arg + 0.5) - unitstep(arg - 0.5)
+
+    def sincn(arg):
+        arg = np.asarray(arg)
+        return np.where(arg == 0, 1.0,
+                        np.sin(np.pi * arg) / (np.pi * arg))
+
+    def sinc(arg):
+        # Undo SymPy jiggery pokery; see _scalar_functions.
+        return sincn(arg * np.pi)
+
+    def sincu(arg):
+        arg = np.asarray(arg)
+        return np.where(arg == 0, 1.0, np.sin(arg) / arg)
+
+    def psinc(M, arg):
+        D = np.sin(np.pi * arg)
+        return np.where(D == 0, 1.0, np.sin(M * np.pi * arg) / (M * D))
+
+    def trap(arg, alpha):
+        arg = np.asarray(arg)
+        if alpha == 0:
+            return np.where((arg < -0.5) | (arg > 0.5), 0.0, 1.0)
+
+        foo = abs(arg) - 0.5
+        return np.where(foo >= 0.5 * alpha, 0.0,
+                        np.where(foo <= -0.5 * alpha, 1.0,
+                                 0.5 - foo / alpha))
+
+    def tri(arg):
+        arg = np.asarray(arg)
+        return np.where((arg >= 1) | (arg <= -1), 0.0, 1.0 - abs(arg))
+
+    def ramp(arg):
+        arg = np.asarray(arg)
+        return np.where(arg >= 0, arg, 0)
+
+    def rampstep(arg):
+        arg = np.asarray(arg)
+        return np.where(arg < 0, 0, np.where(arg > 1, 1, arg))
+
+    def dirac(arg):
+        return np.where(np.asarray(arg) == 0, np.inf, 0.0)
+
+    def unitimpulse(arg):
+        return np.where(np.asarray(arg) == 0, 1.0, 0.0)
+
+    def unitstep(arg, zero=None):
+        if zero is None:
+            zero = rcParams['functions.unitstep_zero']
+        arg = np.asarray(arg)
+        return np.where(arg == 0, zero, np.where(arg >= 0, 1.0, 0.0))
+
+    def heaviside(arg, zero=None):
+        if zero is None:
+            zero = rcParams['functions.heaviside_zero']
+        arg = np.asarray(arg)
+        return np.where(arg == 0, zero, np.where(arg > 0, 1.0, 0.0))
+
+    def sqrt(arg):
+        return np.sqrt(np.asarray(arg, dtype=complex))
+
+    return {'DiracDelta': dirac,
+            'Heaviside': heaviside,
+            'UnitImpulse': unitimpulse,
+            'UnitStep': unitstep,
+            'dtrect': dtrect, 'dtsign': dtsign,
+            'besseli': besseli, 'besselj': besselj,
+            'sinc': sinc, 'sincn': sincn,
+            'sincu': sincu, 'psinc': psinc,
+            'rect': rect, 'tri': tri, 'trap': trap,
+            'ramp': ramp, 'rampstep': rampstep,
+            'sqrt': sqrt, 'exp': exp, 'sign': sign}
+
+
+# Cache of lambdified functions keyed by the srepr of the expression
+# and variable, since lambdify is slow.
+_lambdify_cache = OrderedDict()
+_lambdify_cache_size = 256
+
+
+def _lambdify_evaluate(expr, var, vector=False):
+    """Return function that evaluates `expr` for a scalar value of
+    `var` or, if `vector` is True, for an array of values of `var`.
+    `var` can be a tuple of symbols for a function of many
+    arguments.  Rational functions with numerical coefficients are evaluated for
+    arrays using their polynomial coefficients rather than with
+    lambdify."""
+
+    key = (sym.srepr(expr), sym.srepr(var), vector,
+           rcParams['evaluate.backend'])
+    try:
+        func = _lambdify_cache[key]
+        _lambdify_cache.move_to_end(key)
+        return func
+    except KeyError:
+        pass
+
+    modules = ["scipy", "numpy", "math", "sympy"]
+    if not vector:
+        func = lambdify(var, expr, [_scalar_functions()] + modules)
+    else:
+        try:
+            if isinstance(var, tuple):
+                raise ValueError('Multiple arguments')
+            func = RatfunEvaluator(expr, var)
+        except ValueError:
+            func = lambdify(var, expr, [_vector_functions()] + modules)
+            func = compile_function(expr, var, func)
+
+    _lambdify_cache[key] = func
+    if len(_lambdify_cache) > _lambdify_cache_size:
+        _lambdify_cache.popitem(last=False)
+    return func
+
+
 def exprcontainer(arg, **assumptions):
 
     from numpy import ndarray
@@ -0,0 +1,272 @@
+"""
+This module implements simulation of linear time-invariant circuits
+by exact discretization of their state-space representation.
+
+Copyright 2026 Michael Hayes, UCECE
+"""
+
+from .simulator import SimulationResultsNode, SimulationResultsCpt
+from .sym import tsym
+
+__all__ = ('LTISimulator', )
+
+
+def _to_array(M, name):
+
+    from numpy import array
+
+    M = M.sympy
+    symbols = M.free_symbols
+    if symbols != set():
+        raise ValueError(
+            'Undefined symbols %s in %s matrix; use subs to replace with numerical values' % (symbols, name))
+    return array(M).astype(float)
+
+
+class LTISimulationResults(object):
+    """This class stores the results of an `LTISimulator` simulation.
+    `x` is an array of the state variables (the inductor currents and
+    capacitor voltages) with a row for each state variable and `y` is
+    an array of the outputs (the node voltages followed by the branch
+    currents) with a row for each output."""
+
+    def __init__(self, tv, cct, x, y, node_names, branch_names):
+
+        self.t = tv
+        self.cct = cct
+        self.x = x
+        self.y = y
+        self.node_names = node_names
+        self.branch_names = branch_names
+
+    def __getitem__(self, name):
+        """Return element or node by name."""
+
+        cct = self.cct
+
+        # If name is an integer, convert to a string.
+        if isinstance(name, int):
+            name = '%d' % name
+
+        if name in cct.nodes:
+            return SimulationResultsNode(self._node_voltage_get(name))
+
+        if name in cct._elements:
+            return SimulationResultsCpt(self._cpt_voltage_get(name),
+                                        self._cpt_current_get(name))
+
+        raise AttributeError('Unknown element or node name %s' % name)
+
+    def __getattr__(self, attr):
+        """Return element or node by name."""
+
+        return self.__getitem__(attr)
+
+    def _node_voltage_get(self, n):
+
+        from numpy import zeros_like
+
+        n = self.cct.node_map.get(n, n)
+        if n == '0':
+            return zeros_like(self.t)
+        return self.y[self.node_names.index(n)]
+
+    def _cpt_voltage_get(self, cptname):
+
+        cpt = self.cct.elements[cptname]
+
+        v1 = self._node_voltage_get(cpt.node_names[0])
+        v2 = self._node_voltage_get(cpt.node_names[1])
+        return v1 - v2
+
+    def _cpt_current_get(self, cptname):
+
+        if cptname not in self.branch_names:
+            raise ValueError('Current through %s not known' % cptname)
+        index = len(self.node_names) + self.branch_names.index(cptname)
+        return self.y[index]
+
+
+class LTISimulator(object):
+    """This class simulates a linear time-invariant circuit using its
+    state-space representation
+
+    dx/dt = A x + B u
+    y = C x + D u
+
+    For a timestep dt, the state transition over a step is found
+    exactly from the matrix exponential of an augmented matrix.  With
+    a zero-order hold (ZOH) of the inputs,
+
+    x[k + 1] = Ad x[k] + Bd u[k]
+
+    where Ad = exp(A dt) and Bd = int_0^dt exp(A tau) dtau B.  Unlike
+    the companion models of `Simulator`, there is no integration error
+    so large timesteps can be used for smooth inputs.
+
+    The state-space representation is found symbolically so all the
+    component values need to be numerical.  Here's an example of use:
+
+    cct = Circuit('circuit.sch')
+    sim = LTISimulator(cct)
+    t = np.linspace(0, 1, 100)
+    results = sim(t)
+
+    plot(t, results.C1.v)
+
+    """
+
+    def __init__(self, cct):
+
+        self.cct = cct
+
+        self.node_names = [node for node in cct.node_list if node != '0']
+        self.branch_names = list(cct.branch_list)
+
+        ss = cct.state_space(self.node_names, self.branch_names)
+        self.ss = ss
+
+        self.A = _to_array(ss.A, 'A')
+        self.B = _to_array(ss.B, 'B')
+        self.C = _to_array(ss.C, 'C')
+        self.D = _to_array(ss.D, 'D')
+        self.x0 = _to_array(ss.x0, 'x0')[:, 0]
+        self.u = list(ss.u.sympy)
+
+        # Discretized matrices keyed by (method, dt).
+        self._discretized = {}
+
+    def discretize(self, dt, method='zoh'):
+        """Return the tuple (Ad, Bd0, Bd1) of the discretized state
+        transition and input matrices for the timestep `dt`, where
+
+        x[k + 1] = Ad x[k] + Bd0 u[k] + Bd1 u[k + 1]
+
+        For the zero-order hold ('zoh') method, Bd1 is zero.  For the
+        first-order hold ('foh') method, the inputs are linearly
+        interpolated between the samples."""
+
+        from numpy import eye, zeros
+        from scipy.linalg import expm
+
+        key = (method, dt)
+        if key in self._discretized:
+            return self._discretized[key]
+
+        Nx, Nu = self.B.shape
+
+        if method == 'zoh':
+            M = zeros((Nx + Nu, Nx + Nu))
+            M[0:Nx, 0:Nx] = self.A
+            M[0:Nx, Nx:] = self.B
+            E = expm(M * dt)
+            Ad = E[0:Nx, 0:Nx]
+            Bd0 = E[0:Nx, Nx:]
+            Bd1 = zeros((Nx, Nu))
+        elif method == 'foh':
+            M = zeros((Nx + 2 * Nu, Nx + 2 * Nu))
+            M[0:Nx, 0:Nx] = self.A * dt
+            M[0:Nx, Nx:Nx + Nu] = self.B * dt
+            M[Nx:Nx + Nu, Nx + Nu:] = eye(Nu)
+            E = expm(M)
+            Ad = E[0:Nx, 0:Nx]
+            Gamma1 = E[0:Nx, Nx:Nx + Nu]
+            Gamma2 = E[0:Nx, Nx + Nu:]
+            Bd0 = Gamma1 - Gamma2
+            Bd1 = Gamma2
+        else:
+            raise ValueError('Unknown method ' + method)
+
+        self._discretized[key] = Ad, Bd0, Bd1
+        return Ad, Bd0, Bd1
+
+    def _u_eval(self, tv):
+        """Evaluate the inputs for all the times `tv`.  This returns an
+        array with a row for each input."""
+
+        from numpy import broadcast_to, zeros
+        from .expr import expr
+
+        uv = zeros((len(self.u), len(tv)))
+        for m, value in enumerate(self.u):
+            symbols = value.free_symbols - {tsym}
+            if symbols != set():
+                raise ValueError(
+                    'Undefined symbols %s in inputs; use subs to replace with numerical values' % symbols)
+            if not value.has(tsym):
+                uv[m] = float(value)
+                continue
+            uv[m] = broadcast_to(expr(value).evaluate(tv), len(tv)).real
+        return uv
+
+    def _recurse(self, Ad, w, x0):
+        """Return the states x[k] for x[k + 1] = Ad x[k] + w[k] and
+        x[0] = x0.  If Ad is diagonalizable, the recursion is
+        decoupled into a first-order IIR filter for each mode;
+        otherwise the steps are performed explicitly."""
+
+        from numpy import concatenate, empty
+        from numpy.linalg import cond, eig, solve
+        from scipy.signal import lfilter
+
+        Nx = len(x0)
+        # Treat the initial state as an impulse input.
+        g = concatenate((x0[:, None], w), axis=1)
+
+        lam, V = eig(Ad)
+        if cond(V) < 1e8:
+            z = solve(V, g)
+            for m in range(Nx):
+                z[m] = lfilter([1], [1, -lam[m]], z[m])
+            return (V @ z).real
+
+        x = empty(g.shape)
+        x[:, 0] = x0
+        for k in range(1, g.shape[1]):
+            x[:, k] = Ad @ x[:, k - 1] + g[:, k]
+        return x
+
+    def __call__(self, tv, method='zoh'):
+        """Simulate the circuit at the uniformly spaced vector of times
+        `tv` and return an `LTISimulationResults` object.
+
+        With the default zero-order hold method ('zoh'), the inputs
+        are held at their values at the midpoints of the steps.  This
+        is exact for inputs that are constant between the times, such
+        as steps at the times.  With the first-order hold method
+        ('foh'), the inputs are linearly interpolated between their
+        values at the times.  This is exact for inputs that are
+        piecewise linear between the times.
+
+        The initial state is given by the initial conditions of the
+        capacitors and inductors (zero if not specified)."""
+
+        from numpy import array, diff, zeros
+
+        tv = array(tv, dtype=float)
+        if len(tv) < 2:
+            raise ValueError('Need at least two times')
+
+        dt = (tv[-1] - tv[0]) / (len(tv) - 1)
+        if abs(diff(tv) - dt).max() > 1e-9 * abs(dt):
+            raise ValueError('Times must be uniformly spaced')
+        # Round the timestep so that the discretization is reused
+        # despite floating point errors in the times.
+        dt = float('%.12g' % dt)
+
+        Ad, Bd0, Bd1 = self.discretize(dt, method)
+
+        uv = self._u_eval(tv)
+        if method == 'zoh':
+            w = Bd0 @ self._u_eval(tv[0:-1] + 0.5 * dt)
+        else:
+            w = Bd0 @ uv[:, 0:-1] + Bd1 @ uv[:, 1:]
+
+        if len(self.x0) == 0:
+            x = zeros((0, len(tv)))
+        else:
+            x = self._recurse(Ad, w, self.x0)
+
+        y = self.C @ x + self.D @ uv
+        return LTISimulationResults(tv, self.cct, x, y, self.node_names,
+                                    self.branch_names)
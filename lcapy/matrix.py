@@ -317,15 +317,19 @@ def matrix(mat):
 
 def matrix_inverse(M, method='default'):
 
+    if method == 'default':
+        method = rcParams['sympy.matrix.inverse']
+
+    if method == 'auto':
+        from .solverselector import solver_selector
+        return solver_selector.inverse(M)
+
     N = M.shape[0]
     if N >= 10:
         warn("""
 This may take a while...  A symbolic matrix inversion is O(%d^3) for a matrix
 of size %dx%d""" % (N, N, N))
 
-    if method == 'default':
-        method = rcParams['sympy.matrix.inverse']
-
     if method == 'GE':
         try:
             from sympy.matrices import dotprodsimp
@@ -357,11 +361,18 @@ of size %dx%d""" % (N, N, N))
     return M.inv(method=method)
 
 
-def matrix_solve(M, b, method='default'):
+def matrix_solve(M, b, method='default', candidates=None):
+    """Solve M x = b for x using the SymPy `method`.  If `method`
+    is 'auto', the method is chosen from `candidates` (default all)
+    by `solver_selector`."""
 
     if method == 'default':
         method = rcParams['sympy.solver']
 
+    if method == 'auto':
+        from .solverselector import solver_selector
+        return solver_selector.solve(M, b, candidates)
+
     if method == 'DM':
         try:
             sol_num, sol_den = M.to_DM().solve_den(b.to_DM())
@@ -37,6 +37,96 @@ class Branchdict(ExprDict):
     pass
 
 
+def _solve_worker(netlist, kinds, solver_method, params):
+    """Solve the MNA equations for the subnetlists of `netlist` for
+    each of `kinds` in a separate process.  These subnetlists have
+    the same A matrix."""
+
+    from .circuit import Circuit
+    from .rcparams import rcParams
+    from .subnetlist import SubNetlist
+
+    for key, value in params.items():
+        rcParams[key] = value
+
+    cct = Circuit(netlist)
+    cct.solver_method = solver_method
+    solve_cache = MNASolveCache()
+    subs = [SubNetlist(cct, kind, solve_cache) for kind in kinds]
+    return [sub.mna._unknowns_solve() for sub in subs]
+
+
+class MNASolveCache(object):
+    """This class shares the solution of the MNA equations between
+    subnetlists that have the same A matrix, for example, the
+    subnetlists for each noise source.  The Z vectors for all the
+    unsolved subnetlists are solved together when the first one is
+    solved.  Thus the A matrix is only factored once."""
+
+    def __init__(self):
+
+        self.mnas = []
+
+    def add(self, mna):
+
+        mna.solve_cache = self
+        self.mnas.append(mna)
+
+    def solve(self, mna):
+        """Return vector of unknowns for `mna`."""
+
+        if hasattr(mna, '_unknowns'):
+            return mna._unknowns
+
+        key = mna._solve_key()
+        pending = [mna]
+        for mna1 in self.mnas:
+            if (mna1 is not mna and not hasattr(mna1, '_unknowns')
+                    and mna1._solve_key() == key):
+                pending.append(mna1)
+
+        Xs = mna._multi_solve([mna1._Z for mna1 in pending])
+        for mna1, X in zip(pending, Xs):
+            mna1._unknowns = X
+        return mna._unknowns
+
+    def parallel_solve(self, netlist, solver_method, workers):
+        """Solve the MNA equations for all the subnetlists in a pool of
+        `workers` processes.  `netlist` is the string representation
+        of the netlist used to recreate the subnetlists in each
+        process.  Subnetlists with the same A matrix are solved in
+        the same process.  The solutions are stored in the order the
+        subnetlists were added so the results are deterministic."""
+
+        from concurrent.futures import ProcessPoolExecutor
+        from .rcparams import rcParams
+
+        groups = {}
+        for mna in self.mnas:
+            if hasattr(mna, '_unknowns'):
+                continue
+            key = mna._solve_key()
+            if key not in groups:
+                groups[key] = []
+            groups[key].append(mna)
+        if len(groups) < 2:
+            return
+
+        params = {key: rcParams[key] for key in
+                  ('mna.backend', 'mna.numeric_threshold',
+                   'sympy.solver', 'sympy.matrix.inverse',
+                   'sympy.solver.race', 'sympy.solver.race_timeout')}
+
+        with ProcessPoolExecutor(min(workers, len(groups))) as executor:
+            futures = [executor.submit(_solve_worker, netlist,
+                                       [mna.kind for mna in mnas],
+                                       solver_method, params)
+                       for mnas in groups.values()]
+            for mnas, future in zip(groups.values(), futures):
+                for mna, X in zip(mnas, future.result()):
+                    mna._unknowns = X
+
+
 class MNA(object):
     """This class performs modified nodal analysis (MNA) on a netlist of
     components.  There are several variants:
@@ -69,6 +159,7 @@ class MNA(object):
         self.cct = cct
         self.kind = cct.kind
         self.solver_method = solver_method
+        self.solve_cache = None
 
         if cct.elements == {}:
             raise ValueError('No elements to analyse')
@@ -106,30 +197,126 @@ class MNA(object):
         num_nodes = len(self.cct.node_list) - 1
         num_branches = len(self.unknown_branch_currents)
 
-        self._G = sym.zeros(num_nodes, num_nodes)
-        self._B = sym.zeros(num_nodes, num_branches)
-        self._C = sym.zeros(num_branches, num_nodes)
-        self._D = sym.zeros(num_branches, num_branches)
+        self._G = self._zeros(num_nodes, num_nodes)
+        self._B = self._zeros(num_nodes, num_branches)
+        self._C = self._zeros(num_branches, num_nodes)
+        self._D = self._zeros(num_branches, num_branches)
 
-        self._Is = sym.zeros(num_nodes, 1)
-        self._Es = sym.zeros(num_branches, 1)
+        self._Is = self._zeros(num_nodes, 1)
+        self._Es = self._zeros(num_branches, 1)
 
         # Iterate over circuit elements and fill in matrices.
         for elt in self.cct.elements.values():
             if not elt.nosim:
                 elt._stamp(self)
 
+        self._assemble()
+
+    def _assemble(self):
+
         # Augment the admittance matrix to form A matrix.
         self._A = self._G.row_join(self._B).col_join(self._C.row_join(self._D))
         # Augment the known current vector with known voltage vector
         # to form Z vector.
         self._Z = self._Is.col_join(self._Es)
 
+    def _zeros(self, rows, cols):
+        """Create matrix to hold the stamps."""
+
+        return sym.zeros(rows, cols)
+
     def _invalidate(self):
-        for attr in ('_A', '_Vdict', '_Idict'):
+        """Remove the solution but keep the stamps."""
+
+        for attr in ('_Vdict', '_Idict', '_unknowns'):
             if hasattr(self, attr):
                 delattr(self, attr)
 
+    def _cpt_stamps(self, cpt):
+        """Return list of the contributions of `cpt` to the G, B, C, D,
+        Is, and Es matrices."""
+
+        attrs = ('_G', '_B', '_C', '_D', '_Is', '_Es')
+        saved = [getattr(self, attr) for attr in attrs]
+        for attr, M in zip(attrs, saved):
+            setattr(self, attr, self._zeros(*M.shape))
+
+        try:
+            if not cpt.nosim:
+                cpt._stamp(self)
+            stamps = [getattr(self, attr) for attr in attrs]
+        finally:
+            for attr, M in zip(attrs, saved):
+                setattr(self, attr, M)
+        return stamps
+
+    def _A_update(self, dA):
+        """This is called after the A matrix has been changed by `dA`
+        due to a component update."""
+        pass
+
+    def update(self, name, value):
+        """Change the value of component `name` to `value` without
+        re-creating the netlist.  The old stamp of the component is
+        subtracted and the new stamp is added in place; only the
+        solution is invalidated.  This is much faster than using
+        `subs()` and re-solving for one-component what-if analysis.
+
+        For example,
+
+        >>> mna = cct.modified_nodal_analysis()
+        >>> mna.update('R1', 2000)
+        >>> mna.Vdict['2']
+        """
+
+        cct = self.cct
+        if name not in cct.elements:
+            raise ValueError('Unknown component %s' % name)
+        cpt = cct.elements[name]
+
+        for elt in cct.elements.values():
+            if elt.type == 'K' and name in (elt.Lname1, elt.Lname2):
+                raise ValueError('Cannot update %s since it is coupled by %s'
+                                 % (name, elt.name))
+
+        args = list(cpt.args)
+        args[0] = value
+        net = cpt._netmake(args=args)
+
+        # Select the sources for this analysis kind.  The new
+        # component is not attached to the netlist until its stamps
+        # have been found.
+        net = cct.parser.parse(net)._select(self.kind)
+        newcpt = cct.parser.parse(net)
+
+        if (newcpt.type != cpt.type or newcpt.node_names != cpt.node_names
+                or newcpt.need_branch_current != cpt.need_branch_current):
+            raise ValueError('Incompatible update for %s' % name)
+
+        newcpt.cct = cct
+        attrs = ('_G', '_B', '_C', '_D', '_Is', '_Es')
+        old = self._cpt_stamps(cpt)
+        new = self._cpt_stamps(newcpt)
+
+        # Replace the old component in the netlist.  The new
+        # component is attached first so that the nodes are not
+        # deleted.  Since the old component was attached earlier, it
+        # is the one removed.
+        newcpt.nodes = [cct.nodes.add(node_name, newcpt, cct)
+                        for node_name in newcpt.node_names]
+        newcpt.relnodes = newcpt.nodes
+        for node in cpt.nodes:
+            node.remove(cpt)
+        cct._elements[name] = newcpt
+
+        for attr, M1, M2 in zip(attrs, old, new):
+            setattr(self, attr, getattr(self, attr) - M1 + M2)
+
+        A = self._A
+        self._assemble()
+        self._A_update(self._A - A)
+        self._invalidate()
+
     def _cpt_node_indexes(self, cpt):
 
         return [self._node_index(n) for n in cpt.node_names]
@@ -189,16 +376,8 @@ class MNA(object):
 
         return message + '\n    ' + '\n    '.join(reasons)
 
-    def _solve(self):
-        """Solve network.  This does not simplify the results."""
-
-        if hasattr(self, '_Vdict'):
-            return
-
-        cct = self.cct
-
-        if '0' not in cct.node_map:
-            raise ValueError('No ground node specified.')
+    def _solver_method(self):
+        """Return method used to solve the MNA equations."""
 
         solver_method = self.solver_method
         # Hack to overcome simplification of sqrt with noise circuits
@@ -212,14 +391,64 @@ class MNA(object):
             # LU suffers from similar problems and can make a dog's breakfast
             # ADJ seems robust but is slower than GE.
             solver_method = 'ADJ'
+        return solver_method
+
+    def _solver_candidates(self):
+        """Return tuple of methods that the 'auto' solver method can
+        choose from or None for all the methods."""
+
+        # LU and GE produce poorly simplified results for noise
+        # circuits; see _solver_method.
+        if isinstance(self.kind, str) and self.kind[0] == 'n':
+            return ('DM', 'ADJ')
+        return None
+
+    def _solve_key(self):
+        """Return key identifying the A matrix and solver method.  MNA
+        objects with the same key can share a solution."""
+
+        return (type(self), sym.ImmutableMatrix(self._A),
+                self._solver_method())
+
+    def _multi_solve(self, Zs):
+        """Solve for the vectors of unknowns for each of the Z vectors
+        in the list `Zs` using a single multiple right hand side
+        solve."""
+
+        Z = Zs[0]
+        for Z1 in Zs[1:]:
+            Z = Z.row_join(Z1)
 
         # Solve for the nodal voltages
         try:
-            results = matrix_solve(self._A, self._Z, method=solver_method)
+            X = matrix_solve(self._A, Z, method=self._solver_method(),
+                             candidates=self._solver_candidates())
         except ValueError:
             message = self._failure_reasons()
             raise ValueError(message)
 
+        return [X[:, m] for m in range(len(Zs))]
+
+    def _unknowns_solve(self):
+        """Solve for the vector of unknowns (node voltages and branch
+        currents)."""
+
+        if self.solve_cache is not None:
+            return self.solve_cache.solve(self)
+        return self._multi_solve([self._Z])[0]
+
+    def _solve(self):
+        """Solve network.  This does not simplify the results."""
+
+        if hasattr(self, '_Vdict'):
+            return
+
+        cct = self.cct
+
+        if '0' not in cct.node_map:
+            raise ValueError('No ground node specified.')
+
+        results = self._unknowns_solve()
         results = results.subs(cct.context.symbols)
 
         # Handle capacitors at DC by assuming an infinite resistance
@@ -511,6 +511,19 @@ class Cpt(ImmittanceMixin):
         """Return True if component is a source (dependent or independent)"""
         return self.is_dependent_source or self.is_independent_source
 
+    @property
+    def has_symbolic_value(self):
+        """Return True if any of the component's arguments is not a
+        numerical constant."""
+
+        for arg in self.args:
+            if arg is None:
+                # Initial condition for C and L.
+                continue
+            if not expr(arg).is_constant:
+                return True
+        return False
+
     @property
     def _source_IV(self):
 
@@ -1233,6 +1246,18 @@ class C(RC):
 
         return rnet + '\n' + vnet
 
+    def _r_model_norton(self):
+        """Return Norton resistive model.  The companion conductance and
+        current source are stamped numerically by the simulator so a
+        placeholder current source is used to keep the nodes."""
+
+        opts = self.opts.copy()
+        opts.strip_voltage_labels()
+        opts.strip_current_labels()
+        return self._netmake_variant('I', suffix='eq',
+                                     args=('dc', 'I%seq' % self.name),
+                                     opts=opts)
+
     def _ss_model(self):
         # Perhaps mangle name to ensure it does not conflict
         # with another voltage source?
@@ -1751,6 +1776,18 @@ class L(RLC):
 
         return rnet + '\n' + vnet
 
+    def _r_model_norton(self):
+        """Return Norton resistive model.  The companion conductance and
+        current source are stamped numerically by the simulator so a
+        placeholder current source is used to keep the nodes."""
+
+        opts = self.opts.copy()
+        opts.strip_voltage_labels()
+        opts.strip_current_labels()
+        return self._netmake_variant('I', suffix='eq',
+                                     args=('dc', 'I%seq' % self.name),
+                                     opts=opts)
+
     @property
     def I0(self):
         """Initial current (for capacitors only)."""
@@ -2041,6 +2078,41 @@ class SW(TimeVarying):
         else:
             raise RuntimeError('Internal error, unhandled switch %s' % self)
 
+    def _switch_branches(self):
+        """Return list of tuples (name, closed) for the zero voltage
+        sources of the resistive model, where `closed` is True if the
+        source is a short-circuit when the switch is active."""
+
+        kind = self.__class__.__name__
+        name = self.namespace + 'V' + self.relname
+
+        if kind in ('SW', 'SWno', 'SWpush'):
+            return [(name + 'sw', True)]
+        elif kind in ('SWnc', ):
+            return [(name + 'sw', False)]
+        elif kind in ('SWspdt', ):
+            mirror = 'mirror' in self.opts
+            return [(name + 'sw1', mirror), (name + 'sw2', not mirror)]
+        else:
+            raise RuntimeError('Internal error, unhandled switch %s' % self)
+
+    def _r_model_switch(self):
+        """Return resistive model of switch for the simulator.  The
+        switch is replaced by zero voltage sources that the simulator
+        converts to open-circuits depending on the state of the
+        switch."""
+
+        opts = self.opts.copy()
+        opts.strip_voltage_labels()
+        opts.strip_current_labels()
+
+        nets = []
+        for m, (name, closed) in enumerate(self._switch_branches()):
+            nodes = (self.relnodes[0], self.relnodes[m + 1])
+            nets.append(self._netmake1(name, nodes=nodes, args=('dc', 0),
+                                       opts=opts, ignore_keyword=True))
+        return '\n'.join(nets)
+
 
 class TF(Cpt):
     """Transformer"""
@@ -2246,6 +2318,45 @@ class TL(Cpt):
 
         mna._D[m, m] += A12
 
+    def _bergeron(self):
+        """Return tuple (Z0, T, a) for the method of characteristics
+        (Bergeron) model of the line, where Z0 is the characteristic
+        impedance, T is the delay, and a is the attenuation factor.
+        These are found from the high-frequency limits of the
+        characteristic impedance and propagation constant.  The model
+        is exact for lossless and distortionless lines and is an
+        approximation for low-loss lines."""
+
+        from .sym import ssym
+
+        cpt = self.cpt
+        gamma = cpt.gamma.sympy * cpt.l.sympy
+
+        T = sym.limit(gamma / ssym, ssym, sym.oo)
+        alpha = sym.limit(gamma - T * ssym, ssym, sym.oo)
+        Z0 = sym.limit(cpt.Z0.sympy, ssym, sym.oo)
+        return Z0, T, sym.exp(-alpha)
+
+    def _r_model(self):
+        """Return resistive model.  Each end of the line is modelled by
+        its characteristic impedance in parallel with a current source
+        that depends on the voltage and current at the other end of
+        the line one delay earlier.  The current sources are stamped
+        numerically by the simulator."""
+
+        Z0, T, a = self._bergeron()
+
+        opts = self.opts.copy()
+        opts.strip_voltage_labels()
+        opts.strip_current_labels()
+        rnet1 = self._netmake_variant('R', suffix='a',
+                                      nodes=self.relnodes[0:2],
+                                      args=Z0, opts=opts)
+        rnet2 = self._netmake_variant('R', suffix='b',
+                                      nodes=self.relnodes[2:4],
+                                      args=Z0, opts=opts)
+        return rnet1 + '\n' + rnet2
+
 
 class Cable(Cpt):
     """Cable"""
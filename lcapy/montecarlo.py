@@ -0,0 +1,354 @@
+"""
+This module implements Monte Carlo tolerance analysis using batched
+numerical solution of the modified nodal analysis (MNA) equations.
+
+Copyright 2026 Michael Hayes, UCECE
+"""
+
+from .current import current_sign
+from .numericmna import SparseMNA
+from .sym import eps, ssym, omegasym
+import sympy as sym
+
+__all__ = ('MonteCarlo', )
+
+
+def _monte_carlo_worker(netlist, output, params, f, samples):
+    """Evaluate output for a chunk of samples in a separate process."""
+
+    from .circuit import Circuit
+
+    mc = MonteCarlo(Circuit(netlist), output, params, f)
+    return mc._evaluate(samples)
+
+
+class MonteCarloResults(object):
+    """This class stores the results of a Monte Carlo analysis.
+    `values` is an array of the output values with a row for each
+    sample (and a column for each frequency for AC analysis).
+    `samples` is a dictionary of the arrays of the sampled component
+    values keyed by component name."""
+
+    def __init__(self, f, values, samples):
+
+        self.f = f
+        self.values = values
+        self.samples = samples
+
+    @property
+    def n(self):
+        """Number of samples."""
+        return self.values.shape[0]
+
+    @property
+    def gain(self):
+        """Magnitude of the output."""
+
+        from numpy import abs
+
+        return abs(self.values)
+
+    @property
+    def dB(self):
+        """Magnitude of the output in dB."""
+
+        from numpy import log10
+
+        return 20 * log10(self.gain)
+
+    @property
+    def phase(self):
+        """Phase of the output (radians)."""
+
+        from numpy import angle
+
+        return angle(self.values)
+
+    @property
+    def phase_degrees(self):
+        """Phase of the output (degrees)."""
+
+        from numpy import angle
+
+        return angle(self.values, deg=True)
+
+    def _quantity(self, quantity):
+
+        if quantity == 'value':
+            if self.f is None:
+                return self.values.real
+            return self.values
+        elif quantity in ('gain', 'dB', 'phase', 'phase_degrees'):
+            return getattr(self, quantity)
+        raise ValueError('Unknown quantity %s' % quantity)
+
+    def mean(self, quantity='value'):
+        """Mean of `quantity`, where `quantity` is 'value', 'gain', 'dB',
+        'phase', or 'phase_degrees'."""
+
+        return self._quantity(quantity).mean(axis=0)
+
+    def std(self, quantity='value'):
+        """Standard deviation of `quantity`."""
+
+        return self._quantity(quantity).std(axis=0)
+
+    def percentiles(self, q=(0.5, 5, 50, 95, 99.5), quantity='gain'):
+        """Return array of percentiles `q` of `quantity`.  For AC
+        analysis, there is a column for each frequency."""
+
+        from numpy import percentile
+
+        return percentile(self._quantity(quantity), q, axis=0)
+
+    def histogram(self, quantity='gain', bins=50, index=0):
+        """Return histogram (counts, bin_edges) of `quantity`.  For AC
+        analysis, `index` specifies the frequency index."""
+
+        from numpy import histogram
+
+        values = self._quantity(quantity)
+        if values.ndim > 1:
+            values = values[:, index]
+        return histogram(values.real, bins=bins)
+
+
+class MonteCarlo(object):
+    """This class performs Monte Carlo tolerance analysis.  The
+    components with tolerances are replaced by symbols and the MNA
+    stamps are converted to NumPy functions of these symbols.  The MNA
+    equations are then solved for a batch of samples at once using
+    stacked dense matrices.
+
+    If `f` is None, DC analysis is performed.  Otherwise, AC analysis
+    is performed at the frequencies `f` (in hertz), as for `ac_sweep()`.
+
+    """
+
+    def __init__(self, cct, output, params, f=None):
+
+        from numpy import asarray, atleast_1d
+
+        cct = cct.expand()
+        if '0' not in cct.nodes:
+            raise ValueError('Nothing connected to ground node 0')
+
+        for param in params:
+            if param not in cct.elements:
+                raise ValueError('Unknown component %s' % param)
+
+        self.netlist = str(cct)
+        self.output = output
+        self.params = list(params)
+        self.defs = cct.defs()
+        if f is not None:
+            f = atleast_1d(asarray(f, dtype=float))
+        self.f = f
+
+        fixed = [name for name in cct.elements if name not in params]
+        scct = cct.sympify(ignore=fixed)
+
+        kind = 'dc' if f is None else 's'
+        self.sub = scct.select(kind)
+        self.mna = SparseMNA(self.sub, scct.solver_method)
+
+        symbols = {}
+        for symbol in self.mna._A.free_symbols | self.mna._Z.free_symbols:
+            symbols[str(symbol)] = symbol
+        self.symbols = [symbols.get(param, sym.Symbol(param))
+                        for param in params]
+        self.args = [ssym] + self.symbols
+
+        self.A_funcs = self._lambdify(self.mna._A)
+        self.w_funcs = self._lambdify(self._output_make(output))
+        self._Z_make(scct)
+
+    def _lambdify(self, M):
+        """Return list of (row, col, func) for the non-zero elements of
+        sparse matrix `M` where each func is a NumPy function of s and
+        the parameters."""
+
+        funcs = []
+        for (row, col), value in M.todok().items():
+            value = sym.sympify(value)
+            if value.has(eps):
+                value = value.subs(eps, 0)
+            unknown = value.free_symbols - set(self.args)
+            if unknown != set():
+                raise ValueError(
+                    'Undefined symbols %s; use subs to replace with numerical values' % unknown)
+            funcs.append((row, col, sym.lambdify(self.args, value, 'numpy')))
+        return funcs
+
+    def _output_make(self, output):
+        """Create the vector w, where the output is w^T x."""
+
+        sub = self.sub
+        mna = self.mna
+
+        N = mna._A.shape[0]
+        num_nodes = len(sub.node_list) - 1
+        w = sym.SparseMatrix.zeros(N, 1)
+
+        quantity, arg1, arg2 = sub._parse_output(output)
+        if quantity == 'V':
+            nodes = mna._node_index(arg1), mna._node_index(arg2)
+            scale = 1
+        elif arg1 in mna.unknown_branch_currents:
+            m = mna._branch_index(arg1) + num_nodes
+            w[m] = current_sign(1, sub.elements[arg1].is_source)
+            return w
+        elif sub.elements[arg1].type in ('R', 'NR', 'C', 'Y', 'Z'):
+            elt = sub.elements[arg1]
+            nodes = mna._cpt_node_indexes(elt)[0:2]
+            scale = 1 / elt.Z.sympy
+        else:
+            raise ValueError('Cannot determine current through %s' % arg1)
+
+        if nodes[0] >= 0:
+            w[nodes[0]] += scale
+        if nodes[1] >= 0:
+            w[nodes[1]] -= scale
+        return w
+
+    def _Z_make(self, scct):
+        """Create list of functions to evaluate the Z vector."""
+
+        if self.f is None:
+            self.Z_funcs = [(row, col, func, 's') for row, col, func
+                            in self._lambdify(self.mna._Z)]
+            return
+
+        # For AC analysis, use the AC sources at the sweep frequency
+        # and the s-domain sources; see ACSweep.
+        self.Z_funcs = []
+        for kind in scct.independent_source_groups(True):
+            if kind == 's':
+                Z, domain = self.mna._Z, 's'
+            elif not isinstance(kind, str):
+                Z, domain = SparseMNA(scct.select(kind), None)._Z, 'omega'
+                var = sym.sympify(kind)
+                if var.is_Symbol:
+                    Z = Z.subs(var, omegasym)
+                # Use s as a proxy for omega.
+                Z = Z.subs(omegasym, ssym)
+            else:
+                continue
+            for row, col, func in self._lambdify(Z):
+                self.Z_funcs.append((row, col, func, domain))
+
+    def _evaluate(self, samples):
+        """Return array of output values for the dictionary of arrays
+        of sampled parameter values."""
+
+        from numpy import broadcast_to, linalg, pi, zeros
+
+        values = [samples[param] for param in self.params]
+        n = len(values[0]) if values != [] else 1
+
+        N = self.mna._A.shape[0]
+        fv = [None] if self.f is None else self.f
+        results = zeros((n, len(fv)), dtype=complex)
+
+        # Limit the size of the stacked matrices to about 64 MB.
+        chunk = max(1, 2**22 // (N * N))
+
+        for k, f1 in enumerate(fv):
+            if f1 is None:
+                s1, omega1 = 0, 0
+            else:
+                s1, omega1 = 2j * pi * f1, 2 * pi * f1
+
+            for start in range(0, n, chunk):
+                args = [value[start:start + chunk] for value in values]
+                m = len(args[0]) if args != [] else 1
+
+                A = zeros((m, N, N), dtype=complex)
+                for row, col, func in self.A_funcs:
+                    A[:, row, col] = broadcast_to(func(s1, *args), (m, ))
+
+                Z = zeros((m, N), dtype=complex)
+                for row, col, func, domain in self.Z_funcs:
+                    x1 = s1 if domain == 's' else omega1
+                    Z[:, row] += broadcast_to(func(x1, *args), (m, ))
+
+                w = zeros((m, N), dtype=complex)
+                for row, col, func in self.w_funcs:
+                    w[:, row] = broadcast_to(func(s1, *args), (m, ))
+
+                try:
+                    X = linalg.solve(A, Z[:, :, None])[:, :, 0]
+                except linalg.LinAlgError:
+                    raise ValueError(self.mna._failure_reasons())
+                results[start:start + chunk, k] = (w * X).sum(axis=1)
+
+        if self.f is None:
+            results = results[:, 0]
+        return results
+
+    def samples(self, distributions, n, seed=None):
+        """Create dictionary of arrays of `n` random samples of the
+        component values, keyed by component name.
+
+        `distributions` is a dictionary keyed by component name.  The
+        values are tuples of the form (dist, nominal, tol) or (dist,
+        tol).  `dist` is 'normal' (where `tol` is the relative
+        standard deviation) or 'uniform' (where the values are in the
+        range nominal * (1 +/- tol)).  If `nominal` is not specified,
+        the component value in the netlist is used."""
+
+        from numpy.random import default_rng
+
+        rng = default_rng(seed)
+
+        samples = {}
+        for param in self.params:
+            spec = distributions[param]
+            if len(spec) == 2:
+                dist, tol = spec
+                if param not in self.defs:
+                    raise ValueError('No nominal value for %s' % param)
+                nominal = float(sym.sympify(self.defs[param]))
+            else:
+                dist, nominal, tol = spec
+
+            if dist == 'normal':
+                samples[param] = rng.normal(nominal, abs(nominal) * tol, n)
+            elif dist == 'uniform':
+                samples[param] = rng.uniform(nominal * (1 - tol),
+                                             nominal * (1 + tol), n)
+            else:
+                raise ValueError('Unknown distribution %s for %s' %
+                                 (dist, param))
+        return samples
+
+    def __call__(self, distributions, n=1000, seed=None, workers=None):
+        """Evaluate the output for `n` random samples of the component
+        values specified by `distributions` and return a
+        `MonteCarloResults` object.
+
+        If `workers` is an integer greater than one, the samples are
+        split between a pool of `workers` processes."""
+
+        samples = self.samples(distributions, n, seed)
+
+        if workers is None or workers <= 1:
+            values = self._evaluate(samples)
+            return MonteCarloResults(self.f, values, samples)
+
+        from concurrent.futures import ProcessPoolExecutor
+        from numpy import array_split, concatenate
+
+        splits = [array_split(samples[param], workers)
+                  for param in self.params]
+        chunks = [{param: split[m] for param, split in zip(self.params,
+                                                            splits)}
+                  for m in range(workers)]
+
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(_monte_carlo_worker, self.netlist,
+                                       self.output, self.params, self.f,
+                                       chunk) for chunk in chunks]
+            values = concatenate([future.result() for future in futures])
+
+        return MonteCarloResults(self.f, values, samples)
@@ -14,7 +14,7 @@ from .admittance import admittance
 from .current import Iname, current
 from .deprecation import LcapyDeprecationWarning
 from .expr import Expr, expr, ExprList
-from .mna import Nodedict, Branchdict
+from .mna import Nodedict, Branchdict, MNASolveCache
 from .mnacpts import Cpt
 from .netlistmixin import NetlistMixin
 from .netlistopsmixin import NetlistOpsMixin
@@ -111,8 +111,17 @@ class Netlist(NetlistOpsMixin, NetlistMixin, NetlistSimplifyMixin):
         groups = cct._analysis_groups()
         sub = TransformDomains()
 
+        # Subnetlists with the same A matrix, such as those for each
+        # noise source, share the solution of the MNA equations.
+        solve_cache = MNASolveCache()
         for kind, sources in groups.items():
-            sub[kind] = SubNetlist(cct, kind)
+            sub[kind] = SubNetlist(cct, kind, solve_cache)
+
+        # Optionally solve the subnetlists in a pool of processes.
+        workers = rcParams['analysis.workers']
+        if workers > 1 and len(sub) > 1:
+            solve_cache.parallel_solve(str(cct), self.solver_method,
+                                       workers)
 
         if sub == {} and not nowarn:
             warn('Netlist has no sources')
@@ -153,6 +162,19 @@ class Netlist(NetlistOpsMixin, NetlistMixin, NetlistSimplifyMixin):
         self._sim = Simulator(self)
         return self._sim
 
+    @property
+    def ltisim(self):
+        """Generate simulation object using exact discretization of the
+        state-space representation.  See `LTISimulator`."""
+
+        if hasattr(self, '_ltisim'):
+            return self._ltisim
+
+        from .ltisimulator import LTISimulator
+
+        self._ltisim = LTISimulator(self)
+        return self._ltisim
+
     @property
     def ss(self):
         """Generate state-space representation.  See also `state_space()`"""
@@ -360,6 +382,139 @@ class Netlist(NetlistOpsMixin, NetlistMixin, NetlistSimplifyMixin):
 
         return self.select(omega)
 
+    def compile(self, outputs, params=None, domain='t'):
+        """Solve the netlist symbolically once for the specified
+        `outputs` as functions of the parameters `params` and return a
+        `CompiledCircuit` object.  This can be called to evaluate the
+        outputs for arrays of parameter values without re-solving the
+        netlist.
+
+        `outputs` is a list of strings, such as ['V2', 'V(2, 3)',
+        'I(R1)'].  `params` is a list of component names or symbols,
+        such as ['R1', 'C1'].  The other component values need to be
+        numerical.  `domain` is either 't' (time-domain) or 's'
+        (Laplace-domain).  For example,
+
+        >>> cc = cct.compile(['V2'], params=['R1', 'C1'])
+        >>> results = cc(t=tv, R1=np.array([1e3, 2e3])[:, None])
+        >>> results['V2']
+        """
+
+        from .compiledcircuit import CompiledCircuit
+
+        return CompiledCircuit(self, outputs, params, domain)
+
+    def sensitivity(self, output, params=None, numeric=False, f=None):
+        """Return dictionary of the sensitivities of `output` with
+        respect to the values of the components `params`, keyed by
+        component name.  If `params` is None, the sensitivities for all
+        the R, G, C, L, Y, Z, V, and I components are found.  `output`
+        is a string such as 'V2', 'V(2, 3)', or 'I(R1)'.
+
+        The sensitivities are found using the adjoint method; this
+        requires one solve of the MNA equations and one transposed
+        solve for all the parameters.
+
+        If `numeric` is False, the sensitivities are symbolic
+        expressions in terms of the component symbols.  Otherwise, they
+        are evaluated numerically for the component values; for
+        Laplace-domain analysis, `f` specifies an array of
+        frequencies (in hertz) at which to evaluate them.
+
+        For example,
+
+        >>> cct.sensitivity('V2', ['R1', 'R2'])
+        """
+
+        from .sensitivity import Sensitivity
+
+        sensitivity = Sensitivity(self, output, params)
+        if numeric:
+            return sensitivity.numeric(f)
+        return sensitivity.symbolic()
+
+    def ac_sweep(self, f, outputs=None, method='auto'):
+        """Numerically solve the netlist at the array of frequencies `f`
+        (in hertz) without a symbolic solution.  This is similar to
+        SPICE AC analysis: the sweep frequency is applied to all the
+        AC sources and s-domain sources are evaluated at s = j 2 pi f.
+        DC sources are ignored.  All the component values need to be
+        numerical.
+
+        If `outputs` is None, an `ACSweepResults` object is returned
+        with arrays of node voltages and branch currents.  For
+        example, `results[2].V` or `results.R1.I`.  Otherwise,
+        `outputs` is a list of strings, such as ['V2', 'V(2, 3)',
+        'I(R1)'], and a dictionary of arrays is returned keyed by
+        these strings.
+
+        `method` can be 'dense' (solve for all frequencies at once),
+        'sparse' (sparse LU factorization at each frequency), or
+        'auto'."""
+
+        from .acsweep import ACSweep
+
+        return ACSweep(self)(f, outputs=outputs, method=method)
+
+    def monte_carlo(self, output, distributions, n=1000, f=None,
+                    seed=None, workers=None):
+        """Perform a Monte Carlo tolerance analysis of `output` for `n`
+        random samples of the component values and return a
+        `MonteCarloResults` object.  `output` is a string such as
+        'V2', 'V(2, 3)', or 'I(R1)'.
+
+        `distributions` is a dictionary keyed by component name with
+        tuples of the form (dist, nominal, tol) or (dist, tol), where
+        `dist` is 'normal' or 'uniform'.  For the normal distribution,
+        `tol` is the relative standard deviation; for the uniform
+        distribution, the values are in the range nominal * (1 +/-
+        tol).  If `nominal` is omitted, the netlist value is used.
+        The other component values need to be numerical.
+
+        If `f` is None, the DC value of the output is found.
+        Otherwise, the output is found at the array of frequencies `f`
+        (in hertz) as for `ac_sweep()`.  The samples are solved in
+        batches using stacked dense matrices.  If `workers` is greater
+        than one, the samples are split between a pool of processes.
+        For example,
+
+        >>> results = cct.monte_carlo('V2', {'R1': ('normal', 0.01)}, n=10000)
+        >>> results.percentiles([5, 50, 95], quantity='value')
+        """
+
+        from .montecarlo import MonteCarlo
+
+        mc = MonteCarlo(self, output, list(distributions), f)
+        return mc(distributions, n=n, seed=seed, workers=workers)
+
+    def noise_analysis(self, output, f, method='auto'):
+        """Perform a numerical noise analysis of `output` at the array
+        of frequencies `f` (in hertz) and return a
+        `NoiseAnalysisResults` object.  `output` is a node name or a
+        string such as 'V2', 'V(2, 3)', or 'I(R1)'.
+
+        The transfer functions from all the independent noise sources
+        to the output are found with a single adjoint solve at each
+        frequency rather than with a subnetlist for each noise
+        source.  The results have the amplitude spectral density of
+        the output due to each noise source (`contributions`), the
+        total amplitude spectral density (`total`), and the total
+        power spectral density (`psd`).  For example,
+
+        >>> results = cct.noisy(T=300).noise_analysis(2, f)
+        >>> results.contributions['VnR1']
+
+        Boltzmann's constant k_B is replaced by its numerical value.
+        All the other component values need to be numerical.
+
+        `method` can be 'dense' (solve for all frequencies at once),
+        'sparse' (sparse LU factorization at each frequency), or
+        'auto'."""
+
+        from .noiseanalysis import NoiseAnalysis
+
+        return NoiseAnalysis(self, output)(f, method=method)
+
     def annotate_currents(self, cpts=None, domainvar=None, flow=False,
                           style='eng4', show_units=True, pos=''):
         """Annotate specified list of component names `cpts` with current (or
@@ -684,6 +684,40 @@ class NetlistMixin(object):
             new._add(net)
         return new
 
+    def _parse_output(self, output):
+        """Parse output specification such as 'V2', 'V(2)', 'V(2, 3)',
+        'V(R1)', or 'I(R1)'.  This returns the tuple ('V', Np, Nm) for
+        a voltage or ('I', cptname, None) for a current."""
+
+        from re import match
+
+        output = output.replace(' ', '')
+        parts = match(r'^([VI])\((.*)\)$', output)
+        if parts is None:
+            parts = match(r'^(V)(.+)$', output)
+        if parts is None:
+            raise ValueError('Expecting output of form V2, V(2, 3), V(R1), or I(R1), got %s' % output)
+        quantity, args = parts.groups()
+        args = args.split(',')
+
+        if quantity == 'I':
+            if len(args) != 1 or args[0] not in self.elements:
+                raise ValueError('Unknown component for %s' % output)
+            return 'I', args[0], None
+
+        if len(args) == 2:
+            Np, Nm = args
+        elif len(args) == 1 and args[0] in self.nodes:
+            Np, Nm = args[0], '0'
+        elif len(args) == 1 and args[0] in self.elements:
+            Np, Nm = self.elements[args[0]].node_names[0:2]
+        else:
+            raise ValueError('Unknown node or component for %s' % output)
+        for node in (Np, Nm):
+            if node not in self.nodes and node != '0':
+                raise ValueError('Unknown node %s for %s' % (node, output))
+        return 'V', Np, Nm
+
     def _parse_node_args2(self, Np, Nm=None):
 
         if Nm is None:
@@ -1075,15 +1109,25 @@ class NetlistMixin(object):
             new._add(net)
         return new
 
-    def r_model(self):
+    def r_model(self, norton=False, switches=False):
         """"Create resistive equivalent model using companion circuits.
-        This is experimental!"""
+        By default, the companion circuits use a Thevenin model.  If
+        `norton` is True, capacitors and inductors are replaced by
+        placeholder current sources and the companion conductances are
+        stamped by the simulator.  If `switches` is True, switches are
+        replaced by zero voltage sources that the simulator converts
+        to open-circuits.  This is experimental!"""
 
         new = self._new()
         self.kind = 'dc'
 
         for cpt in self._elements.values():
-            net = cpt._r_model()
+            if norton and (cpt.is_capacitor or cpt.is_inductor):
+                net = cpt._r_model_norton()
+            elif switches and cpt.is_switch:
+                net = cpt._r_model_switch()
+            else:
+                net = cpt._r_model()
             new._add(net)
         return new
 
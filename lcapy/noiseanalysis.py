@@ -0,0 +1,301 @@
+"""
+This module implements numerical noise analysis using the adjoint of
+the modified nodal analysis (MNA) equations.
+
+Copyright 2026 Michael Hayes, UCECE
+"""
+
+from .current import current_sign
+from .numericmna import SparseMNA
+from .sym import eps, fsym, omegasym, ssym
+import sympy as sym
+
+__all__ = ('NoiseAnalysis', )
+
+
+def _evaluator(values):
+    """Return function that evaluates the list of SymPy expressions
+    `values` for an array of frequencies `f` (in hertz).  The
+    expressions can be functions of f or omega."""
+
+    from numpy import broadcast_to, pi
+
+    values = [sym.sympify(value) for value in values]
+    unknown = set()
+    for value in values:
+        unknown |= value.free_symbols - {fsym, omegasym}
+    if unknown != set():
+        raise ValueError(
+            'Undefined symbols %s; use subs to replace with numerical values' % unknown)
+
+    func = sym.lambdify((fsym, omegasym), values, modules='numpy')
+
+    def evaluate(f):
+        return [broadcast_to(value, f.shape).astype(complex)
+                for value in func(f, 2 * pi * f)]
+    return evaluate
+
+
+class NoiseAnalysisResults(object):
+    """This class stores the results of a noise analysis.
+    `contributions` is a dictionary of arrays of the amplitude
+    spectral density (ASD) of the output due to each independent
+    noise source, keyed by source name.  Sources with the same noise
+    identifier are correlated and are combined into a single entry
+    keyed by their comma separated names.  `transfer` is a dictionary
+    of arrays of the transfer functions from each noise source to
+    the output, keyed by source name."""
+
+    def __init__(self, f, transfer, contributions):
+
+        self.f = f
+        self.transfer = transfer
+        self.contributions = contributions
+
+    @property
+    def psd(self):
+        """Total power spectral density of the output."""
+
+        total = 0 * self.f
+        for asd in self.contributions.values():
+            total = total + asd ** 2
+        return total
+
+    @property
+    def total(self):
+        """Total amplitude spectral density of the output."""
+
+        from numpy import sqrt
+
+        return sqrt(self.psd)
+
+    def fractions(self):
+        """Return dictionary of the fraction of the total output power
+        spectral density due to each noise source."""
+
+        psd = self.psd
+        return {name: asd ** 2 / psd
+                for name, asd in self.contributions.items()}
+
+    def rms(self):
+        """Return the total RMS value of the output noise by integrating
+        the power spectral density over the analysis frequencies."""
+
+        from numpy import sqrt
+        from scipy.integrate import trapezoid
+
+        return sqrt(trapezoid(self.psd, self.f))
+
+
+class NoiseAnalysis(object):
+    """This class performs numerical noise analysis.  For the MNA
+    equations A x = Z and an output y = w^T x, the transfer function
+    from a noise source with the excitation vector b to the output
+    is lambda^T b, where lambda is the solution of the adjoint
+    equations A^T lambda = w.  Thus the transfer functions from all
+    the noise sources are found with one transposed solve at each
+    frequency rather than with one subcircuit for each noise source.
+
+    Boltzmann's constant k_B is replaced by its numerical value.
+    All the other component values need to be numerical.
+
+    """
+
+    def __init__(self, cct, output):
+
+        from scipy.constants import k
+
+        cct = cct.expand()
+        if '0' not in cct.nodes:
+            raise ValueError('Nothing connected to ground node 0')
+
+        groups = {kind: sources for kind, sources in
+                  cct.independent_source_groups(True).items()
+                  if isinstance(kind, str) and kind[0] == 'n'}
+        if groups == {}:
+            raise ValueError('Netlist has no noise sources; see noisy()')
+
+        # All the noise subnetlists have the same A matrix.
+        self.sub = cct.select(list(groups)[0])
+        self.mna = SparseMNA(self.sub, None)
+
+        def subs(value):
+            value = sym.sympify(value).subs(cct.context.symbols)
+            # Boltzmann's constant may have assumptions.
+            value = value.subs({symbol: k for symbol in value.free_symbols
+                                if str(symbol) == 'k_B'})
+            if value.has(eps):
+                value = value.subs(eps, 0)
+            return value
+
+        items = list(self.mna._A.todok().items())
+        self.A_rows = [row for (row, col), value in items]
+        self.A_cols = [col for (row, col), value in items]
+        self.A_func = _evaluator([subs(value) for key, value in items])
+
+        self.w = self._output_make(output)
+
+        # Find the excitation vector of each noise source for unit
+        # amplitude from its stamp in the subnetlist for its noise
+        # identifier.  Sources with the same identifier are correlated.
+        self.groups = {}
+        self.sources = []
+        b_entries, b_values, values = [], [], []
+        for kind, sources in groups.items():
+            sub = cct.select(kind)
+            self.groups[', '.join(sources)] = sources
+            for source in sources:
+                elt = sub.elements[source]
+                if elt.is_voltage_source:
+                    value = elt.Voc.sympy
+                else:
+                    value = elt.Isc.sympy
+                stamps = self.mna._cpt_stamps(elt)
+                b = stamps[4].col_join(stamps[5])
+                m = len(self.sources)
+                for (row, col), bvalue in b.todok().items():
+                    b_entries.append((m, row))
+                    b_values.append(sym.simplify(bvalue / value))
+                self.sources.append(source)
+                values.append(subs(value))
+
+        self.b_entries = b_entries
+        self.b_func = _evaluator([subs(value) for value in b_values])
+        self.values_func = _evaluator(values)
+
+    def _output_make(self, output):
+        """Create the vector w, where the output is w^T x."""
+
+        from numpy import zeros
+
+        sub = self.sub
+        mna = self.mna
+
+        N = mna._A.shape[0]
+        num_nodes = len(sub.node_list) - 1
+        w = zeros(N, dtype=complex)
+
+        # Allow output to be specified by node name.
+        if isinstance(output, int):
+            output = '%d' % output
+        if output in sub.nodes:
+            output = 'V(%s)' % output
+
+        quantity, arg1, arg2 = sub._parse_output(output)
+        if quantity == 'V':
+            nodes = mna._node_index(arg1), mna._node_index(arg2)
+        elif arg1 in mna.unknown_branch_currents:
+            m = mna._branch_index(arg1) + num_nodes
+            w[m] = current_sign(1, sub.elements[arg1].is_source)
+            return lambda f: w
+        elif sub.elements[arg1].type in ('R', 'NR', 'C', 'Y', 'Z'):
+            elt = sub.elements[arg1]
+            nodes = mna._cpt_node_indexes(elt)[0:2]
+            Y = elt.cpt.admittance.sympy.subs(ssym, sym.I * omegasym)
+            Y = _evaluator([Y])
+
+            def w_func(f):
+                wv = zeros((len(f), N), dtype=complex)
+                Yv = Y(f)[0]
+                if nodes[0] >= 0:
+                    wv[:, nodes[0]] += Yv
+                if nodes[1] >= 0:
+                    wv[:, nodes[1]] -= Yv
+                return wv
+            return w_func
+        else:
+            raise ValueError('Cannot determine current through %s' % arg1)
+
+        if nodes[0] >= 0:
+            w[nodes[0]] += 1
+        if nodes[1] >= 0:
+            w[nodes[1]] -= 1
+        return lambda f: w
+
+    def _dense_solve(self, f, w):
+
+        from numpy import zeros, linalg
+
+        N = self.mna._A.shape[0]
+        lam = zeros((len(f), N), dtype=complex)
+
+        # Limit the size of the stacked matrices to about 64 MB.
+        chunk = max(1, 2**22 // (N * N))
+        for start in range(0, len(f), chunk):
+            f1 = f[start:start + chunk]
+            AT = zeros((len(f1), N, N), dtype=complex)
+            for row, col, value in zip(self.A_rows, self.A_cols,
+                                       self.A_func(f1)):
+                AT[:, col, row] += value
+
+            try:
+                lam[start:start + chunk] = linalg.solve(
+                    AT, w[start:start + chunk, :, None])[:, :, 0]
+            except linalg.LinAlgError:
+                raise ValueError(self.mna._failure_reasons())
+        return lam
+
+    def _sparse_solve(self, f, w):
+
+        from numpy import zeros
+        from scipy.sparse import csc_array
+        from scipy.sparse.linalg import splu
+
+        N = self.mna._A.shape[0]
+        lam = zeros((len(f), N), dtype=complex)
+
+        values = self.A_func(f)
+        for m in range(len(f)):
+            A = csc_array(([value[m] for value in values],
+                           (self.A_rows, self.A_cols)), shape=(N, N),
+                          dtype=complex)
+            try:
+                lu = splu(A)
+            except RuntimeError:
+                raise ValueError(self.mna._failure_reasons())
+            lam[m] = lu.solve(w[m], trans='T')
+        return lam
+
+    def __call__(self, f, method='auto'):
+        """Find the output noise at the array of frequencies `f` (in
+        hertz) and return a `NoiseAnalysisResults` object.
+
+        `method` can be 'dense' to solve for all the frequencies at
+        once using stacked dense matrices, 'sparse' to use a sparse LU
+        factorization at each frequency, or 'auto' to choose
+        depending on the size of the A matrix."""
+
+        from numpy import asarray, atleast_1d, broadcast_to, zeros
+
+        f = atleast_1d(asarray(f, dtype=float))
+
+        N = self.mna._A.shape[0]
+        if method == 'auto':
+            method = 'dense' if N <= 100 else 'sparse'
+
+        w = broadcast_to(self.w(f), (len(f), N))
+        if method == 'dense':
+            lam = self._dense_solve(f, w)
+        elif method == 'sparse':
+            lam = self._sparse_solve(f, w)
+        else:
+            raise ValueError('Unknown method %s' % method)
+
+        # Excitation vectors with a row for each noise source.
+        b = zeros((len(self.sources), len(f), N), dtype=complex)
+        for (m, row), value in zip(self.b_entries, self.b_func(f)):
+            b[m, :, row] += value
+
+        values = self.values_func(f)
+        transfer = {}
+        for m, source in enumerate(self.sources):
+            transfer[source] = (lam * b[m]).sum(axis=1)
+
+        contributions = {}
+        for name, sources in self.groups.items():
+            total = 0
+            for source in sources:
+                m = self.sources.index(source)
+                total = total + transfer[source] * values[m]
+            contributions[name] = abs(total)
+        return NoiseAnalysisResults(f, transfer, contributions)
@@ -0,0 +1,189 @@
+"""This module provides numerical inverse Laplace transforms.  These
+evaluate a time-domain response from its Laplace transform without
+finding a closed form.
+
+Copyright 2026 Michael Hayes, UCECE
+
+"""
+
+__all__ = ('numeric_inverse_laplace', )
+
+
+def _talbot(F, tv, M=32):
+    """Fixed Talbot method of Abate and Valko.  The Bromwich contour is
+    deformed to s(theta) = r theta (cot(theta) + j) for -pi < theta
+    < pi with r = 2 M / (5 t).  This converges quickly for smooth
+    responses but the contour can miss poles with large imaginary
+    parts and it cannot handle delays, exp(-s T)."""
+
+    from numpy import cos, exp, newaxis, pi, sin, arange
+
+    theta = arange(1, M) * pi / M
+    cot = cos(theta) / sin(theta)
+    sigma = theta + (theta * cot - 1) * cot
+
+    r = 2 * M / (5 * tv)
+    s = r[:, newaxis] * theta * (cot + 1j)
+    Fs = F(s)
+
+    result = 0.5 * exp(r * tv) * F(r.astype(complex)).real
+    result += (exp(tv[:, newaxis] * s) * Fs * (1 + 1j * sigma)).real.sum(axis=1)
+    return result * r / M
+
+
+def _dehoog_contour(F, tv, M, sigma, tol, T):
+
+    from numpy import arange, exp, log, ones, pi, sqrt, zeros
+
+    gamma = sigma - log(tol) / (2 * T)
+    p = gamma + 1j * pi * arange(2 * M + 1) / T
+    fp = F(p)
+    fp[0] = fp[0] / 2
+
+    # Quotient-difference table.
+    e = zeros((2 * M + 1, M + 1), dtype=complex)
+    q = zeros((2 * M, M + 1), dtype=complex)
+    q[:, 1] = fp[1:] / fp[:-1]
+    for r in range(1, M + 1):
+        mr = 2 * (M - r) + 1
+        e[0:mr, r] = q[1:mr + 1, r] - q[0:mr, r] + e[1:mr + 1, r - 1]
+        if r < M:
+            mr -= 1
+            q[0:mr, r + 1] = q[1:mr + 1, r] * e[1:mr + 1, r] / e[0:mr, r]
+
+    # Continued fraction coefficients.
+    d = zeros(2 * M + 1, dtype=complex)
+    d[0] = fp[0]
+    d[1::2] = -q[0, 1:M + 1]
+    d[2::2] = -e[0, 1:M + 1]
+
+    # Evaluate the continued fraction for each time using the
+    # recurrence for the numerator A and denominator B.
+    z = exp(1j * pi * tv / T)
+    A = [zeros(len(tv), dtype=complex), d[0] * ones(len(tv))]
+    B = [ones(len(tv), dtype=complex), ones(len(tv), dtype=complex)]
+    for n in range(1, 2 * M):
+        A.append(A[n] + d[n] * z * A[n - 1])
+        B.append(B[n] + d[n] * z * B[n - 1])
+
+    # Improved remainder for the last term.
+    h2M = 0.5 * (1 + (d[2 * M - 1] - d[2 * M]) * z)
+    R = -h2M * (1 - sqrt(1 + d[2 * M] * z / h2M ** 2))
+    A2M = A[2 * M] + R * A[2 * M - 1]
+    B2M = B[2 * M] + R * B[2 * M - 1]
+
+    return exp(gamma * tv) / T * (A2M / B2M).real
+
+
+def _dehoog(F, tv, M=40, sigma=0, tol=1e-9, scale=0.6):
+    """Method of de Hoog, Knight, and Stokes.  This accelerates the
+    Fourier series approximation of the Bromwich integral along
+    Re(s) = gamma with a continued fraction found using the
+    quotient-difference algorithm.  Since the accuracy degrades for
+    times much smaller than the period of the Fourier series, the
+    times are grouped into decades, as in Hollenbeck's invlap, and a
+    contour with a half-period T of scale times the largest time is
+    used for each decade.  Thus F is only evaluated at 2 * M + 1
+    points for each decade.  The series is only valid for t < 2 T
+    and so `scale` must be greater than 0.5; a small T keeps
+    oscillatory responses accurate.  `sigma` needs to be greater
+    than the real part of the rightmost singularity of F and `tol`
+    is the desired relative accuracy."""
+
+    from numpy import floor, log10, unique, zeros
+
+    if scale <= 0.5:
+        raise ValueError('scale %s needs to be greater than 0.5' % scale)
+
+    result = zeros(len(tv))
+    decades = floor(log10(tv))
+    for decade in unique(decades):
+        mask = decades == decade
+        T = scale * tv[mask].max()
+        result[mask] = _dehoog_contour(F, tv[mask], M, sigma, tol, T)
+    return result
+
+
+def _weeks_contour(F, tv, N, sigma, b):
+
+    from numpy import arange, exp, newaxis, pi
+
+    theta = (arange(-N, N) + 0.5) * pi / N
+    w = exp(1j * theta)
+    G = 2 * b / (1 - w) * F(sigma + b * (1 + w) / (1 - w))
+    a = (G * exp(-1j * arange(N)[:, newaxis] * theta)).mean(axis=1)
+
+    # Sum the Laguerre functions exp(-x / 2) L_n(x) using their
+    # recurrence; these are bounded by 1.
+    x = 2 * b * tv
+    l0 = exp(-x / 2)
+    l1 = (1 - x) * l0
+    result = a[0] * l0 + a[1] * l1
+    for n in range(1, N - 1):
+        l0, l1 = l1, ((2 * n + 1 - x) * l1 - n * l0) / (n + 1)
+        result += a[n + 1] * l1
+
+    return exp(sigma * tv) * result.real
+
+
+def _weeks(F, tv, N=256, sigma=0, b=None):
+    """Weeks method.  The response is expanded as
+
+    f(t) = exp(sigma t) sum_n a_n exp(-b t) L_n(2 b t)
+
+    where L_n is the Laguerre polynomial of degree n.  The
+    coefficients a_n are found from N * 2 evaluations of F on the
+    circle that maps to the line Re(s) = sigma.  As with the 'dehoog'
+    method, the times are grouped into decades.  For each decade,
+    sigma is 4 / max(t) to the right of the `sigma` argument, which
+    needs to be greater than the real part of the rightmost
+    singularity of F, and by default b = N / (4 max(t))."""
+
+    from numpy import floor, log10, unique, zeros
+
+    result = zeros(len(tv))
+    decades = floor(log10(tv))
+    for decade in unique(decades):
+        mask = decades == decade
+        tmax = tv[mask].max()
+        bd = N / (4 * tmax) if b is None else b
+        result[mask] = _weeks_contour(F, tv[mask], N, sigma + 4 / tmax, bd)
+    return result
+
+
+def numeric_inverse_laplace(F, tv, method='dehoog', **kwargs):
+    """Numerically evaluate the inverse Laplace transform of `F` at the
+    array of times `tv`.  `F` is a function that evaluates the
+    Laplace transform for an array of complex values of s.  The
+    values for t <= 0 are zero.
+
+    `method` can be:
+     'dehoog' for the method of de Hoog, Knight, and Stokes.  This
+       is the most robust and handles delays.
+       Keyword arguments: M, sigma, tol, scale.
+     'talbot' for the fixed Talbot method.  This is accurate for
+       smooth responses but does not handle delays and misses poles
+       with imaginary parts larger than about 2 pi M / (5 t).
+       Keyword arguments: M.
+     'weeks' for the Weeks method using a Laguerre expansion.  This
+       is accurate for rational functions but does not handle delays.
+       Keyword arguments: N, sigma, b.
+
+    For the 'dehoog' and 'weeks' methods, `sigma` needs to be
+    greater than the real part of the rightmost singularity of F
+    (default 0).  Lightly damped responses that oscillate over many
+    tens of periods are difficult for all the methods."""
+
+    from numpy import asarray, zeros
+
+    methods = {'dehoog': _dehoog, 'talbot': _talbot, 'weeks': _weeks}
+    if method not in methods:
+        raise ValueError('Unknown method %s, expecting %s' %
+                         (method, ', '.join(methods)))
+
+    tv = asarray(tv, dtype=float)
+    result = zeros(tv.shape)
+    positive = tv > 0
+    if positive.any():
+        result[positive] = methods[method](F, tv[positive], **kwargs)
+    return result
@@ -0,0 +1,245 @@
+"""
+This module implements numerical modified nodal analysis (MNA) using
+sparse matrices.
+
+Copyright 2026 Michael Hayes, UCECE
+"""
+
+from .mna import MNA
+from .sym import eps
+import sympy as sym
+
+
+def sparse_numeric(M, name='A'):
+    """Convert SymPy sparse matrix `M` to a SciPy CSC sparse array.
+    A ValueError is raised if an element of `M` is not numeric.  Any
+    `eps` conductances added for capacitors in DC analysis are
+    replaced by zero."""
+
+    from scipy.sparse import csc_array
+
+    rows, cols, values = [], [], []
+    for (row, col), value in M.todok().items():
+        value = sym.sympify(value)
+        symbols = value.free_symbols - {eps}
+        if symbols != set():
+            raise ValueError(
+                'Undefined symbols %s in %s matrix; use subs to replace with numerical values' % (symbols, name))
+        if eps in value.free_symbols:
+            value = value.subs(eps, 0)
+        value = complex(value)
+        if value == 0:
+            continue
+        rows.append(row)
+        cols.append(col)
+        values.append(value)
+
+    dtype = float
+    for value in values:
+        if value.imag != 0:
+            dtype = complex
+            break
+    values = [value if dtype is complex else value.real for value in values]
+
+    return csc_array((values, (rows, cols)), shape=M.shape, dtype=dtype)
+
+
+def sympy_numeric(x):
+    """Convert NumPy float or complex value to SymPy number."""
+
+    if x.imag == 0:
+        return sym.Float(x.real)
+    return sym.Float(x.real) + sym.I * sym.Float(x.imag)
+
+
+class SparseMNA(MNA):
+    """This class stores the MNA stamps in SymPy sparse matrices.  The
+    stamps are not solved symbolically; they are used to create
+    numerical matrices."""
+
+    def _zeros(self, rows, cols):
+        """Create matrix to hold the stamps."""
+
+        return sym.SparseMatrix.zeros(rows, cols)
+
+
+class NumericMNA(SparseMNA):
+    """This class performs modified nodal analysis using a sparse LU
+    factorization of the A matrix.  It is applicable when all the
+    elements of the A matrix are numbers; this is the case for DC
+    analysis, phasor analysis at a numerical angular frequency, and
+    time-domain analysis of resistive circuits, when all the component
+    values are numerical.  The Z vector can be a function of the
+    domain variable (for example, `t` for time-domain analysis).
+
+    The stamps are stored in SymPy sparse matrices and the node
+    voltages and branch currents are returned as floating point
+    numbers with the same `Vdict` and `Idict` interface as `MNA`.
+
+    """
+
+    def __init__(self, cct, solver_method):
+
+        super(NumericMNA, self).__init__(cct, solver_method)
+
+        # This raises a ValueError if the A matrix is not numeric.
+        self._Anum = sparse_numeric(self._A, 'A')
+
+    @property
+    def lu(self):
+        """Return sparse LU factorization of the A matrix.  After a
+        component update, this is the factorization of the original A
+        matrix and the update is applied with the Woodbury identity."""
+
+        from scipy.sparse.linalg import splu
+
+        if not hasattr(self, '_lu'):
+            self._lu = splu(self._Anum)
+            self._Alu = self._Anum
+            self._woodbury = None
+        return self._lu
+
+    def _A_update(self, dA):
+        """Update the numerical A matrix with the change `dA` due to a
+        component update.  If the A matrix has been factored, the
+        low-rank change, A = A0 + E_r D E_c^T, where A0 is the
+        factored matrix, is handled with the Sherman-Morrison-Woodbury
+        identity.  This requires solving with the LU factors of A0
+        for the rows r of the change rather than a new factorization."""
+
+        from numpy import arange, eye, linalg, unique, zeros
+
+        self._Anum = (self._Anum + sparse_numeric(dA, 'A')).tocsc()
+
+        if not hasattr(self, '_lu'):
+            return
+
+        delta = (self._Anum - self._Alu).tocsc()
+        delta.eliminate_zeros()
+        if delta.nnz == 0:
+            self._woodbury = None
+            return
+
+        rows, cols = delta.nonzero()
+        rows, cols = unique(rows), unique(cols)
+
+        N = self._Anum.shape[0]
+        if max(len(rows), len(cols)) > 10 + N // 10:
+            # The change is not low rank so refactor.
+            del self._lu
+            return
+
+        D = delta[rows][:, cols].toarray()
+        E = zeros((N, len(rows)), dtype=D.dtype)
+        E[rows, arange(len(rows))] = 1
+        WD = self._lu0_solve(E) @ D
+        K = eye(len(cols)) + WD[cols, :]
+
+        if linalg.cond(K) > 1e12:
+            # The original A matrix is a poor choice for the update.
+            del self._lu
+            return
+
+        self._woodbury = (cols, WD, K)
+
+    def _lu0_solve(self, b):
+        """Solve A0 x = b using the sparse LU factorization of the
+        factored A matrix, A0.  `b` can be a vector or a matrix with a
+        column for each right hand side."""
+
+        if self._Alu.dtype == complex:
+            return self.lu.solve(b.astype(complex))
+
+        # SuperLU casts b to the type of the factorization so
+        # solve for the real and imaginary parts separately.
+        x = self.lu.solve(b.real.astype(float))
+        if b.dtype == complex and b.imag.any():
+            x = x + 1j * self.lu.solve(b.imag.astype(float))
+        return x
+
+    def _lu_solve(self, b):
+        """Solve A x = b using the sparse LU factorization of A.  `b`
+        can be a vector or a matrix with a column for each right hand
+        side."""
+
+        from numpy import linalg
+
+        x = self._lu0_solve(b)
+        if self._woodbury is None:
+            return x
+
+        cols, WD, K = self._woodbury
+        return x - WD @ linalg.solve(K, x[cols])
+
+    def _solve_key(self):
+        """Return key identifying the A matrix.  NumericMNA objects with
+        the same key can share a solution."""
+
+        A = self._Anum
+        return (type(self), A.shape, A.indptr.tobytes(),
+                A.indices.tobytes(), A.data.tobytes())
+
+    def _multi_solve(self, Zs):
+        """Solve for the vectors of unknowns for each of the Z vectors
+        in the list `Zs` using a single multiple right hand side
+        solve."""
+
+        from numpy import array, zeros
+
+        try:
+            self.lu
+        except RuntimeError:
+            if self._A.has(eps):
+                # Handle floating nodes connected by capacitors
+                # with DC analysis by taking the limit symbolically.
+                return super(NumericMNA, self)._multi_solve(Zs)
+            message = self._failure_reasons()
+            raise ValueError(message)
+
+        N = self._Anum.shape[0]
+
+        # Each numerical Z vector is a column of the right hand side
+        # matrix.  If a Z vector is a function of the domain variable
+        # (for example, `t` for time-domain analysis), there is a
+        # column for each of its non-zero elements and the results
+        # are superposed.
+        columns = []
+        symbolics = []
+        for Z in Zs:
+            Z = Z.todok()
+            keys = sorted(Z)
+            values = [sym.sympify(Z[key]) for key in keys]
+            if all(value.free_symbols == set() for value in values):
+                column = zeros(N, dtype=complex)
+                for (row, col), value in zip(keys, values):
+                    column[row] = complex(value)
+                columns.append(column)
+                symbolics.append(None)
+            else:
+                for row, col in keys:
+                    column = zeros(N, dtype=complex)
+                    column[row] = 1
+                    columns.append(column)
+                symbolics.append(values)
+
+        X = self._lu_solve(array(columns).T)
+
+        results = []
+        m = 0
+        for values in symbolics:
+            if values is None:
+                results.append(sym.Matrix([sympy_numeric(x1)
+                                           for x1 in X[:, m]]))
+                m += 1
+                continue
+
+            result = []
+            for n in range(N):
+                result1 = 0
+                for k, value in enumerate(values):
+                    if X[n, m + k] != 0:
+                        result1 += sympy_numeric(X[n, m + k]) * value
+                result.append(result1)
+            results.append(sym.Matrix(result))
+            m += len(values)
+        return results
@@ -203,6 +203,132 @@ def as_B_A_delay_undef(expr, var):
     return N, D, delay, undef
 
 
+def _coeffs_array(poly, var):
+    """Return NumPy array of the coefficients of polynomial `poly` in
+    `var`, with the highest power first."""
+
+    from numpy import array
+
+    try:
+        coeffs = sym.Poly(poly, var).all_coeffs()
+        return array([complex(coeff) for coeff in coeffs])
+    except (sym.PolynomialError, TypeError) as e:
+        raise ValueError('Cannot find numerical coefficients of %s: %s' %
+                         (poly, e))
+
+
+def _poly_factors(expr, var):
+    """Return list of tuples (coeffs, exponent) where `expr` is the
+    product of the polynomials in `var` with coefficients `coeffs`
+    raised to the integer `exponent`.  The factors of the expression
+    are kept, if possible, since they are better conditioned than
+    the expanded polynomials."""
+
+    factors = []
+    for factor in sym.Mul.make_args(expr):
+        base, exponent = factor.as_base_exp()
+        if not exponent.is_Integer or not base.is_polynomial(var):
+            N, D = sym.together(expr).as_numer_denom()
+            return [(_coeffs_array(N, var), 1), (_coeffs_array(D, var), -1)]
+        factors.append((_coeffs_array(base, var), int(exponent)))
+    return factors
+
+
+def _horner(coeffs, x):
+    """Evaluate polynomial with `coeffs` at the array `x` using
+    Horner's method in place."""
+
+    from numpy import full
+
+    result = full(x.shape, coeffs[0], dtype=complex)
+    for coeff in coeffs[1:]:
+        result *= x
+        result += coeff
+    return result
+
+
+class RatfunEvaluator(object):
+    """This class evaluates a rational function with numerical
+    coefficients for an array of values of its variable.  The
+    coefficients of the polynomial factors are found once.  Low
+    order rational functions are evaluated using Horner's method
+    while rational functions with a degree of at least
+    rcParams['evaluate.zpk_degree'] are evaluated in zero-pole-gain
+    form for better numerical conditioning.
+
+    A ValueError is raised if the expression is not a rational
+    function with numerical coefficients."""
+
+    def __init__(self, expr, var):
+
+        if not expr.is_rational_function(var):
+            raise ValueError('%s is not a rational function of %s' %
+                             (expr, var))
+
+        self.factors = _poly_factors(expr, var)
+        self.degree = sum(abs(exponent) * (len(coeffs) - 1)
+                          for coeffs, exponent in self.factors)
+
+    @cached_property
+    def ZPK(self):
+        """Tuple of the arrays of zeros and poles and the gain."""
+
+        from numpy import array, roots
+
+        zeros, poles, K = [], [], 1
+        for coeffs, exponent in self.factors:
+            K *= coeffs[0] ** exponent
+            r = list(roots(coeffs))
+            if exponent > 0:
+                zeros.extend(r * exponent)
+            else:
+                poles.extend(r * -exponent)
+        return array(zeros), array(poles), K
+
+    def _zpk_evaluate(self, x):
+
+        from numpy import empty, full, subtract
+
+        zeros, poles, K = self.ZPK
+        result = full(x.shape, K, dtype=complex)
+        tmp = empty(x.shape, dtype=complex)
+
+        # Interleave the zeros and poles to avoid overflow.
+        for m in range(max(len(zeros), len(poles))):
+            if m < len(zeros):
+                subtract(x, zeros[m], out=tmp)
+                result *= tmp
+            if m < len(poles):
+                subtract(x, poles[m], out=tmp)
+                result /= tmp
+        return result
+
+    def _horner_evaluate(self, x):
+
+        from numpy import ones
+
+        result = ones(x.shape, dtype=complex)
+        for coeffs, exponent in self.factors:
+            if exponent > 0:
+                result *= _horner(coeffs, x) ** exponent
+            else:
+                result /= _horner(coeffs, x) ** -exponent
+        return result
+
+    def __call__(self, x):
+        """Evaluate the rational function at the array `x`.  This
+        returns a complex array; values at the poles are not
+        finite."""
+
+        from numpy import asarray
+        from .rcparams import rcParams
+
+        x = asarray(x)
+        if self.degree >= rcParams['evaluate.zpk_degree']:
+            return self._zpk_evaluate(x)
+        return self._horner_evaluate(x)
+
+
 class Ratfun(object):
 
     def __init__(self, expr, var):
@@ -63,16 +63,42 @@ c = RcChecker()
 
 rcdefaults = {
     'sympy.solver' : ('DM', ('GJ', 'QR', 'CRAMER',
-                             'GE', 'LU', 'ADJ', 'LDL', 'CH', 'DM')),
-    'sympy.matrix.inverse' : ('DM', ('GE', 'LU', 'ADJ', 'LDL', 'CH', 'DM')),
+                             'GE', 'LU', 'ADJ', 'LDL', 'CH', 'DM', 'auto')),
+    'sympy.matrix.inverse' : ('DM', ('GE', 'LU', 'ADJ', 'LDL', 'CH', 'DM',
+                                     'auto')),
+    # With the 'auto' solver, race the candidate methods in separate
+    # processes for up to sympy.solver.race_timeout seconds.
+    'sympy.solver.race': (False, c.bool),
+    'sympy.solver.race_timeout': (10.0, c.float),
     'sympy.print_order': ('lex', ('lex', 'grlex', 'grevlex'),
                           print_order_update),
 
+    # Modified nodal analysis backend.  With 'auto', a sparse
+    # numerical solver is used for circuits with numerical component
+    # values if there are at least mna.numeric_threshold nodes.
+    'mna.backend': ('auto', ('auto', 'symbolic', 'numeric')),
+    'mna.numeric_threshold': (50, c.int),
+
+    # Number of worker processes used to solve the subnetlists for
+    # each transform domain.  With 1, they are solved sequentially.
+    'analysis.workers': (1, c.int),
+
     # Definition of H(0).  With H(0) = 0.5 then sgn(0) = 0 as expected
     # by SymPy and NumPy
     'functions.heaviside_zero' : (0.5, c.float),
     'functions.unitstep_zero' : (1, c.float),
 
+    # Rational functions with at least this degree are evaluated in
+    # zero-pole-gain form rather than using Horner's method.
+    'evaluate.zpk_degree' : (10, c.int),
+
+    # Backend for evaluating expressions for arrays.  With 'autowrap',
+    # expressions are compiled into NumPy ufuncs (this requires a C
+    # compiler) and the compiled modules are cached in
+    # evaluate.cache_dir.
+    'evaluate.backend' : ('numpy', ('numpy', 'autowrap', 'numexpr')),
+    'evaluate.cache_dir' : ('~/.lcapy/autowrap', c.str),
+
     'symbols.imaginary' : ('j', ('i', 'j'), imaginary_update),
     'symbols.heaviside' : ('u', c.str, heaviside_update),
 
@@ -0,0 +1,278 @@
+"""
+This module implements adjoint sensitivity analysis using the
+modified nodal analysis (MNA) stamps.
+
+Copyright 2026 Michael Hayes, UCECE
+"""
+
+from .current import current_sign
+from .matrix import matrix_solve
+from .numericmna import SparseMNA
+from .sym import eps, ssym
+import sympy as sym
+
+__all__ = ('Sensitivity', )
+
+
+def _sparse_evaluator(M, var):
+    """Return function that evaluates the SymPy sparse matrix `M` as a
+    SciPy CSC sparse array for a value of `var`."""
+
+    from scipy.sparse import csc_array
+
+    items = list(M.todok().items())
+    rows = [row for (row, col), value in items]
+    cols = [col for (row, col), value in items]
+    values = [sym.sympify(value) for key, value in items]
+
+    if var is None or not any(value.has(var) for value in values):
+        values = [complex(value) for value in values]
+
+        def func(x):
+            return csc_array((values, (rows, cols)), shape=M.shape,
+                             dtype=complex)
+    else:
+        func1 = sym.lambdify(var, values, modules='numpy')
+
+        def func(x):
+            return csc_array((func1(x), (rows, cols)), shape=M.shape,
+                             dtype=complex)
+    return func
+
+
+class Sensitivity(object):
+    """This class performs adjoint sensitivity analysis.  For the MNA
+    equations A x = Z and an output y = w^T x, the sensitivity of
+    the output with respect to a parameter p is
+
+    dy/dp = dw/dp^T x + lambda^T (dZ/dp - dA/dp x)
+
+    where lambda is the solution of the adjoint equations A^T lambda
+    = w.  Thus the sensitivities for all the parameters are found with
+    one solve of the MNA equations and one transposed solve.  The
+    derivatives dA/dp and dZ/dp are found from the component stamps.
+
+    """
+
+    def __init__(self, cct, output, params=None):
+
+        cct = cct.expand()
+
+        groups = cct._analysis_groups()
+        if len(groups) != 1:
+            raise ValueError('Cannot determine sensitivity for circuit'
+                             ' with multiple source kinds.  Convert to'
+                             ' ac, dc, or laplace domain first.')
+        kind = list(groups)[0]
+        if params is None:
+            params = [name for name, elt in cct.elements.items()
+                      if elt.type in ('R', 'G', 'C', 'L', 'Y', 'Z',
+                                      'V', 'I')]
+        elif isinstance(params, str):
+            params = [params]
+
+        for param in params:
+            if param not in cct.elements:
+                raise ValueError('Unknown component %s' % param)
+
+        # Replace the numerical values of the parameters with symbols.
+        self.defs = cct.defs()
+        fixed = [name for name in cct.elements if name not in params]
+        scct = cct.sympify(ignore=fixed)
+
+        self.cct = cct
+        self.output = output
+        self.params = params
+        self.sub = scct.select(kind)
+        self.mna = SparseMNA(self.sub, scct.solver_method)
+        self.kind = kind
+
+        mna = self.mna
+        self.symbols = {}
+        for param in params:
+            stamps = mna._cpt_stamps(self.sub.elements[param])
+            for M in stamps:
+                for symbol in M.free_symbols:
+                    if str(symbol) == param:
+                        self.symbols[param] = symbol
+            if param not in self.symbols:
+                self.symbols[param] = sym.Symbol(param)
+
+        self._output_make(output)
+
+        # Find the derivatives of the A matrix and Z vector with
+        # respect to each parameter from the component stamps.
+        self.dA = {}
+        self.dZ = {}
+        for param in params:
+            G, B, C, D, Is, Es = mna._cpt_stamps(self.sub.elements[param])
+            dA = G.row_join(B).col_join(C.row_join(D))
+            dZ = Is.col_join(Es)
+            symbol = self.symbols[param]
+            self.dA[param] = dA.diff(symbol)
+            self.dZ[param] = dZ.diff(symbol)
+
+    def _output_make(self, output):
+        """Create the vector w, where the output is w^T x."""
+
+        sub = self.sub
+        mna = self.mna
+
+        N = mna._A.shape[0]
+        num_nodes = len(sub.node_list) - 1
+        w = sym.SparseMatrix.zeros(N, 1)
+
+        quantity, arg1, arg2 = sub._parse_output(output)
+        if quantity == 'V':
+            Np, Nm = mna._node_index(arg1), mna._node_index(arg2)
+        elif arg1 in mna.unknown_branch_currents:
+            elt = sub.elements[arg1]
+            m = mna._branch_index(arg1) + num_nodes
+            w[m] = current_sign(1, elt.is_source)
+            Np, Nm = -1, -1
+        elif sub.elements[arg1].type in ('R', 'NR', 'C', 'Y', 'Z'):
+            elt = sub.elements[arg1]
+            Np, Nm = mna._cpt_node_indexes(elt)[0:2]
+        else:
+            raise ValueError('Cannot determine current through %s' % arg1)
+
+        scale = 1
+        if quantity == 'I' and Np != Nm:
+            scale = 1 / elt.Z.sympy
+        if Np >= 0:
+            w[Np] += scale
+        if Nm >= 0:
+            w[Nm] -= scale
+        self.w = w
+
+    def _finalize(self, result):
+
+        result = result.subs(self.sub.context.symbols)
+        if result.has(eps):
+            result = sym.limit(result, eps, 0)
+        return result
+
+    def symbolic(self):
+        """Return dictionary of the symbolic sensitivities keyed by
+        parameter name.  The sensitivities are expressed in terms of
+        the parameter symbols."""
+
+        from .expr import expr
+
+        mna = self.mna
+        A = sym.Matrix(mna._A)
+        Z = sym.Matrix(mna._Z)
+        w = sym.Matrix(self.w)
+        method = mna._solver_method()
+
+        try:
+            candidates = mna._solver_candidates()
+            x = matrix_solve(A, Z, method=method, candidates=candidates)
+            lam = matrix_solve(A.T, w, method=method, candidates=candidates)
+        except ValueError:
+            raise ValueError(mna._failure_reasons())
+
+        results = {}
+        for param in self.params:
+            symbol = self.symbols[param]
+            dw = sym.Matrix(self.w.diff(symbol))
+            dA = sym.Matrix(self.dA[param])
+            dZ = sym.Matrix(self.dZ[param])
+            result = (dw.T * x + lam.T * (dZ - dA * x))[0]
+            results[param] = expr(self._finalize(sym.simplify(result)))
+        return results
+
+    def _symbolic_evaluate(self, subsdict, var, sv):
+        """Return dictionary of the symbolic sensitivities evaluated
+        for the parameter values `subsdict` at the values `sv` of the
+        domain variable `var`."""
+
+        from numpy import array
+
+        results = {}
+        for param, result in self.symbolic().items():
+            result = result.sympy.subs(subsdict)
+            if var is None:
+                results[param] = array([complex(result)])
+            else:
+                func = sym.lambdify(var, result, modules='numpy')
+                results[param] = func(sv) * (sv * 0 + 1)
+        return results
+
+    def numeric(self, f=None):
+        """Return dictionary of the numerical sensitivities, evaluated
+        for the component values specified in the netlist, keyed by
+        parameter name.  For Laplace-domain analysis, `f` specifies
+        the frequencies (in hertz) at which to evaluate the
+        sensitivities (with s = j 2 pi f) and arrays are returned."""
+
+        from numpy import asarray, atleast_1d, pi, zeros
+        from scipy.sparse.linalg import splu
+
+        subsdict = {}
+        for param in self.params:
+            if param in self.defs:
+                subsdict[self.symbols[param]] = sym.sympify(self.defs[param])
+
+        def subs(M):
+            M = M.subs(subsdict)
+            if M.has(eps):
+                M = M.subs(eps, 0)
+            return M
+
+        mna = self.mna
+        matrices = [mna._A, mna._Z, self.w]
+        for param in self.params:
+            symbol = self.symbols[param]
+            matrices.extend([self.dA[param], self.dZ[param],
+                             self.w.diff(symbol)])
+        matrices = [subs(M) for M in matrices]
+
+        symbols = set()
+        for M in matrices:
+            symbols |= M.free_symbols
+        var = None
+        if ssym in symbols:
+            if f is None:
+                raise ValueError('Need frequencies f for s-domain analysis')
+            var = ssym
+            symbols.discard(ssym)
+        if symbols != set():
+            raise ValueError(
+                'Undefined symbols %s; use subs to replace with numerical values' % symbols)
+
+        funcs = [_sparse_evaluator(M, var) for M in matrices]
+
+        if f is None:
+            sv = [None]
+        else:
+            sv = 2j * pi * atleast_1d(asarray(f, dtype=float))
+
+        results = {param: zeros(len(sv), dtype=complex)
+                   for param in self.params}
+        for k, s1 in enumerate(sv):
+            values = [func(s1) for func in funcs]
+            A, Z, w = values[0:3]
+            try:
+                lu = splu(A.tocsc())
+            except RuntimeError:
+                if not mna._A.has(eps):
+                    raise ValueError(mna._failure_reasons())
+                # Handle floating nodes connected by capacitors
+                # with DC analysis by taking the limit symbolically.
+                results = self._symbolic_evaluate(subsdict, var, sv)
+                break
+            x = lu.solve(Z.toarray()[:, 0])
+            lam = lu.solve(w.toarray()[:, 0], trans='T')
+            for m, param in enumerate(self.params):
+                dA, dZ, dw = values[3 + 3 * m: 6 + 3 * m]
+                results[param][k] = (dw.toarray()[:, 0] @ x +
+                                     lam @ (dZ.toarray()[:, 0] - dA @ x))
+
+        for param, result in results.items():
+            if (result.imag == 0).all():
+                result = result.real
+            if f is None:
+                result = result[0]
+            results[param] = result
+        return results
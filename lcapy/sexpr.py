@@ -265,6 +265,59 @@ class LaplaceDomainExpression(LaplaceDomain, Expr):
         expr.quantity_label = 'Step response'
         return expr
 
+    def evaluate_time(self, tvector, method='dehoog', **kwargs):
+        """Evaluate time-domain response at the array of times `tvector`
+        using a numerical inverse Laplace transform.  This does not
+        need a closed form for the time-domain response and so can
+        handle high-order expressions and expressions such as
+        exp(-s * T) or sqrt(s).  The values for t <= 0 are zero.
+
+        `method` can be 'dehoog', 'talbot', or 'weeks'; see
+        `numeric_inverse_laplace` for the methods and their keyword
+        arguments.  Only the 'dehoog' method handles delays; a
+        ValueError is raised for the other methods.  For example,
+
+        >>> V = 1 / (s * (1 + sqrt(s)))
+        >>> vv = V.evaluate_time(np.linspace(0, 10, 101))
+
+        """
+
+        from numpy import asarray, errstate
+        from .expr import _lambdify_evaluate
+        from .numericlaplace import numeric_inverse_laplace
+
+        expr = self.doit().sympy
+        var = self.var
+
+        # Use symbol names to avoid problems with symbols of the same
+        # name with different assumptions.
+        free_symbols = set([symbol.name for symbol in expr.free_symbols])
+        free_symbols -= set((var.name, ))
+        if free_symbols != set():
+            raise ValueError('Undefined symbols %s in expression %s' % (
+                tuple(free_symbols), self))
+
+        # The Talbot contour and the Laguerre expansion of the Weeks
+        # method cannot represent the discontinuity due to a delay,
+        # exp(-s T).  Other exponentials, such as exp(-sqrt(s)) for a
+        # diffusive line, are fine.
+        if method in ('talbot', 'weeks'):
+            for atom in expr.atoms(exp):
+                arg = atom.args[0]
+                if (arg.has(var) and arg.is_polynomial(var)
+                        and Poly(arg, var).degree() == 1):
+                    raise ValueError('Cannot use method %s for expression %s '
+                                     'with a delay, use method dehoog' % (
+                                         method, self))
+
+        func = _lambdify_evaluate(expr, var, vector=True)
+
+        def F(sv):
+            with errstate(all='ignore'):
+                return asarray(func(sv), dtype=complex) * (sv * 0 + 1)
+
+        return numeric_inverse_laplace(F, tvector, method, **kwargs)
+
     def frequency_response(self, **assumptions):
         """Convert to frequency response domain.  Note, this is similar to the
         Fourier domain but not always."""
@@ -513,9 +566,9 @@ class LaplaceDomainExpression(LaplaceDomain, Expr):
 
         return e.discretize(method, alpha).simplify().dlti_filter()
 
-    def evaluate(self, svector=None):
+    def evaluate(self, svector=None, **kwargs):
 
-        return super(LaplaceDomainExpression, self).evaluate(svector)
+        return super(LaplaceDomainExpression, self).evaluate(svector, **kwargs)
 
     def plot(self, **kwargs):
         """Plot pole-zero map.
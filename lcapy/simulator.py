@@ -6,23 +6,85 @@ Copyright 2021--2022 Michael Hayes, UCECE
 
 from .sym import tsym, symbol_map
 from .symbols import oo
+from math import comb, sqrt
 from warnings import warn
 
 __all__ = ('Simulator', )
 
-# The companion circuits use a Thevenin model.  This simplifies
-# determination of the current through reactive components.  If the
-# currents are not required, the Norton model would be faster since
-# fewer nodes are needed and so the matrices are smaller.
+# By default, the companion circuits use a Thevenin model.  This
+# simplifies determination of the current through reactive components.
+# The Norton model (companion='norton') is faster since fewer nodes
+# are needed and so the matrices are smaller.  With the Norton model,
+# the currents through the reactive components are found from the
+# node voltages after each step.
 
 # TODO:
-# 1. handle initial values
-# 2. offset correction
+# 1. offset correction
+
+
+def _gear_coeffs(k):
+    """Return the coefficients a_0, ..., a_k of the k-th order Gear
+    (backward differentiation) formula for a constant timestep dt,
+    where x'_n = (a_0 x_n + a_1 x_{n-1} + ... + a_k x_{n-k}) / dt."""
+
+    a = [sum(1 / m for m in range(1, k + 1))]
+    for j in range(1, k + 1):
+        a.append((-1)**j * sum(comb(m, j) / m for m in range(j, k + 1)))
+    return a
+
+
+GEAR_COEFFS = [None] + [_gear_coeffs(k) for k in range(1, 7)]
+
+# The TR-BDF2 method uses a trapezoidal stage from t_{n-1} to
+# t_{n-1} + gamma dt followed by a second-order backward
+# differentiation formula through the three points.  The
+# coefficients are for x'_n = (c_0 x_n + c_1 x_{n-gamma} + c_2 x_{n-1}) / dt.
+TRBDF2_GAMMA = 2 - sqrt(2)
+TRBDF2_COEFFS = ((2 - TRBDF2_GAMMA) / (1 - TRBDF2_GAMMA),
+                 -1 / (TRBDF2_GAMMA * (1 - TRBDF2_GAMMA)),
+                 (1 - TRBDF2_GAMMA) / TRBDF2_GAMMA)
+
+# Conductance from each node to ground for the operating point.  Like
+# SPICE's GMIN, this makes the voltages of the nodes without a DC path
+# to ground, say only connected by capacitors or open switches, zero
+# rather than the A matrix being singular.
+GMIN = 1e-12
+
+
+def _evaluate(value, params=None):
+    """Evaluate the SymPy expression `value`.  If `params` is None, a
+    float is returned.  Otherwise, `params` is a dictionary of arrays
+    of parameter values keyed by symbol name and an array is returned
+    with an element for each set of parameters."""
+
+    from numpy import broadcast_to
+    from sympy import lambdify, sympify
+
+    value = sympify(value)
+    names = {} if params is None else params
+    unknown = {symbol for symbol in value.free_symbols
+               if str(symbol) not in names}
+    if unknown != set():
+        raise ValueError(
+            'Undefined symbols %s; use subs to replace with numerical values' % unknown)
+
+    if params is None:
+        return float(value)
+
+    P = len(next(iter(params.values())))
+    symbols = list(value.free_symbols)
+    func = lambdify(symbols, value, 'numpy')
+    result = func(*[params[str(symbol)] for symbol in symbols])
+    return broadcast_to(result, (P, )).astype(float)
 
 
 class SimulatedComponent(object):
 
-    def __init__(self, cpt, v1_index, v2_index, v3_index, i_index):
+    # Maximum number of past samples used by the companion model.
+    steps = 1
+
+    def __init__(self, cpt, v1_index, v2_index, v3_index, i_index,
+                 params=None):
 
         self.nodes = cpt.node_names
         self.name = cpt.name
@@ -30,11 +92,20 @@ class SimulatedComponent(object):
         self.Veqname = 'V%seq' % cpt.name
         self.Reqsym = symbol_map(self.Reqname)
         self.Veqsym = symbol_map(self.Veqname)
+        self.Ieqsym = symbol_map('I%seq' % cpt.name)
         self.v1_index = v1_index
         self.v2_index = v2_index
-        # This is the dummy node required for the Thevenin companion circuit.
+        # This is the dummy node required for the Thevenin companion
+        # circuit.  For the Norton companion circuit, v3_index is
+        # v2_index and i_index is the index of the current after the
+        # MNA branch currents.
         self.v3_index = v3_index
         self.i_index = i_index
+        self.norton = False
+        # Number of past samples used for the current step.  This is
+        # reduced at the start and when the timestep changes.
+        self.k = 1
+        self.params = params
 
     def subsdict(self, n, dt, v1, v2, i):
         """Create a dictionary of substitutions."""
@@ -46,8 +117,14 @@ class SimulatedComponent(object):
 
     def stamp(self, A, Z, num_nodes, n, dt, v1, v2, i):
 
+        self.stamp_A(A, n, dt, v1, v2, i)
+        self.stamp_Z(Z, num_nodes, n, dt, v1, v2, i)
+
+    def stamp_A(self, A, n, dt, v1, v2, i):
+        """Stamp the companion conductance into the A matrix.  This
+        only depends on the timestep `dt`."""
+
         geq = self.geq(n, dt, v1, v2, i)
-        veq = self.veq(n, dt, v1, v2, i)
 
         n1, n2 = self.v1_index, self.v3_index
 
@@ -59,26 +136,63 @@ class SimulatedComponent(object):
         if n2 >= 0:
             A[n2, n2] += geq
 
+    def stamp_Z(self, Z, num_nodes, n, dt, v1, v2, i):
+        """Stamp the companion voltage source (or current source for
+        the Norton model) into the Z vector."""
+
+        veq = self.veq(n, dt, v1, v2, i)
+
+        if self.norton:
+            self.geq_n = self.geq(n, dt, v1, v2, i)
+            self.ieq = self.geq_n * veq
+
+            n1, n2 = self.v1_index, self.v2_index
+            if n1 >= 0:
+                Z[n1] += self.ieq
+            if n2 >= 0:
+                Z[n2] -= self.ieq
+            return
+
         m = self.i_index + num_nodes
         Z[m] += veq
 
+    def current(self, x):
+        """Return the current through the Norton companion model given
+        the solution `x` of the MNA equations."""
+
+        v1 = x[self.v1_index] if self.v1_index >= 0 else 0
+        v2 = x[self.v2_index] if self.v2_index >= 0 else 0
+        return self.geq_n * (v1 - v2) - self.ieq
+
+    def _value(self, value):
+        """Convert component value to a float (or an array of floats for
+        each set of parameters) so that the companion model is
+        evaluated without SymPy arithmetic at each step."""
+
+        try:
+            return _evaluate(value, self.params)
+        except ValueError as e:
+            raise ValueError('%s for %s' % (e, self.name))
+
 
 class SimulatedCapacitor(SimulatedComponent):
 
-    def __init__(self, C, v1_index, v2_index, v3_index, i_index):
+    def __init__(self, C, v1_index, v2_index, v3_index, i_index,
+                 params=None):
 
         super(SimulatedCapacitor, self).__init__(C, v1_index, v2_index,
-                                                 v3_index, i_index)
-        self.Cval = C.C.expr
+                                                 v3_index, i_index, params)
+        self.Cval = self._value(C.C.expr)
 
 
 class SimulatedInductor(SimulatedComponent):
 
-    def __init__(self, L, v1_index, v2_index, v3_index, i_index):
+    def __init__(self, L, v1_index, v2_index, v3_index, i_index,
+                 params=None):
 
         super(SimulatedInductor, self).__init__(L, v1_index, v2_index,
-                                                v3_index, i_index)
-        self.Lval = L.L.expr
+                                                v3_index, i_index, params)
+        self.Lval = self._value(L.L.expr)
 
 
 class SimulatedCapacitorTrapezoid(SimulatedCapacitor):
@@ -144,6 +258,276 @@ class SimulatedInductorBackwardEuler(SimulatedInductor):
         return veq
 
 
+class SimulatedCapacitorGear(SimulatedCapacitor):
+    """Gear (backward differentiation formula) companion model using
+    `steps` past samples of the capacitor voltage."""
+
+    steps = 2
+
+    def geq(self, n, dt, v1, v2, i):
+
+        return GEAR_COEFFS[self.k][0] * self.Cval / dt
+
+    def veq(self, n, dt, v1, v2, i):
+
+        if n < 1:
+            return 0
+
+        a = GEAR_COEFFS[self.k]
+        veq = 0
+        for j in range(1, self.k + 1):
+            veq -= a[j] * (v1[n - j] - v2[n - j])
+        return veq / a[0]
+
+
+class SimulatedInductorGear(SimulatedInductor):
+    """Gear (backward differentiation formula) companion model using
+    `steps` past samples of the inductor current."""
+
+    steps = 2
+
+    def geq(self, n, dt, v1, v2, i):
+
+        return dt / (GEAR_COEFFS[self.k][0] * self.Lval)
+
+    def veq(self, n, dt, v1, v2, i):
+
+        if n < 1:
+            return 0
+
+        a = GEAR_COEFFS[self.k]
+        veq = 0
+        for j in range(1, self.k + 1):
+            veq += a[j] * i[n - j]
+        return veq * self.Lval / dt
+
+
+class SimulatedCapacitorGear3(SimulatedCapacitorGear):
+
+    steps = 3
+
+
+class SimulatedInductorGear3(SimulatedInductorGear):
+
+    steps = 3
+
+
+class SimulatedCapacitorGear4(SimulatedCapacitorGear):
+
+    steps = 4
+
+
+class SimulatedInductorGear4(SimulatedInductorGear):
+
+    steps = 4
+
+
+class SimulatedCapacitorGear5(SimulatedCapacitorGear):
+
+    steps = 5
+
+
+class SimulatedInductorGear5(SimulatedInductorGear):
+
+    steps = 5
+
+
+class SimulatedCapacitorGear6(SimulatedCapacitorGear):
+
+    steps = 6
+
+
+class SimulatedInductorGear6(SimulatedInductorGear):
+
+    steps = 6
+
+
+class SimulatedCapacitorTRBDF2(SimulatedCapacitor):
+    """TR-BDF2 companion model.  The attribute `stage` is the tuple
+    of the capacitor voltage and current found by the trapezoidal
+    stage."""
+
+    def geq(self, n, dt, v1, v2, i):
+
+        return TRBDF2_COEFFS[0] * self.Cval / dt
+
+    def veq(self, n, dt, v1, v2, i):
+
+        if n < 1:
+            return 0
+
+        c = TRBDF2_COEFFS
+        veq = c[1] * self.stage[0] + c[2] * (v1[n - 1] - v2[n - 1])
+        return -veq / c[0]
+
+
+class SimulatedInductorTRBDF2(SimulatedInductor):
+    """TR-BDF2 companion model.  The attribute `stage` is the tuple
+    of the inductor voltage and current found by the trapezoidal
+    stage."""
+
+    def geq(self, n, dt, v1, v2, i):
+
+        return dt / (TRBDF2_COEFFS[0] * self.Lval)
+
+    def veq(self, n, dt, v1, v2, i):
+
+        if n < 1:
+            return 0
+
+        c = TRBDF2_COEFFS
+        veq = c[1] * self.stage[1] + c[2] * i[n - 1]
+        return veq * self.Lval / dt
+
+
+class SimulatedTransmissionLine(object):
+    """Method of characteristics (Bergeron) model of a transmission
+    line.  The current into the line at each end is
+
+    i_a(t) = v_a(t) / Z0 - a (v_b(t - T) / Z0 + i_b(t - T))
+
+    where T is the delay and a is the attenuation factor, and
+    similarly for the other end.  Thus each end is modelled by a
+    conductance 1 / Z0 (in the resistive model) in parallel with a
+    current source that only depends on the past.  The voltages and
+    currents at the ends of the line are kept in a ring buffer that
+    covers the delay.  The timestep cannot exceed the delay."""
+
+    def __init__(self, cpt, indexes, params=None):
+
+        self.name = cpt.name
+        self.params = params
+        # Node indexes of the ends of the line.
+        self.indexes = indexes
+
+        Z0, T, a = cpt._bergeron()
+        self.Z0 = self._value(Z0)
+        self.a = self._value(a)
+        T = self._value(T)
+        if params is not None:
+            if (T != T[0]).any():
+                raise ValueError('Delay of %s depends on the parameters'
+                                 % self.name)
+            T = T[0]
+        if T <= 0:
+            raise ValueError('%s has no delay' % self.name)
+        self.T = float(T)
+
+        # Initial currents into the ends of the line.
+        self.i0 = (0, 0)
+
+    def _value(self, value):
+
+        try:
+            return _evaluate(value, self.params)
+        except ValueError as e:
+            raise ValueError('%s for %s' % (e, self.name))
+
+    def _voltages(self, x):
+
+        v = [x[index] if index >= 0 else 0 for index in self.indexes]
+        return v[0] - v[1], v[2] - v[3]
+
+    def reset(self, x0):
+        """Set the history to the constant voltages and currents of the
+        solution `x0` for t <= 0."""
+
+        from numpy import asarray, zeros
+
+        va, vb = self._voltages(x0)
+        value = asarray([va, self.i0[0], vb, self.i0[1]], dtype=float)
+
+        size = 64
+        self.times = zeros(size)
+        self.values = zeros((size, ) + value.shape)
+        self.times[0] = 0
+        self.values[0] = value
+        self.first = 0
+        self.count = 1
+
+    def _time(self, k):
+
+        return self.times[(self.first + k) % len(self.times)]
+
+    def _history(self, t):
+        """Return the voltages and currents (va, ia, vb, ib) at time `t`
+        using linear interpolation of the history."""
+
+        size = len(self.times)
+        last = self.count - 1
+        tlast = self._time(last)
+        if t > tlast + 1e-9 * self.T:
+            raise ValueError('Timestep exceeds the delay %s of %s'
+                             % (self.T, self.name))
+        if t >= tlast:
+            return self.values[(self.first + last) % size]
+        if t <= self._time(0):
+            return self.values[self.first]
+
+        # Find k with time(k) <= t < time(k + 1).
+        lo, hi = 0, last
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self._time(mid) <= t:
+                lo = mid
+            else:
+                hi = mid
+
+        t1, t2 = self._time(lo), self._time(hi)
+        v1 = self.values[(self.first + lo) % size]
+        v2 = self.values[(self.first + hi) % size]
+        return v1 + (v2 - v1) * ((t - t1) / (t2 - t1))
+
+    def sources(self, t):
+        """Return the currents of the current sources at the ends of
+        the line at time `t`."""
+
+        va, ia, vb, ib = self._history(t - self.T)
+        return (self.a * (vb / self.Z0 + ib), self.a * (va / self.Z0 + ia))
+
+    def stamp_Z(self, Z, t):
+        """Stamp the current sources for time `t` into the Z vector."""
+
+        for (n1, n2), Ih in zip((self.indexes[0:2], self.indexes[2:4]),
+                                self.sources(t)):
+            if n1 >= 0:
+                Z[n1] += Ih
+            if n2 >= 0:
+                Z[n2] -= Ih
+
+    def store(self, t, x):
+        """Add the voltages and currents at time `t` for the solution `x`
+        to the history."""
+
+        from numpy import asarray, concatenate, zeros_like
+
+        va, vb = self._voltages(x)
+        Iha, Ihb = self.sources(t)
+        value = asarray([va, va / self.Z0 - Iha, vb, vb / self.Z0 - Ihb],
+                        dtype=float)
+
+        size = len(self.times)
+        if self.count == size:
+            if self._time(1) <= t - self.T:
+                # The oldest sample is no longer needed.
+                self.first = (self.first + 1) % size
+                self.count -= 1
+            else:
+                # Grow the ring buffer, putting the samples in order.
+                order = [(self.first + k) % size for k in range(size)]
+                self.times = concatenate((self.times[order],
+                                          zeros_like(self.times)))
+                self.values = concatenate((self.values[order],
+                                           zeros_like(self.values)))
+                self.first = 0
+                size *= 2
+
+        index = (self.first + self.count) % size
+        self.times[index] = t
+        self.values[index] = value
+        self.count += 1
+
+
 class SimulationResultsNode(object):
 
     def __init__(self, v):
@@ -159,13 +543,16 @@ class SimulationResultsCpt(object):
 
 class SimulationResults(object):
 
-    def __init__(self, tv, cct, r_model, node_list, branch_list):
+    def __init__(self, tv, cct, r_model, node_list, branch_list,
+                 params=None, node_indexes=None, branch_indexes=None,
+                 filename=None, companion_names=()):
 
         from numpy import zeros
 
         self.t = tv
         self.cct = cct
         self.r_model = r_model
+        self.params = params
 
         N = len(tv)
 
@@ -174,11 +561,49 @@ class SimulationResults(object):
         # other elements can be found from the voltage difference
         # divided by the element resistance.
 
-        self.num_nodes = len(node_list) - 1
-        self.num_branches = len(branch_list)
+        # For the Norton companion model, the currents through the
+        # reactive components in `companion_names` follow the MNA
+        # branch currents.
+        self.companion_names = list(companion_names)
 
-        self.node_voltages = zeros((self.num_nodes + 1, N))
-        self.branch_currents = zeros((self.num_branches, N))
+        # If only some of the nodes and branches are stored,
+        # node_indexes and branch_indexes are lists of their MNA
+        # indexes.
+        self.node_indexes = node_indexes
+        self.branch_indexes = branch_indexes
+
+        if node_indexes is None:
+            self.num_nodes = len(node_list) - 1
+        else:
+            self.num_nodes = len(node_indexes)
+        if branch_indexes is None:
+            self.num_branches = len(branch_list) + len(companion_names)
+        else:
+            self.num_branches = len(branch_indexes)
+
+        # For a batched simulation, the last axis is for each set of
+        # parameters.
+        shape = (N, )
+        if params is not None:
+            shape = (N, len(next(iter(params.values()))))
+
+        if filename is None:
+            self.node_voltages = zeros((self.num_nodes + 1, ) + shape)
+            self.branch_currents = zeros((self.num_branches, ) + shape)
+            return
+
+        # Store the results in memory-mapped .npy files.
+        from numpy.lib.format import open_memmap
+
+        self.t = open_memmap(filename + '.t.npy', mode='w+', dtype=float,
+                             shape=(N, ))
+        self.t[:] = tv
+        self.node_voltages = open_memmap(filename + '.v.npy', mode='w+',
+                                         dtype=float,
+                                         shape=(self.num_nodes + 1, ) + shape)
+        self.branch_currents = open_memmap(filename + '.i.npy', mode='w+',
+                                           dtype=float,
+                                           shape=(self.num_branches, ) + shape)
 
     def __getitem__(self, name):
         """Return element or node by name."""
@@ -213,8 +638,13 @@ class SimulationResults(object):
     def _node_voltage_get(self, n):
 
         index = self.r_model.mna._node_index(n)
-        # NB, node_voltages is zero for index = -1
-        return self.node_voltages[index]
+        if self.node_indexes is not None and index >= 0:
+            if index not in self.node_indexes:
+                raise ValueError('Node %s not stored' % n)
+            index = self.node_indexes.index(index)
+        # NB, node_voltages is zero for index = -1.  For a batched
+        # simulation, the transpose puts the parameter axis first.
+        return self.node_voltages[index].T
 
     def _cpt_voltage_get(self, cptname):
 
@@ -227,8 +657,11 @@ class SimulationResults(object):
     def _cpt_current_get(self, cptname):
 
         try:
-            index = self.r_model.mna._branch_index(cptname)
-            return self.branch_currents[index]
+            if cptname in self.companion_names:
+                index = len(self.r_model.mna.unknown_branch_currents) + \
+                    self.companion_names.index(cptname)
+            else:
+                index = self.r_model.mna._branch_index(cptname)
         except:
             cpt = self.cct._elements[cptname]
             if cpt.is_capacitor or cpt.is_inductor:
@@ -238,11 +671,20 @@ class SimulationResults(object):
 
             Vd = self._cpt_voltage_get(cptname)
             if cpt.is_resistor or cpt.is_conductor:
-                return Vd / float(cpt.R.expr)
+                R = _evaluate(cpt.R.expr, self.params)
+                if self.params is not None:
+                    R = R[:, None]
+                return Vd / R
 
             # Need to determine resistance of the cpt
             raise ValueError('FIXME')
 
+        if self.branch_indexes is not None:
+            if index not in self.branch_indexes:
+                raise ValueError('Current through %s not stored' % cptname)
+            index = self.branch_indexes.index(index)
+        return self.branch_currents[index].T
+
     @property
     def V(self, node):
         """Node voltage with respect to ground."""
@@ -273,111 +715,511 @@ class Simulator(object):
         self.cct = cct
 
         # Companion resistor model
-        self.r_model = cct.r_model().subcircuits['time']
+        self.r_model = cct.r_model(switches=True).subcircuits['time']
+        self._r_models = {'thevenin': self.r_model}
+        self._op_mna = None
 
-    def _step(self, foo, n, tv, results):
+    def _Zsyms(self):
+        """Return list of the Z vectors with the parameters substituted
+        for each set of parameters."""
 
-        from numpy import array, linalg, dot
+        if self.params is None:
+            return [self.Zsym]
 
-        # Substitute values into the MNA A matrix and Z vector,
-        # then perform numerical inversion of the A matrix.
-        # Alternatively, a faster way, if the A matrix was small,
-        # would be to symbolically invert the A matrix and
-        # then substitute values.
+        symbols = [symbol for symbol in self.Zsym.free_symbols
+                   if str(symbol) in self.params]
+        if symbols == []:
+            return [self.Zsym] * self.P
 
-        if n == 0:
-            if not self.cct.is_IVP:
-                # Initial voltages and currents all zero.
-                return
-            p_model = self.cct.pre_initial_model()
-            # Evaluate model and copy node voltages and branch currents...
+        return [self.Zsym.subs({symbol: self.params[str(symbol)][p]
+                                for symbol in symbols})
+                for p in range(self.P)]
 
-            return
+    def _Z_eval(self, tv):
+        """Evaluate the Z vector for all the times `tv`.  This returns
+        an array with a row for each time.  For a batched simulation,
+        the last axis is for each set of parameters."""
+
+        from numpy import stack
 
-        dt = tv[n] - tv[n - 1]
-        subsdict = {tsym: tv[n]}
+        Zv = [self._Z_eval1(Zsym, tv) for Zsym in self._Zsyms()]
+        if self.params is None:
+            return Zv[0]
+        return stack(Zv, axis=-1)
 
-        Zsym = self.Zsym
-        Zsym = Zsym.subs(subsdict)
-        Z = array(Zsym).astype(float).squeeze()
+    def _Z_eval1(self, Zsym, tv):
 
-        if n == 1 and Zsym.free_symbols != set():
+        from numpy import broadcast_to, zeros
+        from .expr import expr
+
+        symbols = Zsym.free_symbols - {tsym}
+        if symbols != set():
             raise ValueError(
-                'Undefined symbols %s in Z vector; use subs to replace with numerical values' % Zsym.free_symbols)
+                'Undefined symbols %s in Z vector; use subs to replace with numerical values' % symbols)
+
+        Zv = zeros((len(tv), Zsym.shape[0]))
+        for m, value in enumerate(Zsym):
+            if value == 0:
+                continue
+            if not value.has(tsym):
+                Zv[:, m] = float(value)
+                continue
+            Zv[:, m] = broadcast_to(expr(value).evaluate(tv), len(tv)).real
+        return Zv
+
+    def _Z_func(self):
+        """Return function that evaluates the Z vector at time t."""
+
+        from numpy import stack
+
+        funcs = [self._Z_func1(Zsym) for Zsym in self._Zsyms()]
+        if self.params is None:
+            return funcs[0]
+        return lambda t: stack([func(t) for func in funcs], axis=-1)
+
+    def _Z_func1(self, Zsym):
+
+        from numpy import array
+        from sympy import lambdify
+        from .expr import expr
+
+        values = list(Zsym)
+        try:
+            func = lambdify(tsym, values, 'numpy')
+            func(0.0)
+        except (NameError, TypeError):
+            # Have Lcapy functions that NumPy does not know about.
+            def func(t):
+                return [expr(value).evaluate(t) for value in values]
+
+        return lambda t: array(func(t), dtype=complex).real
+
+    def _companions(self, integrator):
+        """Create list of companion models for the reactive components
+        using the specified integration method."""
+
+        integrators = {'trapezoid': (SimulatedCapacitorTrapezoid,
+                                     SimulatedInductorTrapezoid),
+                       'backward-euler': (SimulatedCapacitorBackwardEuler,
+                                          SimulatedInductorBackwardEuler),
+                       'gear2': (SimulatedCapacitorGear,
+                                 SimulatedInductorGear),
+                       'gear3': (SimulatedCapacitorGear3,
+                                 SimulatedInductorGear3),
+                       'gear4': (SimulatedCapacitorGear4,
+                                 SimulatedInductorGear4),
+                       'gear5': (SimulatedCapacitorGear5,
+                                 SimulatedInductorGear5),
+                       'gear6': (SimulatedCapacitorGear6,
+                                 SimulatedInductorGear6),
+                       'tr-bdf2': (SimulatedCapacitorTRBDF2,
+                                   SimulatedInductorTRBDF2)}
+        if integrator not in integrators:
+            raise ValueError('Unknown integrator ' + integrator)
+        Ccls, Lcls = integrators[integrator]
+
+        r_model = self.r_model
+        norton = self.companion == 'norton'
+
+        cpts = []
+        for key, elt in self.cct.elements.items():
+            if not (elt.is_inductor or elt.is_capacitor):
+                continue
+
+            v1_index = r_model.mna._node_index(elt.node_names[0])
+            v2_index = r_model.mna._node_index(elt.node_names[1])
+            if norton:
+                # The currents of the Norton companion models are
+                # stored after the MNA branch currents.
+                v3_index = v2_index
+                i_index = len(r_model.mna.unknown_branch_currents) + \
+                    len(cpts)
+            else:
+                i_index = r_model.mna._branch_index('V%seq' % elt.name)
+                relt = self.r_model.elements['R%seq' % elt.name]
+                v3_index = r_model.mna._node_index(relt.node_names[1])
+
+            if elt.is_inductor:
+                cls = Lcls
+            else:
+                cls = Ccls
+
+            cpt = cls(elt, v1_index, v2_index, v3_index, i_index,
+                      self.params)
+            cpt.norton = norton
+            cpts.append(cpt)
+        return cpts
+
+    def _solver(self, dt, integrator=None, k=1):
+        """Return function to solve A x = Z for the timestep `dt`.
+        The A matrix is factored once for each distinct timestep
+        and number of past samples `k` used by the companion models."""
+
+        if integrator is None:
+            integrator = self.integrator
+
+        key = (integrator, dt, k, self._config)
+        if key in self._solvers:
+            return self._solvers[key]
 
         # Ensure have a copy.
         A = self.A + 0
+        for cpt in self.companions[integrator]:
+            cpt.stamp_A(A, 1, dt, None, None, None)
+
+        # The zero voltage sources for the open switches are replaced
+        # by the equation i = 0.
+        for (row, active_time, closed), state in zip(self.switches,
+                                                     self._config):
+            if not state:
+                A[row, :] = 0
+                A[row, row] = 1
+
+        if self.params is not None:
+            solve = self._batch_solver(A)
+        elif A.shape[0] <= 100:
+            from scipy.linalg import lu_factor, lu_solve
+
+            lu = lu_factor(A)
+
+            def solve(Z):
+                return lu_solve(lu, Z)
+        else:
+            from scipy.sparse import csc_array
+            from scipy.sparse.linalg import splu
+
+            solve = splu(csc_array(A)).solve
+
+        self._solvers[key] = solve
+        return solve
+
+    def _batch_solver(self, A):
+        """Return function to solve the stacked systems A x = Z, where
+        the last axis of A and Z is for each set of parameters."""
+
+        from numpy import einsum, moveaxis, stack
 
-        for cpt in self.reactive_cpts:
+        if A.shape[0] <= 100:
+            from numpy.linalg import inv
+
+            # Invert all the matrices at once; this is cheaper than a
+            # Python loop over LU factorizations for small matrices.
+            Ainv = inv(moveaxis(A, -1, 0))
+
+            def solve(Z):
+                return einsum('pij,jp->ip', Ainv, Z)
+        else:
+            from scipy.sparse import csc_array
+            from scipy.sparse.linalg import splu
+
+            lus = [splu(csc_array(A[:, :, p])) for p in range(self.P)]
+
+            def solve(Z):
+                return stack([lu.solve(Z[:, p])
+                              for p, lu in enumerate(lus)], axis=-1)
+        return solve
+
+    def _switch(self, t):
+        """Set the switch configuration for the step starting at time
+        `t`.  When a switch changes state, the companion models
+        restart with a single past sample since the derivatives of
+        the voltages and currents are discontinuous."""
+
+        config = tuple((t >= active_time) == closed
+                       for row, active_time, closed in self.switches)
+        if config != self._config:
+            self._config = config
+            self._history = 0
+            self._switched = True
+
+    def _order(self, integrator, dt):
+        """Return the number of past samples that the companion models
+        can use for the timestep `dt`.  Multistep methods assume a
+        constant timestep so this is limited by the number of
+        previous steps with the same timestep."""
+
+        history = self._history if dt == self._dt_last else 0
+        return min(self._steps(integrator), history + 1)
+
+    def _steps(self, integrator):
+        """Return the maximum number of past samples used by the
+        companion models."""
+
+        return max([cpt.steps for cpt in self.companions[integrator]],
+                   default=1)
+
+    def _stage(self, n, dt, t, results):
+        """Find the voltages and currents of the reactive components at
+        the intermediate time t - (1 - gamma) dt of the TR-BDF2 method
+        using a trapezoidal step.  A backward-Euler step is used at the
+        start and after switching since the trapezoidal method is
+        inaccurate if the initial currents are inconsistent."""
+
+        if self._Zfunc is None:
+            self._Zfunc = self._Z_func()
+
+        dt1 = float('%.12g' % (TRBDF2_GAMMA * dt))
+        Z = self._Zfunc(t - dt + dt1)
+        if self._history == 0:
+            x = self._solve(Z, n, dt1, results, 'backward-euler',
+                            t - dt + dt1)
+        else:
+            x = self._solve(Z, n, dt1, results, 'trapezoid', t - dt + dt1)
+
+        num_nodes = results.num_nodes
+        for cpt in self.companions['tr-bdf2']:
+            v1 = x[cpt.v1_index] if cpt.v1_index >= 0 else 0
+            v2 = x[cpt.v2_index] if cpt.v2_index >= 0 else 0
+            cpt.stage = (v1 - v2, x[num_nodes + cpt.i_index])
+
+    def _solve(self, Z, n, dt, results, integrator=None, t=None):
+        """Solve for the unknowns at step `n` (at time `t`) given the Z
+        vector for the independent sources and the previous results."""
+
+        from numpy import array, concatenate
+
+        if integrator is None:
+            integrator = self.integrator
+
+        if integrator == 'tr-bdf2' and n > 0:
+            self._stage(n, dt, t, results)
+
+        # Ensure have a copy.
+        Z = Z + 0
+
+        k = self._order(integrator, dt)
+        companions = self.companions[integrator]
+        for cpt in companions:
+            cpt.k = k
 
             # NB, node_voltages is zero for index = -1
             v1 = results.node_voltages[cpt.v1_index]
             v2 = results.node_voltages[cpt.v2_index]
             i = results.branch_currents[cpt.i_index]
 
-            cpt.stamp(A, Z, results.num_nodes, n, dt, v1, v2, i)
+            cpt.stamp_Z(Z, results.num_nodes, n, dt, v1, v2, i)
+
+        for line in self.lines:
+            line.stamp_Z(Z, t)
 
-        Ainv = linalg.inv(A)
+        x = self._solver(dt, integrator, k)(Z)
+        if self.companion == 'norton' and companions != []:
+            # Append the currents of the Norton companion models
+            # found from the node voltages.
+            x = concatenate((x, array([cpt.current(x)
+                                       for cpt in companions])))
+        return x
 
-        results1 = dot(Ainv, Z)
+    def _store(self, results, n, x, dt, t):
 
         num_nodes = results.num_nodes
-        results.node_voltages[0:num_nodes, n] = results1[0:num_nodes]
-        results.branch_currents[:, n] = results1[num_nodes:]
+        results.node_voltages[0:num_nodes, n] = x[0:num_nodes]
+        results.branch_currents[:, n] = x[num_nodes:]
 
-    def __call__(self, tv, integrator='trapezoid'):
-        """Numerically evaluate circuit using time-stepping numerical
-        integration at the vector of times specified by `tv`.
+        for line in self.lines:
+            line.store(t, x)
 
-        Currently the only supported integration methods are
-        trapezoidal and backward-euler (others would be trivial to
-        add).  The trapezoidal integration method is the default since
-        it is accurate but it can be unstable producing some
-        oscillations.  Unfortunately, there is no ideal numerical
-        integration method and there is always a tradeoff between
-        accuracy and stability.
+        self._switched = False
+
+        # Count the consecutive steps with the same timestep.
+        if dt == self._dt_last:
+            self._history += 1
+        else:
+            self._history = 1
+            self._dt_last = dt
+
+    def _step(self, m, n, tv, Z, results):
+        """Find the results for the time tv[m] and store them in
+        column `n` of `results`."""
+
+        # The A matrix only depends on the timestep so it is factored
+        # once for each distinct timestep.  The Z vector is evaluated
+        # for a chunk of times in advance and the companion voltage
+        # sources are added at each step.
+
+        if m == 0:
+            # Start from the operating point.
+            self._initial(results, n)
+            return
+
+        # Round the timestep so that the factorization is reused
+        # despite floating point errors in the times.
+        dt = float('%.12g' % (tv[m] - tv[m - 1]))
+
+        self._switch(tv[m - 1])
+        integrator = self.integrator
+        if integrator == 'trapezoid' and self._switched:
+            # Like SPICE, use backward-Euler for the first step after
+            # switching since the trapezoidal method rings if the
+            # currents are inconsistent.
+            integrator = 'backward-euler'
+        x = self._solve(Z, n, dt, results, integrator, tv[m])
+        self._store(results, n, x, dt, tv[m])
+
+    def _chunks(self, tv, chunksize):
+        """Time-step over the times `tv` in chunks of `chunksize`
+        steps.  This is a generator that yields the tuple (start, stop,
+        results, H) for each chunk, where the results for
+        tv[start:stop] are in the columns H to H + stop - start of
+        `results`.  Only the last H columns, required by the
+        companion models for the next step, are kept between
+        chunks."""
+
+        from numpy import zeros
+
+        H = self._steps(self.integrator)
+        work = self._results_make(zeros(H + min(chunksize, len(tv))))
+
+        for start in range(0, len(tv), chunksize):
+            stop = min(start + chunksize, len(tv))
+            if start > 0:
+                # The previous chunk filled the work results.
+                work.t[0:H] = work.t[-H:].copy()
+                for array in (work.node_voltages, work.branch_currents):
+                    array[:, 0:H] = array[:, -H:].copy()
+
+            Zv = self._Z_eval(tv[start:stop])
+            for m in range(start, stop):
+                n = H + m - start
+                work.t[n] = tv[m]
+                self._step(m, n, tv, Zv[m - start], work)
+            yield start, stop, work, H
+
+    def _select(self, select):
+        """Return lists of the MNA indexes of the nodes and branches
+        required for the node and component names in `select`."""
+
+        if select is None:
+            return None, None
+
+        mna = self.r_model.mna
+        nodes, branches = set(), set()
+        for name in select:
+            if isinstance(name, int):
+                name = '%d' % name
+            if name in self.cct.nodes:
+                nodes.add(mna._node_index(name))
+                continue
+            if name not in self.cct.elements:
+                raise ValueError('Unknown element or node name %s' % name)
+
+            elt = self.cct.elements[name]
+            for node_name in elt.node_names[0:2]:
+                nodes.add(mna._node_index(node_name))
+            if name in self.companion_names:
+                branches.add(len(mna.unknown_branch_currents) +
+                             self.companion_names.index(name))
+                continue
+            if elt.is_capacitor or elt.is_inductor:
+                name = 'V%seq' % name
+            if name in mna.unknown_branch_currents:
+                branches.add(mna._branch_index(name))
+
+        nodes.discard(-1)
+        return sorted(nodes), sorted(branches)
+
+    def _extract(self, results, start, stop, work, H, offset, decimate):
+        """Copy the decimated results for tv[start:stop] from the work
+        results of a chunk into `results`, starting at column
+        `offset`.  This returns the number of columns copied."""
+
+        first = start + (-start) % decimate
+        cols = slice(H + first - start, H + stop - start, decimate)
+
+        nodes = results.node_indexes
+        if nodes is None:
+            nodes = slice(0, results.num_nodes)
+        branches = results.branch_indexes
+        if branches is None:
+            branches = slice(0, results.num_branches)
+
+        v = work.node_voltages[nodes, cols]
+        i = work.branch_currents[branches, cols]
+        M = v.shape[1]
+        results.node_voltages[0:results.num_nodes, offset:offset + M] = v
+        results.branch_currents[:, offset:offset + M] = i
+        return M
+
+    def stream(self, tv, integrator='trapezoid', params=None,
+               chunksize=10000, decimate=1, select=None,
+               companion='thevenin'):
+        """Numerically evaluate circuit at the vector of times `tv`
+        (see `__call__`) in chunks of `chunksize` steps.  This is a
+        generator that yields a `SimulationResults` object for each
+        chunk so that long simulations can be processed without
+        storing all the results.  Only every `decimate`-th time is
+        kept.  `select` is an optional list of the node and component
+        names to keep.  For example,
+
+        for results in sim.stream(t, chunksize=1000, select=['C1']):
+            print(results.C1.v.max())
 
         """
 
         from numpy import array
 
-        if integrator == 'trapezoid':
-            Ccls = SimulatedCapacitorTrapezoid
-            Lcls = SimulatedInductorTrapezoid
-        elif integrator == 'backward-euler':
-            Ccls = SimulatedCapacitorBackwardEuler
-            Lcls = SimulatedInductorBackwardEuler
-        else:
-            raise ValueError('Unknown integrator ' + integrator)
+        self.integrator = integrator
+        self._setup((integrator, ), params, companion)
 
-        r_model = self.r_model
+        tv = array(tv, dtype=float)
+        node_indexes, branch_indexes = self._select(select)
 
-        Asubsdict = {}
-        Zsubsdict = {}
-        self.reactive_cpts = []
-        for key, elt in self.cct.elements.items():
-            if not (elt.is_inductor or elt.is_capacitor):
-                continue
+        for start, stop, work, H in self._chunks(tv, chunksize):
+            first = start + (-start) % decimate
+            results = self._results_make(tv[first:stop:decimate],
+                                         node_indexes, branch_indexes)
+            self._extract(results, start, stop, work, H, 0, decimate)
+            yield results
 
-            if not elt.has_ic:
-                warn('Initial conditions for %s ignored' % elt.name)
+    def _setup(self, integrators, params=None, companion='thevenin'):
 
-            v1_index = r_model.mna._node_index(elt.node_names[0])
-            v2_index = r_model.mna._node_index(elt.node_names[1])
-            i_index = r_model.mna._branch_index('V%seq' % elt.name)
-            relt = self.r_model.elements['R%seq' % elt.name]
-            v3_index = r_model.mna._node_index(relt.node_names[1])
+        from numpy import array, asarray, atleast_1d, broadcast_arrays, zeros
 
-            if elt.is_inductor:
-                cls = Lcls
-            else:
-                cls = Ccls
+        if companion not in ('thevenin', 'norton'):
+            raise ValueError('Unknown companion model ' + companion)
+        if companion not in self._r_models:
+            self._r_models[companion] = self.cct.r_model(
+                norton=True, switches=True).subcircuits['time']
+        self.companion = companion
+        self.r_model = self._r_models[companion]
+        r_model = self.r_model
 
-            simcpt = cls(elt, v1_index, v2_index, v3_index, i_index)
-            self.reactive_cpts.append(simcpt)
+        if params is not None:
+            names = [str(name) for name in params]
+            values = broadcast_arrays(*[atleast_1d(asarray(value, dtype=float))
+                                        for value in params.values()])
+            if values[0].ndim != 1:
+                raise ValueError('Parameter values must be 1-D arrays')
+            params = dict(zip(names, values))
+            self.P = len(values[0])
+        else:
+            self.P = None
+        self.params = params
+
+        if 'tr-bdf2' in integrators and 'trapezoid' not in integrators:
+            # Need trapezoidal companion models for the TR-BDF2 stage.
+            integrators = integrators + ('trapezoid', )
+        if (('trapezoid' in integrators or 'tr-bdf2' in integrators) and
+                'backward-euler' not in integrators):
+            # Need backward-Euler companion models for the steps after
+            # switching (and the first TR-BDF2 stage).
+            integrators = integrators + ('backward-euler', )
+
+        self.companions = {}
+        for integrator in integrators:
+            self.companions[integrator] = self._companions(integrator)
+
+        self.companion_names = []
+        if companion == 'norton':
+            self.companion_names = [simcpt.name for simcpt in
+                                    self.companions[integrators[0]]]
 
+        Asubsdict = {}
+        Zsubsdict = {}
+        for simcpt in self.companions[integrators[0]]:
             Asubsdict[simcpt.Reqsym] = oo
             Zsubsdict[simcpt.Veqsym] = 0
+            Zsubsdict[simcpt.Ieqsym] = 0
 
         # Remove 1 / Req entries
         Asym = r_model.mna._A.subs(Asubsdict)
@@ -387,18 +1229,415 @@ class Simulator(object):
         self.Asym = Asym
         self.Zsym = Zsym
 
-        if Asym.free_symbols != set():
+        names = {} if params is None else params
+        symbols = {symbol for symbol in Asym.free_symbols
+                   if str(symbol) not in names}
+        if symbols != set():
             raise ValueError(
-                'Undefined symbols %s in A matrix; use subs to replace with numerical values' % Asym.free_symbols)
+                'Undefined symbols %s in A matrix; use subs to replace with numerical values' % symbols)
+
+        symbols = {symbol for symbol in Zsym.free_symbols - {tsym}
+                   if str(symbol) not in names}
+        if symbols != set():
+            raise ValueError(
+                'Undefined symbols %s in Z vector; use subs to replace with numerical values' % symbols)
 
         # Convert to numpy ndarray
-        self.A = array(Asym).astype(float)
+        if params is None:
+            self.A = array(Asym).astype(float)
+        else:
+            # Stack the A matrices for each set of parameters along
+            # the last axis.
+            N = Asym.shape[0]
+            self.A = zeros((N, N, self.P))
+            for (row, col), value in Asym.todok().items():
+                self.A[row, col] = _evaluate(value, params)
+        self._solvers = {}
+        self._Zfunc = None
+        self._history = 0
+        self._dt_last = None
+
+        # Switches are modelled by zero voltage sources in the
+        # resistive model.  The A matrix is factored for each
+        # configuration of the switches.
+        num_nodes = len(r_model.node_list) - 1
+        self.switches = []
+        for key, elt in self.cct.elements.items():
+            if not elt.is_switch:
+                continue
+            active_time = float(elt.args[0])
+            for name, closed in elt._switch_branches():
+                row = num_nodes + r_model.mna._branch_index(name)
+                self.switches.append((row, active_time, closed))
+        # Start with the configuration before t = 0 used for the
+        # operating point so that a switch at t = 0 is a switch event.
+        self._config = tuple((active_time < 0) == closed
+                             for row, active_time, closed in self.switches)
+        self._switched = False
+        self._switch(0)
+
+        # Transmission lines are modelled by their characteristic
+        # impedances in the resistive model and current sources that
+        # depend on the past voltages and currents.
+        self.lines = []
+        for key, elt in self.cct.elements.items():
+            if elt.type not in ('TL', 'TLlossless'):
+                continue
+            indexes = [r_model.mna._node_index(node_name)
+                       for node_name in elt.node_names[0:4]]
+            self.lines.append(SimulatedTransmissionLine(elt, indexes, params))
+
+        self._x0 = self._operating_point()
+
+    def _op_model(self):
+        """Create model for finding the operating point at t = 0.  The
+        independent sources are replaced by their pre-initial values
+        and the capacitors and inductors with initial conditions are
+        replaced by voltage and current sources.  With DC analysis,
+        the other capacitors are open circuit and the other inductors
+        are short circuit.  The switches are replaced by zero voltage
+        sources as for the resistive model."""
+
+        cct = self.cct
+        new = cct._new()
+
+        for cpt in cct._elements.values():
+            if cpt.is_switch:
+                net = cpt._r_model_switch()
+            elif (cpt.is_capacitor or cpt.is_inductor) and not cpt.has_ic:
+                net = cpt._copy()
+            elif cpt.is_inductor:
+                # The current source drives the initial current from
+                # the first node to the second node through the
+                # inductor.
+                net = cpt._netmake_variant('I', nodes=(cpt.relnodes[1],
+                                                       cpt.relnodes[0]),
+                                           args=cpt.cpt.i0)
+            else:
+                net = cpt._pre_initial_model()
+            new._add(net)
+        return new.select('dc')
+
+    def _operating_point(self):
+        """Return the vector of the unknowns of the resistive model at t
+        = 0 found by a numerical DC analysis of the operating point
+        model.  The capacitor voltages and inductor currents are their
+        initial conditions, if specified, otherwise their DC values
+        before t = 0.  A conductance GMIN from each node to ground
+        makes the voltages of the nodes without a DC path to ground
+        zero.  If the DC analysis still fails, say for a loop of
+        voltage sources, the initial values are zero."""
+
+        from numpy import zeros
+        from numpy.linalg import LinAlgError
+        from sympy import sympify
+        from .numericmna import SparseMNA
+        from .sym import eps
+
+        if self._op_mna is None:
+            self._op_mna = SparseMNA(self._op_model(), None)
+        mna = self._op_mna
+        r_model = self.r_model
+        cct = self.cct
+
+        def value(value1):
+            return _evaluate(sympify(value1).subs(eps, 0), self.params)
+
+        shape = () if self.P is None else (self.P, )
+        x0 = zeros((self.A.shape[0] + len(self.companion_names), ) + shape)
+
+        N = mna._A.shape[0]
+        A = zeros((N, N) + shape)
+        Z = zeros((N, ) + shape)
+        for (row, col), value1 in mna._A.todok().items():
+            A[row, col] = value(value1)
+        for (row, col), value1 in mna._Z.todok().items():
+            Z[row] = value(value1)
+
+        # The zero voltage sources for the switches that are open
+        # before t = 0 are replaced by the equation i = 0.
+        num_nodes = len(mna.cct.node_list) - 1
+        for key, elt in cct.elements.items():
+            if not elt.is_switch:
+                continue
+            active_time = float(elt.args[0])
+            for name, closed in elt._switch_branches():
+                if (active_time < 0) != closed:
+                    row = num_nodes + mna._branch_index(name)
+                    A[row, :] = 0
+                    A[row, row] = 1
+                    Z[row] = 0
+
+        for m in range(num_nodes):
+            A[m, m] += GMIN
+
+        try:
+            if self.params is not None:
+                x = self._batch_solver(A)(Z)
+            elif N <= 100:
+                from scipy.linalg import solve
+
+                x = solve(A, Z)
+            else:
+                from scipy.sparse import csc_array
+                from scipy.sparse.linalg import spsolve
+
+                x = spsolve(csc_array(A), Z)
+        except (LinAlgError, RuntimeError):
+            warn('Cannot determine operating point; using zero initial'
+                 ' values.\n%s' % mna._failure_reasons())
+            return x0
+
+        for node in mna.cct.node_list:
+            index = mna._node_index(node)
+            if index >= 0:
+                x0[r_model.mna._node_index(node)] = x[index]
+
+        r_num_nodes = len(r_model.node_list) - 1
+        for m, name in enumerate(r_model.mna.unknown_branch_currents):
+            if name in mna.unknown_branch_currents:
+                x0[r_num_nodes + m] = x[num_nodes + mna._branch_index(name)]
+
+        # The currents through the capacitors and inductors.
+        for cpt in self.companions[self.integrator]:
+            elt = cct.elements[cpt.name]
+            if elt.is_inductor and elt.has_ic:
+                i = value(elt.cpt.i0.expr)
+            elif elt.has_ic:
+                name = elt.namespace + 'V' + elt.relname
+                i = x[num_nodes + mna._branch_index(name)]
+            elif elt.is_inductor:
+                i = x[num_nodes + mna._branch_index(elt.name)]
+            else:
+                i = 0
+            x0[r_num_nodes + cpt.i_index] = i
+
+        # The currents into the ends of the transmission lines.
+        for line in self.lines:
+            i = x[num_nodes + mna._branch_index(line.name)]
+            line.i0 = (i, -i)
+        return x0
+
+    def _initial(self, results, n):
+        """Store the operating point in column `n` of `results`."""
+
+        num_nodes = results.num_nodes
+        results.node_voltages[:, n] = 0
+        results.node_voltages[0:num_nodes, n] = self._x0[0:num_nodes]
+        results.branch_currents[:, n] = self._x0[num_nodes:]
+
+        for line in self.lines:
+            line.reset(self._x0)
+
+    def _results_make(self, tv, node_indexes=None, branch_indexes=None,
+                      filename=None):
+
+        r_model = self.r_model
+        return SimulationResults(tv, self.cct, r_model,
+                                 r_model.node_list,
+                                 r_model.mna.unknown_branch_currents,
+                                 self.params, node_indexes, branch_indexes,
+                                 filename, self.companion_names)
+
+    def _adaptive(self, tstop, integrator, rtol, atol, dtmax, params,
+                  companion):
+        """Simulate from 0 to `tstop` with adaptive timestep control.
+        At each step, the solution is found with both the specified
+        companion models and the trapezoidal companion models (or
+        backward-Euler if the trapezoidal method is specified).  Their
+        difference estimates the local truncation error.  The step is
+        accepted if the error is within atol + rtol * |x| for every
+        unknown; otherwise the timestep is halved.  If the error is less than a
+        quarter of the tolerance, the timestep is doubled (up to
+        `dtmax`).  For multistep methods, the timestep is only
+        increased once all their past samples have the same timestep.
+        Since the timestep is dtmax / 2**k, the A matrix is only
+        refactored when the timestep changes to a new value."""
+
+        from numpy import abs, concatenate, ones, zeros, zeros_like
+
+        if integrator == 'trapezoid':
+            other = 'backward-euler'
+        else:
+            other = 'trapezoid'
+        self.integrator = integrator
+        self._setup((integrator, other), params, companion)
+
+        if dtmax is None:
+            dtmax = tstop / 50
+        # The timestep cannot exceed the transmission line delays.
+        dtmax = min([dtmax] + [line.T for line in self.lines])
+        dtmin = dtmax * 2**-40
+        dt = dtmax / 2**6
+
+        self._Zfunc = self._Z_func()
+        steps = self._steps(integrator)
+
+        # Ignore the internal nodes of the companion models since
+        # their voltages differ between the integration methods.
+        mask = ones(self.A.shape[0] + len(self.companion_names), dtype=bool)
+        for cpt in self.companions[integrator]:
+            if not cpt.norton and cpt.v3_index >= 0:
+                mask[cpt.v3_index] = False
+
+        # The steps end at the switching times so that the switches
+        # change state at the start of a step.
+        breakpoints = sorted(set([active_time for row, active_time, closed
+                                  in self.switches
+                                  if 0 < active_time < tstop] + [tstop]))
+
+        size = 1024
+        tv = zeros(size)
+        results = self._results_make(tv)
+        self._initial(results, 0)
+
+        n = 1
+        t = 0
+        while t < tstop:
+
+            if n == size:
+                # Grow the results arrays.
+                tv = concatenate((tv, zeros(size)))
+                results.node_voltages = concatenate(
+                    (results.node_voltages,
+                     zeros_like(results.node_voltages)), axis=1)
+                results.branch_currents = concatenate(
+                    (results.branch_currents,
+                     zeros_like(results.branch_currents)), axis=1)
+                size *= 2
+
+            # Ensure the step ends at the next breakpoint without a
+            # tiny step.
+            tend = breakpoints[0]
+            last = tend - t <= dt * (1 + 1e-6)
+            dt1 = float('%.12g' % (tend - t)) if last else dt
+
+            self._switch(t)
+            Z = self._Zfunc(t + dt1)
+            x = self._solve(Z, n, dt1, results, integrator, t + dt1)
+            x_other = self._solve(Z, n, dt1, results, other, t + dt1)
+
+            err = (abs(x - x_other) / (atol + rtol * abs(x)))[mask].max()
+            if self._switched and integrator == 'trapezoid':
+                # Like SPICE, use backward-Euler for the first step
+                # after switching since the trapezoidal method rings if
+                # the currents are inconsistent.
+                x = x_other
+            if err > 1 and dt1 > dtmin:
+                # Halve the timestep.  If the step was shortened to end
+                # at a breakpoint, retry with a timestep less than the
+                # shortened step.  This keeps dt on the dtmax / 2**k
+                # lattice so the factorizations are reused.
+                dt /= 2
+                while dt >= dt1:
+                    dt /= 2
+                continue
+
+            t = tend if last else t + dt1
+            if last:
+                breakpoints.pop(0)
+            tv[n] = t
+            self._store(results, n, x, dt1, t)
+            n += 1
+            if (err < 0.25 and dt < dtmax and
+                    self._order(integrator, dt1) == steps):
+                dt *= 2
+
+        results.t = tv[0:n]
+        results.node_voltages = results.node_voltages[:, 0:n]
+        results.branch_currents = results.branch_currents[:, 0:n]
+        return results
+
+    def __call__(self, tv, integrator='trapezoid', rtol=1e-3, atol=1e-6,
+                 dtmax=None, params=None, filename=None, decimate=1,
+                 select=None, chunksize=10000, companion='thevenin'):
+        """Numerically evaluate circuit using time-stepping numerical
+        integration at the vector of times specified by `tv`.
+
+        The supported integration methods are 'trapezoid',
+        'backward-euler', 'gear2' to 'gear6', and 'tr-bdf2'.  The
+        trapezoidal integration method is the default since it is
+        accurate but it can be unstable producing some oscillations,
+        especially for stiff circuits.  Unfortunately, there is no
+        ideal numerical integration method and there is always a
+        tradeoff between accuracy and stability.
+
+        The Gear methods (backward differentiation formulas) of order
+        k use the k previous samples.  They damp the oscillations of
+        stiff circuits (the second order method is A-stable) and are
+        accurate for uniformly spaced times.  The order is reduced for
+        the first steps and after the timestep changes.  The TR-BDF2
+        method uses an intermediate trapezoidal step followed by a
+        second order backward differentiation formula.  It is
+        second order accurate, L-stable, and does not need past
+        samples.
+
+        If `tv` is a scalar, it specifies the stop time and the
+        timestep is adaptively chosen so that the estimated local
+        truncation error is within `atol + rtol * |x|` for each
+        unknown x.  The maximum timestep is `dtmax` (default `tv /
+        50`).  The times are returned as the attribute `t` of the
+        results.  For example,
+
+        results = sim(1e-3, rtol=1e-4)
+        plot(results.t, results.C1.v)
+
+        `params` is an optional dictionary of arrays of values for the
+        symbolic component values, keyed by symbol name.  All the
+        sets of parameters are simulated together using stacked A
+        matrices and the arrays of the results have a leading axis
+        for each set of parameters.  For example,
+
+        cct = Circuit('''
+        V1 1 0 step 10
+        R1 1 2 R
+        C1 2 0 C''')
+        results = cct.sim(t, params={'R': [1, 2, 5], 'C': 1e-3})
+        plot(t, results.C1.v.T)
+
+        The time-stepping is performed in chunks of `chunksize` steps
+        and only every `decimate`-th time is stored.  `select` is an
+        optional list of the node and component names to store.  If
+        `filename` is specified, the results are written to the
+        memory-mapped files filename.t.npy (times), filename.v.npy
+        (node voltages), and filename.i.npy (branch currents) rather
+        than being held in memory.  See also `stream()`.
+
+        `companion` selects the companion models of the reactive
+        components.  The default 'thevenin' model uses a resistor and
+        voltage source with an internal node and a branch current for
+        each component.  The 'norton' model stamps a conductance and
+        current source directly into the MNA equations so the A
+        matrix is smaller.  The currents through the reactive
+        components are then found from their node voltages after each
+        step.
+
+        """
+
+        from numpy import array, ndim
+
+        if ndim(tv) == 0:
+            if (filename, decimate, select) != (None, 1, None):
+                raise ValueError('filename, decimate, and select are not'
+                                 ' supported for adaptive simulation')
+            return self._adaptive(float(tv), integrator, rtol, atol, dtmax,
+                                  params, companion)
+
+        self.integrator = integrator
+        self._setup((integrator, ), params, companion)
 
-        results = SimulationResults(tv, self.cct, r_model,
-                                    r_model.node_list,
-                                    r_model.mna.unknown_branch_currents)
+        tv = array(tv, dtype=float)
+        node_indexes, branch_indexes = self._select(select)
+        results = self._results_make(tv[::decimate], node_indexes,
+                                     branch_indexes, filename)
 
-        for n, t1 in enumerate(tv):
-            self._step(r_model, n, tv, results)
+        offset = 0
+        for start, stop, work, H in self._chunks(tv, chunksize):
+            offset += self._extract(results, start, stop, work, H, offset,
+                                    decimate)
 
+        if filename is not None:
+            results.t.flush()
+            results.node_voltages.flush()
+            results.branch_currents.flush()
         return results
@@ -0,0 +1,270 @@
+"""This module provides the SolverSelector class and the
+solver_selector instance of this class.  This is used to choose the
+SymPy method for solving a system of equations or inverting a matrix
+when the 'auto' method is specified.
+
+Copyright 2026 Michael Hayes, UCECE
+
+"""
+
+from .rcparams import rcParams
+from collections import deque
+from time import perf_counter
+
+
+def _race_worker(queue, func, method, M, b):
+
+    try:
+        start = perf_counter()
+        result = func(M, b, method)
+        queue.put((method, perf_counter() - start, result))
+    except Exception:
+        queue.put((method, None, None))
+
+
+def _solve(M, b, method):
+
+    from .matrix import matrix_solve
+
+    return matrix_solve(M, b, method=method)
+
+
+def _inverse(M, b, method):
+
+    from .matrix import matrix_inverse
+
+    return matrix_inverse(M, method=method)
+
+
+class SolverSelector(object):
+    """This class chooses the SymPy method for solving a system of
+    equations or inverting a matrix.  The method is chosen using a
+    cost model based on the shape, density, and symbols of the
+    matrix.  Alternatively, if rcParams['sympy.solver.race'] is True,
+    the candidate methods are raced in separate processes, with a
+    time budget of rcParams['sympy.solver.race_timeout'] seconds, and
+    the fastest method is used.
+
+    The winning method is recorded for the signature of the matrix so
+    that later solutions of similar matrices use it.  The recorded
+    methods can be saved to a file with `save()` and restored with
+    `load()`.  The method and time taken for the last `stats_window`
+    solutions for each signature are recorded in `stats`.
+
+    """
+
+    methods = ('DM', 'GE', 'LU', 'ADJ')
+    stats_window = 10
+    symbols_threshold = 8
+
+    def __init__(self):
+
+        self.winners = {}
+        self.stats = {}
+
+    def clear(self):
+        """Forget the recorded methods and timing statistics."""
+
+        self.winners = {}
+        self.stats = {}
+
+    def _record(self, key, method, elapsed):
+        """Record the time taken to solve a matrix with signature `key`
+        using `method`.  Only the last `stats_window` times are kept
+        for each signature."""
+
+        if key not in self.stats:
+            self.stats[key] = deque(maxlen=self.stats_window)
+        self.stats[key].append((method, elapsed))
+
+    def signature(self, M, kind='solve'):
+        """Return tuple characterising matrix `M`: (kind, number of
+        rows, number of non-zero elements, number of symbols, domain
+        class)."""
+
+        N = M.shape[0]
+        nnz = sum(1 for x in M if x != 0)
+        nsymbols = len(M.free_symbols)
+        return (kind, N, nnz, nsymbols, self._domain(M))
+
+    def _domain(self, M):
+        """Classify the domain of the elements of `M` as 'int'
+        (rational numbers), 'float', 'poly' (rational functions of
+        symbols), or 'expr' (other expressions, for example, with
+        sqrt or exp)."""
+
+        try:
+            domain = M.to_DM().domain
+        except Exception:
+            return 'expr'
+
+        if domain.is_RR or domain.is_CC:
+            return 'float'
+        if domain.is_EX or domain.is_EXRAW:
+            return 'expr'
+        if domain.is_PolynomialRing or domain.is_FractionField:
+            if not all(gen.is_Symbol for gen in domain.symbols):
+                return 'expr'
+            if not domain.domain.is_Exact:
+                return 'float'
+            return 'poly'
+        if domain.is_Exact:
+            return 'int'
+        return 'expr'
+
+    def cost_model(self, key, candidates=None):
+        """Choose method for a matrix with signature `key` from the
+        matrix size and density, the number of symbols, and the
+        domain of its elements:
+
+        - ADJ for small matrices (N <= 3) since the cofactor
+          expansion is cheap and gives compact expressions,
+        - LU for floating point numbers,
+        - DM for other matrices without symbols, and for rational
+          functions of symbols, since fraction-free elimination
+          avoids expression swell,
+        - for other expressions (such as with sqrt or exp) that the
+          DomainMatrix cannot represent efficiently, ADJ if the
+          matrix is sparse, otherwise GE or, if there are at least
+          `symbols_threshold` symbols, DM since the expressions
+          found by GE swell with many symbols.
+
+        """
+
+        if candidates is None:
+            candidates = self.methods
+
+        (kind, N, nnz, nsymbols, domain) = key
+        density = nnz / (N * N) if N > 0 else 1
+
+        if N <= 3:
+            preferred = ('ADJ', 'DM', 'GE', 'LU')
+        elif domain == 'float':
+            preferred = ('LU', 'GE', 'DM', 'ADJ')
+        elif domain in ('int', 'poly') or nsymbols == 0:
+            preferred = ('DM', 'GE', 'ADJ', 'LU')
+        elif density < 0.3:
+            preferred = ('ADJ', 'GE', 'DM', 'LU')
+        elif nsymbols >= self.symbols_threshold:
+            preferred = ('DM', 'ADJ', 'GE', 'LU')
+        else:
+            preferred = ('GE', 'ADJ', 'DM', 'LU')
+
+        for method in preferred:
+            if method in candidates:
+                return method
+        return candidates[0]
+
+    def choose(self, M, kind='solve', candidates=None):
+        """Return the recorded method for the signature of `M` or the
+        method chosen by the cost model."""
+
+        return self._choose(self.signature(M, kind), candidates)
+
+    def _choose(self, key, candidates=None):
+
+        method = self.winners.get(key, None)
+        if method is not None and (candidates is None or
+                                   method in candidates):
+            return method
+        return self.cost_model(key, candidates)
+
+    def race(self, M, b=None, kind='solve', candidates=None, timeout=None):
+        """Race the `candidates` methods in separate processes and return
+        the tuple (method, result) for the first method to finish
+        within `timeout` seconds.  The other processes are
+        terminated.  If no method finishes in time, the method chosen
+        by the cost model is used in this process."""
+
+        from multiprocessing import Process, Queue
+        from queue import Empty
+
+        if candidates is None:
+            candidates = self.methods
+        if timeout is None:
+            timeout = rcParams['sympy.solver.race_timeout']
+        func = _solve if kind == 'solve' else _inverse
+        key = self.signature(M, kind)
+
+        queue = Queue()
+        processes = [Process(target=_race_worker,
+                             args=(queue, func, method, M, b), daemon=True)
+                     for method in candidates]
+        for process in processes:
+            process.start()
+
+        method, result = None, None
+        deadline = perf_counter() + timeout
+        try:
+            for m in range(len(processes)):
+                remaining = deadline - perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    method1, elapsed, result1 = queue.get(timeout=remaining)
+                except Empty:
+                    break
+                if elapsed is not None:
+                    method, result = method1, result1
+                    self.winners[key] = method
+                    self._record(key, method, elapsed)
+                    break
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+        if method is None:
+            method = self.cost_model(key, candidates)
+            result = self._timed(func, M, b, key, method)
+        return method, result
+
+    def _timed(self, func, M, b, key, method):
+
+        start = perf_counter()
+        result = func(M, b, method)
+        self._record(key, method, perf_counter() - start)
+        return result
+
+    def _run(self, M, b, kind, candidates):
+
+        func = _solve if kind == 'solve' else _inverse
+
+        key = self.signature(M, kind)
+        if rcParams['sympy.solver.race'] and key not in self.winners:
+            return self.race(M, b, kind, candidates)[1]
+
+        method = self._choose(key, candidates)
+        return self._timed(func, M, b, key, method)
+
+    def solve(self, M, b, candidates=None):
+        """Solve M x = b for x using the automatically chosen method."""
+
+        return self._run(M, b, 'solve', candidates)
+
+    def inverse(self, M, candidates=None):
+        """Invert `M` using the automatically chosen method."""
+
+        return self._run(M, None, 'inverse', candidates)
+
+    def save(self, filename):
+        """Save the recorded methods to a JSON file."""
+
+        from json import dump
+
+        with open(filename, 'w') as f:
+            dump([list(key) + [method]
+                  for key, method in self.winners.items()], f)
+
+    def load(self, filename):
+        """Load recorded methods from a JSON file created by `save()`."""
+
+        from json import load
+
+        with open(filename) as f:
+            for entry in load(f):
+                self.winners[tuple(entry[:-1])] = entry[-1]
+
+
+solver_selector = SolverSelector()
@@ -9,9 +9,12 @@ Copyright 2020--2023 Michael Hayes, UCECE
 from .symbols import omega
 from .state import state
 from .mna import MNA
+from .numericmna import NumericMNA
+from .rcparams import rcParams
 from .netlistmixin import NetlistMixin
 from .netlistsimplifymixin import NetlistSimplifyMixin
 from .netfile import NetfileMixin
+import sympy as sym
 
 
 class SubNetlist(NetlistMixin, NetlistSimplifyMixin, NetfileMixin):
@@ -20,7 +23,7 @@ class SubNetlist(NetlistMixin, NetlistSimplifyMixin, NetfileMixin):
     for internal use only.  Unlike Netlist, SubNetlist is not mutable.
     """
 
-    def __new__(cls, netlist, kind):
+    def __new__(cls, netlist, kind, solve_cache=None):
 
         kinds = ('t', 'dc', 's', 'time', 'ivp', 'laplace')
         if not isinstance(kind, str) or kind[0] == 'n':
@@ -38,13 +41,62 @@ class SubNetlist(NetlistMixin, NetlistSimplifyMixin, NetfileMixin):
         obj.solver_method = netlist.solver_method
         return obj
 
-    def __init__(self, netlist, kind):
+    def __init__(self, netlist, kind, solve_cache=None):
         """kind can be 't', 'dc', 's', 'time', 'ivp', 'n*' or
         omega, where 'n*' is a noise identifer and omega is an angular
-        frequency."""
+        frequency.
+
+        `solve_cache` is an optional `MNASolveCache` object used to
+        share the solution of the MNA equations with other
+        subnetlists that have the same A matrix."""
 
         # This creates the stamps but does not solve them.
-        self.mna = MNA(self, self.solver_method)
+        self.mna = self._mna_make()
+        if solve_cache is not None:
+            solve_cache.add(self.mna)
+
+    def _mna_make(self):
+        """Create MNA object using backend specified by
+        rcParams['mna.backend'].  With 'auto', the sparse numerical
+        backend is used if all the elements of the A matrix are
+        numerical and the circuit is large enough to benefit."""
+
+        backend = rcParams['mna.backend']
+        if backend == 'symbolic':
+            return MNA(self, self.solver_method)
+        elif backend == 'numeric':
+            return NumericMNA(self, self.solver_method)
+
+        if (len(self.node_list) - 1 < rcParams['mna.numeric_threshold']
+                or not self._has_numeric_A):
+            return MNA(self, self.solver_method)
+        return NumericMNA(self, self.solver_method)
+
+    @property
+    def _has_numeric_A(self):
+        """Return True if all the elements of the A matrix will be
+        numerical.  This is checked before the stamps are created.
+        The values of the independent sources only affect the Z
+        vector.  The reactive components are functions of the domain
+        variable except for DC analysis or phasor analysis at a
+        numerical angular frequency."""
+
+        kind = self.kind
+        if kind == 'dc':
+            numeric_kind = True
+        elif isinstance(kind, str):
+            numeric_kind = False
+        else:
+            numeric_kind = sym.sympify(kind).is_number
+
+        for elt in self.elements.values():
+            if elt.is_independent_source:
+                continue
+            if elt.has_symbolic_value:
+                return False
+            if elt.is_reactive and not numeric_kind:
+                return False
+        return True
 
     def get_I(self, name):
         """Current through component"""
@@ -1097,3 +1097,399 @@ V2 3 0 ac
 """)
 
         self.assertEqual(cct._analysis_kind(), 'time', 'time')
+
+    def test_numeric_mna(self):
+        """Check sparse numeric MNA backend"""
+
+        from lcapy.mna import MNA
+        from lcapy.numericmna import NumericMNA
+
+        netlist = """
+V1 1 0 10
+R1 1 2 1000
+R2 2 3 3000
+R3 3 0 2000
+I1 2 0 {2 * u(t)}"""
+
+        old = rcParams['mna.backend']
+        rcParams['mna.backend'] = 'numeric'
+        try:
+            cct = Circuit(netlist)
+            self.assertEqual(type(cct.modified_nodal_analysis()),
+                             NumericMNA, 'NumericMNA')
+            v2 = cct[2].v
+            cct = Circuit(netlist + """
+C1 3 4 1e-6
+C2 4 0 1e-6""").dc()
+            V4 = cct[4].V
+        finally:
+            rcParams['mna.backend'] = old
+
+        cct = Circuit(netlist)
+        self.assertAlmostEqual(v2(1).fval, cct[2].v(1).fval, 9, 'v2')
+        self.assertEqual(V4, voltage(5) / 3, 'V4')
+
+        cct = Circuit("""
+V1 1 0 10
+R1 1 2 R1
+R2 2 0 3000""")
+        old = rcParams['mna.backend']
+        rcParams['mna.backend'] = 'numeric'
+        try:
+            self.assertRaises(ValueError, cct.modified_nodal_analysis)
+        finally:
+            rcParams['mna.backend'] = old
+
+        old = rcParams['mna.numeric_threshold']
+        rcParams['mna.numeric_threshold'] = 1
+        try:
+            self.assertEqual(type(cct.modified_nodal_analysis()), MNA,
+                             'auto symbolic')
+            cct = Circuit(netlist + '\nC1 3 0 1e-6')
+            mna = cct.laplace().modified_nodal_analysis()
+            self.assertEqual(type(mna), MNA, 'auto reactive')
+            self.assertEqual(type(cct.dc().modified_nodal_analysis()),
+                             NumericMNA, 'auto dc')
+        finally:
+            rcParams['mna.numeric_threshold'] = old
+
+    def test_solve_cache(self):
+        """Check sharing of MNA solution between subnetlists"""
+
+        from lcapy.mna import MNA
+        from lcapy.numericmna import NumericMNA
+
+        cct = Circuit("""
+V1 1 0 noise 3
+V2 2 0 noise 4
+V3 3 0 2
+R1 1 4 1
+R2 2 4 2
+R3 3 4 3
+C1 4 0 5""")
+        mna1 = cct.sub['n1'].mna
+        mna2 = cct.sub['n2'].mna
+        self.assertEqual(mna1._solve_key(), mna2._solve_key(), 'key')
+        self.assertNotEqual(mna1._solve_key(), cct.sub['dc'].mna._solve_key(),
+                            'dc key')
+        mna1.Vdict
+        self.assertTrue(hasattr(mna2, '_unknowns'), 'n2 solved')
+
+        for kind in ('n1', 'n2'):
+            sub = cct.sub[kind]
+            mna = MNA(sub, sub.solver_method)
+            self.assertEqual(sub.mna.Vdict['4'], mna.Vdict['4'], kind)
+        self.assertEqual(cct[4].V.dc, voltage(4) / 11, 'dc')
+
+        old = rcParams['mna.backend']
+        rcParams['mna.backend'] = 'numeric'
+        try:
+            cct = Circuit("""
+V1 1 0 noise 3
+V2 2 0 noise 4
+R1 1 3 1
+R2 2 3 2
+R3 3 0 3""")
+            V3 = [complex(cct.sub[kind].mna.Vdict['3'].sympy)
+                  for kind in cct.kinds]
+            self.assertEqual(type(cct.sub[cct.kinds[0]].mna), NumericMNA,
+                             'NumericMNA')
+        finally:
+            rcParams['mna.backend'] = old
+        self.assertAlmostEqual(V3[0], 18 / 11, 9, 'numeric n1')
+        self.assertAlmostEqual(V3[1], 12 / 11, 9, 'numeric n2')
+
+    def test_mna_update(self):
+        """Check incremental MNA update"""
+
+        cct = Circuit("""
+V1 1 0 10
+R1 1 2 1000
+R2 2 0 3000
+C1 2 3 1e-6
+R3 3 0 500""")
+        mna = cct.modified_nodal_analysis()
+        self.assertEqual(mna.Vdict['2'], voltage(15) / 2, 'V2')
+        mna.update('R1', 3000)
+        self.assertEqual(mna.Vdict['2'], voltage(5), 'V2 R1 updated')
+        self.assertEqual(mna.Idict['R1'], current(1) / 600, 'I1 R1 updated')
+        mna.update('V1', 20)
+        self.assertEqual(mna.Vdict['2'], voltage(10), 'V2 V1 updated')
+        self.assertRaises(ValueError, mna.update, 'R4', 20)
+        connected = cct.nodes['1'].connected
+        self.assertEqual(len(connected), 2, 'node 1 connections')
+        self.assertTrue(cct.elements['R1'] in connected, 'R1 attached')
+        self.assertEqual(cct.nodes['1'].count, 2, 'node 1 count')
+
+        net = 'V1 1 0 10\n' + '\n'.join(['R%d %d %d %d\nRg%d %d 0 %d' %
+                                          (n, n, n + 1, n + 1, n, n + 1,
+                                           2 * n + 3) for n in range(1, 30)])
+        old = rcParams['mna.backend']
+        rcParams['mna.backend'] = 'numeric'
+        try:
+            mna = Circuit(net).modified_nodal_analysis()
+            mna.Vdict
+            mna.update('R3', 17)
+            mna.update('Rg7', 1000)
+            self.assertTrue(mna._woodbury is not None, 'Woodbury update')
+            V5 = mna.Vdict['5']
+        finally:
+            rcParams['mna.backend'] = old
+
+        net = net.replace('R3 3 4 4', 'R3 3 4 17')
+        net = net.replace('Rg7 8 0 17', 'Rg7 8 0 1000')
+        self.assertAlmostEqual(V5.fval, Circuit(net)[5].V.dc.fval, 9, 'V5')
+
+    def test_sensitivity(self):
+        """Check adjoint sensitivity analysis"""
+
+        from numpy import pi
+
+        cct = Circuit("""
+V1 1 0 10
+R1 1 2 1000
+R2 2 0 3000
+R3 2 3 500
+C1 3 0 1e-6""")
+
+        S = cct.sensitivity('V2', ['R1', 'R2', 'C1'])
+        R1, R2 = symbol('R1'), symbol('R2')
+        self.assertEqual(S['R1'], -10 * R2 / (R1 + R2)**2, 'R1')
+        self.assertEqual(S['C1'], 0, 'C1')
+
+        S = cct.sensitivity('V2', numeric=True)
+        self.assertAlmostEqual(S['R1'], -30000 / 4000**2, 12, 'R1 numeric')
+        self.assertAlmostEqual(S['R2'], 10000 / 4000**2, 12, 'R2 numeric')
+        self.assertAlmostEqual(S['V1'], 0.75, 12, 'V1 numeric')
+
+        S = cct.sensitivity('I(R1)', ['R1'], numeric=True)
+        self.assertAlmostEqual(S['R1'], -10 / 4000**2, 12, 'I(R1) numeric')
+
+        # Series capacitors make the DC A matrix singular without
+        # the eps conductances.
+        cct = Circuit("""
+V1 1 0 dc 10
+R1 1 2 100
+C1 2 3 1e-6
+C2 3 0 2e-6
+R3 2 0 300""")
+        S = cct.sensitivity('V(2)', numeric=True)
+        self.assertAlmostEqual(S['V1'], 0.75, 12, 'V1 series C')
+        self.assertAlmostEqual(S['R1'], -3000 / 400**2, 12, 'R1 series C')
+        self.assertAlmostEqual(S['C1'], 0, 12, 'C1 series C')
+
+        cct = Circuit("""
+V1 1 0 step 10
+R1 1 2 1000
+C1 2 0 1e-6""")
+        S = cct.sensitivity('V2', ['R1'], numeric=True, f=[100])
+        s1 = 2j * pi * 100
+        self.assertAlmostEqual(S['R1'][0], -1e-5 / (1e-3 * s1 + 1)**2, 12,
+                               'R1 s-domain')
+        self.assertRaises(ValueError, cct.sensitivity, 'V2', numeric=True)
+
+    def test_compile(self):
+        """Check compiled circuit"""
+
+        from numpy import array, linspace, allclose
+
+        cct = Circuit("""
+V1 1 0 step 2
+R1 1 2 3
+C1 2 0 4
+R2 2 0 R2""")
+
+        tv = linspace(0, 10, 5)
+        cc = cct.compile(['V2', 'I(R1)'], params=['R1', 'C1', 'R2'])
+        results = cc(t=tv, R2=5)
+
+        cct5 = cct.subs({'R2': 5})
+        self.assertTrue(allclose(results['V2'], cct5[2].v.evaluate(tv)), 'V2')
+        self.assertTrue(allclose(results['I(R1)'],
+                                 cct5.R1.i.evaluate(tv)), 'I(R1)')
+
+        C = array([1, 2, 4])
+        results = cc(tv, R2=5, C1=C[:, None])
+        self.assertEqual(results['V2'].shape, (3, 5), 'shape')
+        cct5 = Circuit("""
+V1 1 0 step 2
+R1 1 2 3
+C1 2 0 2
+R2 2 0 5""")
+        self.assertTrue(allclose(results['V2'][1], cct5[2].v.evaluate(tv)),
+                        'V2 C1=2')
+
+        self.assertRaises(ValueError, cc, tv)
+        self.assertRaises(ValueError, cct.compile, ['V2'], params=['R1'])
+
+        cc = cct.compile(['V2'], params=['R2'], domain='s')
+        sv = array([1j, 2j])
+        self.assertTrue(allclose(cc(s=sv, R2=5)['V2'],
+                                 cct.subs({'R2': 5})[2].V(s).evaluate(sv)),
+                        'V2(s)')
+
+    def test_ac_sweep(self):
+        """Check AC sweep"""
+
+        from numpy import array, pi, allclose
+
+        cct = Circuit("""
+V1 1 0 ac 2
+R1 1 2 3
+C1 2 0 4e-3
+L1 2 3 5e-3
+R2 3 0 10""")
+
+        f = array([1, 10, 100, 1000])
+        V3 = cct[3].V[omega0].sympy
+        I1 = cct.R1.I[omega0].sympy
+        V3ref = array([complex(V3.subs(omega0, 2 * pi * f1)) for f1 in f])
+        I1ref = array([complex(I1.subs(omega0, 2 * pi * f1)) for f1 in f])
+
+        for method in ('dense', 'sparse'):
+            results = cct.ac_sweep(f, method=method)
+            self.assertTrue(allclose(results[3].V, V3ref), 'V3 ' + method)
+            self.assertTrue(allclose(results.R1.I, I1ref), 'I1 ' + method)
+
+        results = cct.ac_sweep(f, outputs=['V3', 'V(2, 3)', 'I(R1)'])
+        self.assertTrue(allclose(results['V3'], V3ref), 'V3 output')
+        self.assertTrue(allclose(results['I(R1)'], I1ref), 'I(R1) output')
+        self.assertTrue(allclose(results['V(2, 3)'], cct.ac_sweep(f).L1.V),
+                        'V(2, 3) output')
+
+        cct = Circuit("""
+V1 1 0 s 1
+R1 1 2 3
+C1 2 0 C""")
+        self.assertRaises(ValueError, cct.ac_sweep, f)
+
+    def test_monte_carlo(self):
+        """Lcapy: check Monte Carlo analysis
+
+        """
+        from numpy import allclose, abs, array, pi
+
+        cct = Circuit("""
+V1 1 0 10
+R1 1 2 1e3
+R2 2 0 1e3""")
+        dists = {'R1': ('normal', 1e3, 0.01), 'R2': ('uniform', 0.05)}
+        results = cct.monte_carlo('V2', dists, n=1000, seed=1)
+        R1, R2 = results.samples['R1'], results.samples['R2']
+        self.assertEqual(results.n, 1000, 'n')
+        self.assertTrue(allclose(results.values, 10 * R2 / (R1 + R2)), 'V2')
+        self.assertTrue(R2.min() >= 950 and R2.max() <= 1050, 'uniform')
+        q = results.percentiles([0, 100], quantity='value')
+        self.assertTrue(q[0] < 5 < q[1], 'percentiles')
+        counts, edges = results.histogram(bins=10)
+        self.assertEqual(counts.sum(), 1000, 'histogram')
+
+        results2 = cct.monte_carlo('V2', dists, n=1000, seed=1, workers=2)
+        self.assertTrue(allclose(results.values, results2.values), 'workers')
+
+        cct = Circuit("""
+V1 1 0 ac 1
+R1 1 2 1e3
+C1 2 0 1e-6""")
+        f = [10, 100, 1000]
+        results = cct.monte_carlo('I(R1)', {'C1': ('normal', 0.1)}, n=100,
+                                  f=f, seed=2)
+        C1 = results.samples['C1'][:, None]
+        s = 2j * pi * array(f)
+        self.assertEqual(results.values.shape, (100, 3), 'shape')
+        self.assertTrue(allclose(results.values, s * C1 / (1 + s * C1 * 1e3)),
+                        'I(R1)')
+        self.assertTrue(allclose(results.gain, abs(results.values)), 'gain')
+
+        self.assertRaises(ValueError, cct.monte_carlo, 'V2',
+                          {'R1': ('foo', 0.1)})
+
+    def test_parallel_workers(self):
+        """Lcapy: check solving subnetlists in a process pool
+
+        """
+        netlist = """
+V1 1 0 {3 + 2 * cos(3 * t) + u(t)}
+I1 1 0 noise 2
+R1 1 2 R
+C1 2 0 C
+V2 2 3 ac 4
+R2 3 0 5"""
+        cct = Circuit(netlist)
+        V2 = cct[2].V
+
+        old = rcParams['analysis.workers']
+        rcParams['analysis.workers'] = 2
+        try:
+            cct = Circuit(netlist)
+            for sub in cct.sub.values():
+                self.assertTrue(hasattr(sub.mna, '_unknowns'), 'solved')
+            self.assertEqual(cct[2].V, V2, 'V2')
+            self.assertEqual(list(cct[2].V.keys()), list(V2.keys()), 'order')
+        finally:
+            rcParams['analysis.workers'] = old
+
+    def test_auto_solver(self):
+        """Lcapy: check automatic solver selection
+
+        """
+        from lcapy.solverselector import solver_selector
+        from lcapy.matrix import matrix_solve, matrix_inverse
+        import sympy as sym
+
+        netlist = """
+V1 1 0 {3 + u(t)}
+I1 1 0 noise 2
+R1 1 2 R
+C1 2 0 C
+L1 2 3 L
+R2 3 0 5"""
+        V3 = Circuit(netlist)[3].V
+
+        solver_selector.clear()
+        cct = Circuit(netlist)
+        cct.solver_method = 'auto'
+        self.assertEqual(cct[3].V, V3, 'auto')
+        self.assertTrue(len(solver_selector.stats) > 0, 'stats')
+
+        x, y = sym.symbols('x y')
+        M = sym.Matrix([[x, 1], [1, y]])
+        b = sym.Matrix([1, 0])
+        self.assertEqual(sym.simplify(matrix_solve(M, b, method='auto') -
+                                      M.solve(b)), sym.zeros(2, 1), 'solve')
+        self.assertEqual(sym.simplify(matrix_inverse(M, method='auto') -
+                                      M.inv()), sym.zeros(2, 2), 'inverse')
+        for m in range(2 * solver_selector.stats_window):
+            matrix_solve(M, b, method='auto')
+        key = solver_selector.signature(M)
+        self.assertEqual(len(solver_selector.stats[key]),
+                         solver_selector.stats_window, 'stats window')
+        M = sym.Matrix([[1.5, 0, 0, 1], [0, 2, 0, 0],
+                        [0, 0, 3, 0], [1, 0, 0, 4]])
+        self.assertEqual(solver_selector.choose(M), 'LU', 'float')
+        self.assertEqual(solver_selector.choose(M, candidates=('DM', 'ADJ')),
+                         'DM', 'candidates')
+
+        # Dense 4 x 4 matrix with sqrt or exp elements; only the
+        # number of symbols differs.
+        key = ('solve', 4, 16, 2, 'expr')
+        self.assertEqual(solver_selector.cost_model(key), 'GE', 'few symbols')
+        key = ('solve', 4, 16, solver_selector.symbols_threshold, 'expr')
+        self.assertEqual(solver_selector.cost_model(key), 'DM',
+                         'many symbols')
+        key = ('solve', 4, 16, 0, 'expr')
+        self.assertEqual(solver_selector.cost_model(key), 'DM', 'no symbols')
+
+        old = rcParams['sympy.solver.race']
+        rcParams['sympy.solver.race'] = True
+        try:
+            solver_selector.clear()
+            M = sym.Matrix([[x, 1, 0, 0], [1, y, 1, 0],
+                            [0, 1, x, 1], [0, 0, 1, y]])
+            b = sym.Matrix([1, 0, 0, 0])
+            X = matrix_solve(M, b, method='auto')
+            self.assertEqual(sym.simplify(M * X - b), sym.zeros(4, 1), 'race')
+            self.assertEqual(len(solver_selector.winners), 1, 'winner')
+        finally:
+            rcParams['sympy.solver.race'] = old
+            solver_selector.clear()
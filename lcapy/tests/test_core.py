@@ -5,6 +5,9 @@ from lcapy.cexpr import (ConstantDomainExpression,
 from lcapy.fexpr import FourierDomainExpression
 from lcapy.omegaexpr import AngularFourierDomainExpression
 
+import importlib.util
+import numpy as np
+import shutil
 import unittest
 
 
@@ -422,6 +425,145 @@ class LcapyCoreTester(unittest.TestCase):
                          "Evaluate fail for sqrt(1+1j)")
         self.assertEqual(a.evaluate(4), 2, "Evaluate fail for sqrt(4)")
 
+    def test_evaluate_vector(self):
+        """Check vectorized evaluate
+
+        """
+
+        tv = np.array([-1, 0, 1.0])
+        a = sin(t) / t
+        self.assertTrue(np.allclose(a.evaluate(tv), [sin(1).fval, 1, sin(1).fval]),
+                        "Evaluate fail for sin(t) / t")
+        a = exp(-t) * u(t)
+        self.assertTrue(np.allclose(a.evaluate((-1000, 0, 1)),
+                                    [0, 0.5, np.exp(-1)]),
+                        "Evaluate fail for exp(-t) * u(t)")
+        a = (-1)**n * u(n)
+        self.assertTrue(np.allclose(a.evaluate(np.arange(-2, 3)),
+                                    [0, 0, 1, -1, 1]),
+                        "Evaluate fail for (-1)**n * u(n)")
+        a = sqrt(t)
+        self.assertTrue(np.allclose(a.evaluate([-4, 4]), [2j, 2]),
+                        "Evaluate fail for sqrt(t)")
+        fv = np.linspace(0, 10, 1001)
+        H = 1 / (j * 2 * pi * f + 1)
+        self.assertTrue(np.allclose(H.evaluate(fv),
+                                    1 / (2j * np.pi * fv + 1)),
+                        "Evaluate fail for H(f)")
+
+    def test_evaluate_ratfun(self):
+        """Check evaluate for rational functions using polynomial
+        coefficients
+
+        """
+
+        from lcapy.ratfun import RatfunEvaluator
+
+        wv = np.logspace(-2, 2, 201)
+        sv = 1j * wv
+        H = 1 / ((s + 1)**6 * (s**2 + s / 2 + 1)**3)
+        Href = 1 / ((sv + 1)**6 * (sv**2 + sv / 2 + 1)**3)
+        e = RatfunEvaluator(H.sympy, ssym)
+        self.assertEqual(e.degree, 12, "RatfunEvaluator degree")
+        self.assertEqual(len(e.ZPK[1]), 12, "RatfunEvaluator poles")
+        self.assertTrue(np.allclose(H.evaluate(sv), Href, rtol=1e-12),
+                        "Evaluate fail for ZPK form")
+
+        zpk_degree = rcParams['evaluate.zpk_degree']
+        rcParams['evaluate.zpk_degree'] = 100
+        try:
+            self.assertTrue(np.allclose(e(sv), Href, rtol=1e-12),
+                            "Evaluate fail for Horner form")
+        finally:
+            rcParams['evaluate.zpk_degree'] = zpk_degree
+
+        H = (s**2 + 1) / (s + 2) + 1 / s
+        self.assertTrue(np.allclose(H.evaluate(sv),
+                                    (sv**2 + 1) / (sv + 2) + 1 / sv),
+                        "Evaluate fail for sum of rational functions")
+        H = (s**2 - 1) / (s - 1)
+        self.assertTrue(np.allclose(H.evaluate((0, 1, 2)), (1, 2, 3)),
+                        "Evaluate fail at removable pole")
+        with self.assertRaises(ValueError):
+            RatfunEvaluator((exp(-s) / s).sympy, ssym)
+
+    def test_evaluate_broadcast(self):
+        """Check evaluate with symbol values broadcast
+
+        """
+
+        H = 1 / (1 + j * 2 * pi * f * symbol('R') * symbol('C'))
+        fv = np.logspace(0, 4, 41)
+        Rv = np.linspace(100, 1000, 10)
+        Href = 1 / (1 + 2j * np.pi * fv * Rv[:, None] * 1e-6)
+        Hv = H.evaluate(f=fv, R=Rv[:, None], C=1e-6)
+        self.assertEqual(Hv.shape, (10, 41), "Evaluate broadcast shape")
+        self.assertTrue(np.allclose(Hv, Href), "Evaluate broadcast values")
+        self.assertTrue(np.allclose(H.evaluate(fv, R=100, C=1e-6), Href[0]),
+                        "Evaluate broadcast with arg")
+        self.assertEqual(expr('R * C').evaluate(R=2, C=3), 6,
+                         "Evaluate broadcast for scalars")
+
+        a = sin(symbol('a') * t) / t
+        self.assertTrue(np.allclose(a.evaluate(t=(0, 1), a=((2, ), (3, ))),
+                                    [[2, np.sin(2)], [3, np.sin(3)]]),
+                        "Evaluate broadcast limit")
+        with self.assertRaises(ValueError):
+            H.evaluate(f=fv, R=100)
+
+    def _evaluate_backend(self, backend):
+        """Evaluate expression with `backend` and check that it is used
+        rather than falling back to NumPy.  This returns the cached
+        function."""
+
+        from tempfile import mkdtemp
+        from shutil import rmtree
+        from warnings import catch_warnings, simplefilter
+        from lcapy.expr import _lambdify_cache
+
+        H = 1 / (1 + j * 2 * pi * f * symbol('R') * symbol('C')) + exp(-f)
+        fv = np.logspace(0, 4, 41)
+        Href = H.evaluate(f=fv, R=np.array([[100], [200]]), C=1e-6)
+
+        backend1 = rcParams['evaluate.backend']
+        cache_dir = rcParams['evaluate.cache_dir']
+        rcParams['evaluate.cache_dir'] = mkdtemp()
+        try:
+            rcParams['evaluate.backend'] = backend
+            with catch_warnings():
+                # The fallback to NumPy warns.
+                simplefilter('error')
+                Hv = H.evaluate(f=fv, R=np.array([[100], [200]]), C=1e-6)
+            func = next(reversed(_lambdify_cache.values()))
+        finally:
+            rmtree(rcParams['evaluate.cache_dir'])
+            rcParams['evaluate.backend'] = backend1
+            rcParams['evaluate.cache_dir'] = cache_dir
+
+        self.assertTrue(np.allclose(Hv, Href),
+                        "Evaluate fail for %s backend" % backend)
+        return func
+
+    @unittest.skipIf(shutil.which('cc') is None, 'No C compiler')
+    def test_evaluate_autowrap(self):
+        """Check evaluate with autowrap backend
+
+        """
+
+        from lcapy.codegen import CompiledFunction
+
+        func = self._evaluate_backend('autowrap')
+        self.assertTrue(isinstance(func, CompiledFunction), 'Not compiled')
+
+    @unittest.skipIf(importlib.util.find_spec('numexpr') is None,
+                     'numexpr not installed')
+    def test_evaluate_numexpr(self):
+        """Check evaluate with numexpr backend
+
+        """
+
+        self._evaluate_backend('numexpr')
+
     def test_zp2k(self):
         """Test zp2k"""
 
@@ -155,3 +155,60 @@ class LcapyTester(unittest.TestCase):
         a = expr('x(t)', causal=True).convolve(expr('g(t)', causal=True,
                                                     commutate=True))
         self.assertEqual(a(s), expr('X(s) * G(s)'), "X(s) * G(s)")
+
+    def test_numeric_inverse_laplace(self):
+
+        import numpy as np
+        from scipy.special import erfc
+
+        tv = np.linspace(0, 10, 101)
+
+        H = 1 / (s * (s**2 + s + 1))
+        ref = H.time().evaluate(tv)
+        for method in ('dehoog', 'talbot', 'weeks'):
+            vv = H.evaluate_time(tv, method)
+            self.assertTrue(np.allclose(vv[1:], ref[1:], atol=1e-6),
+                            "evaluate_time %s" % method)
+        self.assertEqual(H.evaluate_time(tv)[0], 0, "evaluate_time t=0")
+
+        V = 1 / (s * (1 + sqrt(s)))
+        ref = 1 - np.exp(tv) * erfc(np.sqrt(tv))
+        self.assertTrue(np.allclose(V.evaluate_time(tv), ref, atol=1e-6),
+                        "evaluate_time sqrt(s)")
+
+        # Underdamped response that oscillates for many periods.
+        H = 1 / (s**2 + 2 * s + 101)
+        tv2 = np.linspace(1, 10, 901)
+        ref = np.exp(-tv2) * np.sin(10 * tv2) / 10
+        for method in ('dehoog', 'weeks'):
+            vv = H.evaluate_time(tv2, method)
+            self.assertTrue(np.allclose(vv, ref, atol=1e-6),
+                            "evaluate_time underdamped %s" % method)
+
+        # Response for log-spaced times.
+        tv2 = np.logspace(-3, 3, 50)
+        ref = np.exp(-tv2)
+        for method in ('dehoog', 'weeks'):
+            vv = (1 / (s + 1)).evaluate_time(tv2, method)
+            self.assertTrue(np.allclose(vv, ref, atol=1e-6),
+                            "evaluate_time log-spaced %s" % method)
+
+        V = exp(-s) / (s + 1)
+        ref = np.where(tv > 1, np.exp(1 - tv), 0)
+        mask = abs(tv - 1) > 0.05
+        self.assertTrue(np.allclose(V.evaluate_time(tv)[mask], ref[mask],
+                                    atol=1e-5), "evaluate_time exp(-s)")
+        for method in ('talbot', 'weeks'):
+            with self.assertRaises(ValueError):
+                V.evaluate_time(tv, method)
+
+        # Diffusive RC line; this is not a delay.
+        V = exp(-sqrt(s)) / s
+        ref = erfc(1 / (2 * np.sqrt(tv[1:])))
+        self.assertTrue(np.allclose(V.evaluate_time(tv[1:], 'talbot'), ref,
+                                    atol=1e-6), "evaluate_time exp(-sqrt(s))")
+
+        with self.assertRaises(ValueError):
+            H.evaluate_time(tv, 'foo')
+        with self.assertRaises(ValueError):
+            (1 / (s + 'a')).evaluate_time(tv)
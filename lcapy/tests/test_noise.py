@@ -168,3 +168,42 @@ class LcapyTester(unittest.TestCase):
         V2 = V1.as_voltage()
 
         self.assertEqual(V1, V2, 'as_voltage')
+
+    def test_noise_analysis(self):
+
+        from numpy import allclose, array, pi
+        from scipy.constants import k
+
+        a = Circuit("""
+V1 1 0 noise 3e-9
+I1 2 0 noise 2e-12
+R1 1 2 1000
+R2 2 0 2000
+C1 2 0 1e-6""").noisy(T=300)
+        fv = array([10, 100, 1000])
+        b = a.subs({'k_B': k})
+
+        results = a.noise_analysis(2, fv)
+        self.assertEqual(set(results.contributions),
+                         {'V1', 'I1', 'VnR1', 'VnR2'}, 'contributions')
+        self.assertTrue(allclose(results.total,
+                                 b[2].V.n.evaluate(2 * pi * fv)), 'V2')
+        self.assertTrue(allclose(sum(results.fractions().values()), 1),
+                        'fractions')
+
+        results = a.noise_analysis('I(C1)', fv, method='sparse')
+        self.assertTrue(allclose(results.total,
+                                 b.C1.I.n.evaluate(2 * pi * fv)), 'I(C1)')
+
+        a = Circuit("""
+V1 1 0 noise 3 n9
+I1 2 0 noise 2 n9
+R1 1 2 1000
+R2 2 0 2000""")
+        results = a.noise_analysis('V2', [1, 2])
+        self.assertTrue(allclose(results.contributions['V1, I1'],
+                                 4006 / 3), 'correlated')
+
+        self.assertRaises(ValueError, Circuit("""
+V1 1 0 1
+R1 1 0 1""").noise_analysis, 'V1', fv)
@@ -1,6 +1,7 @@
 from lcapy import *
 import numpy as np
 import unittest
+import warnings
 
 
 class LcapyTester(unittest.TestCase):
@@ -24,3 +25,315 @@ class LcapyTester(unittest.TestCase):
         self.assertEqual(np.round(results.R1.i[-1], 3), 2, 'iR[-1]')
         self.assertEqual(np.round(results.L1.v[-1], 3), 0, 'vL[0]')
         self.assertEqual(np.round(results.L1.i[-1], 3), 2, 'iL[-1]')
+
+    def test_sim_factorization(self):
+
+        cct = Circuit("""
+        V1 1 0 {10 * u(t)}
+        R1 1 2 2
+        C1 2 0 0.5""")
+
+        tv = np.concatenate((np.linspace(0, 1, 1001),
+                             np.linspace(1.01, 4, 300)))
+        results = cct.sim(tv, integrator='backward-euler')
+        # One factorization for each distinct timestep.
+        self.assertEqual(len(cct.sim._solvers), 2, 'factorizations')
+
+        results = cct.sim(tv)
+        vC = 10 * (1 - np.exp(-tv))
+        self.assertTrue(np.allclose(results.C1.v[1:], vC[1:], atol=1e-2),
+                        'vC')
+        # Without switches, the first step uses the trapezoidal method.
+        self.assertTrue(np.isclose(results.C1.v[1], 10 / 2001), 'first step')
+
+    def test_sim_adaptive(self):
+
+        cct = Circuit("""
+        V1 1 0 {10 * u(t)}
+        R1 1 2 2
+        C1 2 0 0.5""")
+
+        results = cct.sim(4, rtol=1e-4)
+        vC = 10 * (1 - np.exp(-results.t))
+        self.assertEqual(results.t[-1], 4, 'tstop')
+        self.assertTrue(np.allclose(results.C1.v, vC, atol=1e-3), 'vC')
+        # A uniform grid needs about 10000 steps for this accuracy.
+        self.assertTrue(len(results.t) < 1000, 'steps')
+
+        # Only the steps ending at the breakpoints (the switching time
+        # and the stop time) are not dtmax / 2**k.
+        cct = Circuit("""
+        V1 1 0 {10 * u(t - 0.995)}
+        R1 1 2 1
+        C1 2 0 0.01
+        SW1 2 3 no 1
+        R2 3 0 1""")
+        results = cct.sim(2, rtol=1e-4)
+        k = np.log2((2 / 50) / np.diff(results.t))
+        self.assertTrue(sum(abs(k - np.round(k)) > 1e-6) <= 2, 'lattice')
+
+    def test_sim_gear(self):
+
+        cct = Circuit("""
+        V1 1 0 {t**5 * u(t)}
+        R1 1 2 2
+        C1 2 0 0.5""")
+
+        tv = np.linspace(0, 4, 81)
+        t = tv
+        vC = (t**5 - 5 * t**4 + 20 * t**3 - 60 * t**2 + 120 * t - 120 +
+              120 * np.exp(-t))
+
+        errors = {}
+        for integrator in ('trapezoid', 'gear2', 'gear4', 'tr-bdf2'):
+            results = cct.sim(tv, integrator=integrator)
+            errors[integrator] = abs(results.C1.v - vC).max()
+        self.assertTrue(errors['gear4'] < errors['trapezoid'] / 100,
+                        'gear4')
+        self.assertTrue(errors['tr-bdf2'] < errors['trapezoid'], 'tr-bdf2')
+
+        # The trapezoidal method rings for a stiff circuit.
+        cct = Circuit("""
+        V1 1 0 {10 * u(t)}
+        R1 1 2 1
+        C1 2 0 1e-4""")
+        tv = np.linspace(0, 4, 41)
+        for integrator in ('gear2', 'tr-bdf2'):
+            results = cct.sim(tv, integrator=integrator)
+            self.assertTrue(np.allclose(results.C1.v[3:], 10, atol=1e-3),
+                            integrator)
+
+    def test_sim_params(self):
+
+        cct = Circuit("""
+        V1 1 0 {10 * u(t)}
+        R1 1 2 R
+        C1 2 0 C""")
+
+        tv = np.linspace(0, 4, 201)
+        results = cct.sim(tv, params={'R': [1, 2, 4], 'C': 0.5})
+        self.assertEqual(results.C1.v.shape, (3, len(tv)), 'shape')
+        self.assertEqual(results.R1.i.shape, (3, len(tv)), 'shape')
+
+        for p, R in enumerate((1, 2, 4)):
+            results1 = cct.subs({'R': R, 'C': 0.5}).sim(tv)
+            self.assertTrue(np.allclose(results.C1.v[p], results1.C1.v),
+                            'vC')
+            self.assertTrue(np.allclose(results.C1.i[p], results1.C1.i),
+                            'iC')
+
+    def test_sim_stream(self):
+
+        import os
+        import tempfile
+
+        cct = Circuit("""
+        V1 1 0 {10 * u(t)}
+        R1 1 2 2
+        C1 2 0 0.5
+        L1 2 3 1
+        R2 3 0 1""")
+
+        tv = np.linspace(0, 4, 1001)
+        ref = cct.sim(tv, integrator='gear3')
+
+        results = cct.sim(tv, integrator='gear3', chunksize=37, decimate=3,
+                          select=['C1', 'L1'])
+        self.assertTrue(np.allclose(results.t, tv[::3]), 't')
+        self.assertTrue(np.allclose(results.C1.v, ref.C1.v[::3]), 'vC')
+        self.assertTrue(np.allclose(results.L1.i, ref.L1.i[::3]), 'iL')
+        self.assertRaises(ValueError, lambda: results.V1.i)
+
+        chunks = list(cct.sim.stream(tv, integrator='gear3', chunksize=100))
+        self.assertEqual(len(chunks), 11, 'chunks')
+        v = np.concatenate([chunk.C1.v for chunk in chunks])
+        self.assertTrue(np.allclose(v, ref.C1.v), 'stream vC')
+
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'sim')
+            results = cct.sim(tv, integrator='gear3', chunksize=100,
+                              filename=filename)
+            self.assertTrue(np.allclose(results.C1.v, ref.C1.v), 'file vC')
+            del results
+            v = np.load(filename + '.v.npy', mmap_mode='r')
+            self.assertEqual(v.shape, ref.node_voltages.shape, 'file shape')
+            del v
+            t = np.load(filename + '.t.npy')
+            self.assertTrue(np.array_equal(t, tv), 'file t')
+
+    def test_sim_switch(self):
+
+        cct = Circuit("""
+        V1 1 0 dc 10
+        SW1 1 2 no 1
+        R1 2 3 1
+        C1 3 0 1
+        SW2 3 4 nc 3
+        R2 4 0 1""")
+
+        # Only the simulator replaces the switches.
+        self.assertTrue('SW1' in cct.r_model().elements, 'r_model')
+
+        def vC(t):
+            v = np.zeros_like(t)
+            m = (t > 1) & (t <= 3)
+            v[m] = 5 * (1 - np.exp(-(t[m] - 1) / 0.5))
+            m = t > 3
+            v[m] = 10 - (5 + 5 * np.exp(-4)) * np.exp(-(t[m] - 3))
+            return v
+
+        tv = np.linspace(0, 6, 601)
+        for integrator in ('trapezoid', 'gear2', 'tr-bdf2'):
+            results = cct.sim(tv, integrator=integrator)
+            self.assertTrue(np.allclose(results.C1.v, vC(tv), atol=2e-3),
+                            integrator)
+            self.assertTrue(np.allclose(results.R2.i[301:], 0), 'iR2')
+
+        results = cct.sim(6, rtol=1e-4)
+        self.assertTrue(1 in results.t and 3 in results.t, 'breakpoints')
+        self.assertTrue(np.allclose(results.C1.v, vC(results.t), atol=2e-3),
+                        'adaptive')
+
+    def test_sim_norton(self):
+
+        cct = Circuit("""
+        V1 1 0 step 10
+        R1 1 2 2
+        C1 2 0 0.5
+        R2 2 3 1
+        L1 3 0 0.2""")
+
+        tv = np.linspace(0, 3, 301)
+        for integrator in ('trapezoid', 'gear2', 'tr-bdf2'):
+            r1 = cct.sim(tv, integrator=integrator)
+            N1 = cct.sim.A.shape[0]
+            r2 = cct.sim(tv, integrator=integrator, companion='norton')
+            N2 = cct.sim.A.shape[0]
+            self.assertTrue(N2 < N1, 'A size')
+            for name in ('C1', 'L1', 'R2'):
+                self.assertTrue(np.allclose(r1[name].v, r2[name].v),
+                                integrator + ' ' + name + ' v')
+                self.assertTrue(np.allclose(r1[name].i, r2[name].i),
+                                integrator + ' ' + name + ' i')
+
+        r1 = cct.sim(tv)
+        r2 = cct.sim(tv, companion='norton', select=['L1'], decimate=3)
+        self.assertTrue(np.allclose(r2.L1.i, r1.L1.i[::3]), 'select')
+
+        cct = Circuit("""
+        V1 1 0 dc 10
+        SW1 1 2 no 1
+        R1 2 3 1
+        C1 3 0 1""")
+        r1 = cct.sim(4, rtol=1e-4)
+        r2 = cct.sim(4, rtol=1e-4, companion='norton')
+        self.assertTrue(np.allclose(r1.t, r2.t), 'adaptive')
+        self.assertTrue(np.allclose(r1.C1.i, r2.C1.i), 'adaptive')
+
+    def test_ltisim(self):
+
+        cct = Circuit("""
+        V1 1 0 step 10
+        R1 1 2 2
+        C1 2 0 0.5
+        R2 2 3 1
+        L1 3 0 0.2""")
+
+        # The discretization is exact so large timesteps can be used.
+        tv = np.linspace(0, 3, 31)
+        results = cct.ltisim(tv)
+        self.assertTrue(np.allclose(results.C1.v[1:],
+                                    cct.C1.v.evaluate(tv)[1:]), 'C1.v')
+        self.assertTrue(np.allclose(results.L1.i[1:],
+                                    cct.L1.i.evaluate(tv)[1:]), 'L1.i')
+        self.assertTrue(np.allclose(results[3].v[1:],
+                                    cct[3].v.evaluate(tv)[1:]), 'v3')
+
+        cct = Circuit("""
+        V1 1 0 {t * u(t)}
+        R1 1 2 2
+        C1 2 0 0.5""")
+        results = cct.ltisim(tv, method='foh')
+        self.assertTrue(np.allclose(results.C1.v, cct.C1.v.evaluate(tv)),
+                        'foh')
+
+        cct = Circuit("""
+        R1 1 0 2
+        C1 1 0 0.5 4""")
+        results = cct.ltisim(tv)
+        self.assertTrue(np.allclose(results.C1.v, cct.C1.v.evaluate(tv)),
+                        'initial conditions')
+
+        self.assertRaises(ValueError, cct.ltisim, tv ** 2)
+
+    def test_sim_operating_point(self):
+
+        cct = Circuit("""
+        V1 1 0 dc 10
+        R1 1 2 2
+        C1 2 0 0.5
+        R2 2 3 1
+        L1 3 0 0.2""")
+
+        # The simulation starts in steady state.
+        results = cct.sim(np.linspace(0, 1, 11))
+        self.assertTrue(np.allclose(results.C1.v, 10 / 3), 'C1.v')
+        self.assertTrue(np.allclose(results.L1.i, 10 / 3), 'L1.i')
+
+        cct = Circuit("""
+        R1 1 0 2
+        C1 1 0 0.5 4
+        R2 1 2 1
+        L1 2 0 0.2 1""")
+
+        tv = np.linspace(0, 1, 1001)
+        for companion in ('thevenin', 'norton'):
+            results = cct.sim(tv, companion=companion)
+            self.assertTrue(np.allclose(results.C1.v, cct.C1.v.evaluate(tv),
+                                        atol=1e-4), 'C1.v')
+            self.assertTrue(np.allclose(results.L1.i, cct.L1.i.evaluate(tv),
+                                        atol=1e-4), 'L1.i')
+            self.assertTrue(np.isclose(results.C1.i[0], -3), 'C1.i')
+
+        results = cct.sim(1, rtol=1e-4)
+        self.assertTrue(np.allclose(results.C1.v,
+                                    cct.C1.v.evaluate(results.t),
+                                    atol=1e-3), 'adaptive')
+
+        # The nodes without a DC path to ground do not stop the other
+        # nodes starting in steady state.
+        cct = Circuit("""
+        V1 1 0 dc 10
+        R1 1 2 1
+        C1 2 0 1
+        SW1 2 3 no 5
+        R2 3 4 1
+        C2 4 0 1""")
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            results = cct.sim(np.linspace(0, 1, 11))
+        self.assertTrue(np.allclose(results[2].v, 10), 'v2')
+        self.assertTrue(np.allclose(results[4].v, 0), 'v4')
+
+    def test_sim_transmission_line(self):
+
+        cct = Circuit("""
+        V1 1 0 step 1
+        R1 1 2 50
+        TL1 3 0 2 0 lossless 50 2e8 20
+        R2 3 0 100""")
+
+        # The delay is 0.1 us.  The reflection from the load arrives
+        # back at the source end at 0.2 us.
+        tv = np.linspace(0, 5e-7, 501)
+        for companion in ('thevenin', 'norton'):
+            results = cct.sim(tv, companion=companion)
+            v2 = np.where(tv > 2e-7, 2 / 3, 0.5)
+            v3 = np.where(tv > 1e-7, 2 / 3, 0)
+            self.assertTrue(np.allclose(results[2].v[1:], v2[1:]), 'v2')
+            self.assertTrue(np.allclose(results[3].v, v3), 'v3')
+
+        results = cct.sim(5e-7)
+        self.assertTrue(np.isclose(results[3].v[-1], 2 / 3), 'adaptive')
+
+        self.assertRaises(ValueError, cct.sim, np.linspace(0, 5e-7, 3))
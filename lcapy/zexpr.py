@@ -185,9 +185,9 @@ class ZDomainExpression(ZDomain, SequenceExpression):
 
         return self.state_space()
 
-    def evaluate(self, svector=None):
+    def evaluate(self, svector=None, **kwargs):
 
-        return super(ZDomainExpression, self).evaluate(svector)
+        return super(ZDomainExpression, self).evaluate(svector, **kwargs)
 
     def plot(self, t=None, **kwargs):
         """Plot pole-zero map.